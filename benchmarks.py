@@ -0,0 +1,767 @@
+"""
+Benchmarks for the SQL optimizer engine
+
+Run from the project root:
+
+    python benchmarks.py rules
+    python benchmarks.py cache
+    python benchmarks.py batch
+    python benchmarks.py ddl
+    python benchmarks.py fuzz
+    python benchmarks.py deadline
+    python benchmarks.py incremental
+    python benchmarks.py parse
+    python benchmarks.py profile
+    python benchmarks.py store
+    python benchmarks.py features
+    python benchmarks.py service
+    python benchmarks.py execute --rows 1000,100000 [--schema schema.sql --queries queries.sql]
+
+Each benchmark prints a small table and exits non-zero if a correctness
+check (such as result parity between engine modes) fails.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Callable, List, Optional
+
+import sqlparse
+from sqlparse import lexer, sql
+
+from incremental import IncrementalAnalyzer
+from profiling import HISTOGRAMS, prometheus_text
+from plan_validation import build_sandbox
+from report_formats import result_record
+from results_store import ResultStore
+from schema_catalog import Schema, Table, parse_schema
+from sql_optimizer_engine import AnalysisMode, SQLOptimizerEngine, format_analysis_result
+from sql_script import first_statement, iter_statements
+
+SAMPLE_QUERIES = [
+    "SELECT * FROM users",
+    "SELECT id, name FROM users WHERE id = 42",
+    "SELECT * FROM users WHERE UPPER(email) = 'A@B.COM' ORDER BY created_at",
+    "SELECT u.name, o.total FROM users u JOIN orders o ON u.id = o.user_id WHERE u.status = '1'",
+    "SELECT name FROM products WHERE name LIKE '%phone%' UNION SELECT name FROM archived_products",
+    "SELECT DISTINCT category, COUNT(*) FROM products GROUP BY category ORDER BY category",
+    "SELECT * FROM orders WHERE user_id IN (SELECT id FROM users WHERE country = 'DE')",
+    "SELECT * FROM users u WHERE EXISTS (SELECT 1 FROM orders o WHERE o.user_id = u.id)",
+    "SELECT COUNT(*) FROM events",
+    "SELECT SUM(MAX(amount)) FROM payments WHERE created_at > '2024-01-01'",
+    "SELECT a.id FROM a JOIN b ON a.id = b.a_id JOIN c ON b.id = c.b_id "
+    "JOIN d ON c.id = d.c_id LEFT JOIN e ON d.id = e.d_id WHERE a.flag = 1 LIMIT 10",
+    "SELECT * FROM (SELECT id FROM t1 ORDER BY id) x, (SELECT id FROM t2) y ORDER BY LOWER(x.id)",
+    "SELECT o.id,\n       YEAR(o.created_at)\nFROM orders o\nWHERE o.customer_id = 7\n  AND MONTH(o.created_at) = 3\nORDER BY o.id",
+]
+
+def reporting_query(blocks: int) -> str:
+    """Build a multi-kilobyte reporting query out of repeated UNION ALL blocks"""
+    block = (
+        "SELECT c.region, p.category, SUM(o.amount) AS revenue, COUNT(o.id) AS orders "
+        "FROM orders o JOIN customers c ON o.customer_id = c.id "
+        "JOIN products p ON o.product_id = p.id "
+        "WHERE o.status = 'shipped' AND o.created_at >= '2024-01-01' "
+        "AND c.segment IN (SELECT segment FROM segments WHERE active = 1) "
+        "GROUP BY c.region, p.category"
+    )
+    return " UNION ALL ".join([block] * blocks) + " ORDER BY revenue DESC"
+
+def _comparable(suggestions) -> List[tuple]:
+    """Turn suggestions into tuples; index lines come from a set, so sort them"""
+    return [
+        (
+            s.level, s.category, s.issue, s.suggestion, s.optimized_query,
+            sorted(s.index_recommendation.split("\n")) if s.index_recommendation else None,
+        )
+        for s in suggestions
+    ]
+
+def _median_ms(func: Callable[[], object], repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+# Rewrites of a query that keep its fingerprint, each aimed at text the
+# checks could misread: line breaks, comments and literals full of keywords
+CACHE_VARIANTS = {
+    'line breaks': lambda query: query.replace(" ", "\n", 3),
+    'comment': lambda query: query + " -- limit top join and or is null",
+    'literals': lambda query: re.sub(r"'[^']*'", "'select join is null limit'", query),
+    'numbers': lambda query: re.sub(r"\b\d+\b", "9", query),
+    'case': lambda query: query.lower(),
+}
+
+def bench_cache(repeat: int) -> int:
+    """Check that cache hits return what a fresh analysis of the same text returns
+    
+    Every sample query is analyzed once to fill the cache, then each of its
+    CACHE_VARIANTS is analyzed as a cache hit and by an engine without a
+    cache, with and without a schema, in every mode. Scripts of the variants
+    must also match analyze_query statement by statement.
+    """
+    def record(result):
+        fields = result_record(result)
+        del fields['query']
+        return fields
+    
+    failures = 0
+    print(f"{'mode':<12} {'schema':<7} {'variants':>9} {'hits':>6} {'miss ms':>8} {'hit ms':>7}  parity")
+    for mode in AnalysisMode:
+        for schema_ddl in ('', EXECUTE_SCHEMA):
+            cached = SQLOptimizerEngine(mode=mode)
+            fresh = SQLOptimizerEngine(mode=mode, cache_size=0)
+            cached.set_schema(schema_ddl)
+            fresh.set_schema(schema_ddl)
+            mismatches = 0
+            variants = [build(query) for query in SAMPLE_QUERIES for build in CACHE_VARIANTS.values()]
+            for query in SAMPLE_QUERIES:
+                cached.analyze_query(query)
+            for variant in variants:
+                if record(cached.analyze_query(variant)) != record(fresh.analyze_query(variant)):
+                    mismatches += 1
+                    print(f"MISMATCH ({mode.value}): {variant[:80]!r}")
+            script = list(fresh.analyze_script("\n;\n".join(variants) + "\n;"))
+            if [record(result) for result in script] != \
+                    [record(fresh.analyze_query(result.original_query)) for result in script]:
+                mismatches += 1
+                print(f"MISMATCH ({mode.value}): analyze_script differs from analyze_query")
+            
+            miss_ms = _median_ms(lambda: fresh.analyze_query(SAMPLE_QUERIES[3]), repeat)
+            hit_ms = _median_ms(lambda: cached.analyze_query(SAMPLE_QUERIES[3]), repeat)
+            failures += mismatches
+            print(f"{mode.value:<12} {'yes' if schema_ddl else 'no':<7} {len(variants):>9} "
+                  f"{cached.cache_stats()['hits']:>6} {miss_ms:>8.2f} {hit_ms:>7.2f}  "
+                  f"{'ok' if not mismatches else f'{mismatches} differ'}")
+    print(f"\n{failures} cached or scripted result(s) differing from a fresh analysis")
+    return 1 if failures else 0
+
+# Scripts whose statements iter_statements must split as sqlparse.split does,
+# even when every line may close a chunk
+SPLIT_SCRIPTS = [
+    "SELECT a#b FROM t WHERE c = 'p;\nq';\nSELECT 2;\n",
+    "INSERT INTO #tmp VALUES ('a;\nb');\nSELECT * FROM #tmp;\n",
+    "# note: it's done;\nSELECT 1;\nSELECT 'x;\ny';\n",
+    "SELECT $$a;\nb$$;\n/* c;\nd */ SELECT `e;\nf`;\n-- g 'h;\nSELECT 3;\n",
+]
+
+def bench_parse(repeat: int) -> int:
+    """Time the grouped sqlparse parse against the lexer-only fast path as queries grow
+    
+    Each size is measured as a single statement and followed by a second
+    statement, which makes the fast path lex up to the split. End-to-end
+    analyze_query times of the standard and fast modes are shown alongside,
+    and their results must match. The SPLIT_SCRIPTS must split into the
+    same statements as with sqlparse.split.
+    """
+    standard = SQLOptimizerEngine(mode=AnalysisMode.STANDARD, cache_size=0)
+    fast = SQLOptimizerEngine(mode=AnalysisMode.FAST, cache_size=0)
+    
+    mismatches = 0
+    for query in SAMPLE_QUERIES + [reporting_query(5), reporting_query(2) + "; SELECT 1"]:
+        if _comparable(standard.analyze_query(query).suggestions) != \
+                _comparable(fast.analyze_query(query).suggestions):
+            mismatches += 1
+            print(f"MISMATCH: {query[:80]}")
+    for script in SPLIT_SCRIPTS:
+        if [str(statement).strip() for statement in iter_statements(script, chunk_size=1, group=False)] != \
+                [statement.strip() for statement in sqlparse.split(script) if statement.strip()]:
+            mismatches += 1
+            print(f"MISMATCH (script split): {script[:80]!r}")
+    
+    print(f"{'query size':>12} {'split':>6} {'parse ms':>10} {'lex ms':>8} {'standard ms':>12} {'fast ms':>8} {'speedup':>8}")
+    for blocks in (1, 5, 20, 50, 200):
+        for suffix in ('', '; SELECT 1'):
+            query = reporting_query(blocks) + suffix
+            runs = max(1, repeat // 5)
+            parse_ms = _median_ms(lambda: sqlparse.parse(query)[0], runs)
+            lex_ms = _median_ms(lambda: first_statement(query), runs)
+            standard_ms = _median_ms(lambda: standard.analyze_query(query), runs)
+            fast_ms = _median_ms(lambda: fast.analyze_query(query), runs)
+            print(f"{len(query):>12} {'yes' if suffix else 'no':>6} {parse_ms:>10.2f} {lex_ms:>8.2f} "
+                  f"{standard_ms:>12.2f} {fast_ms:>8.2f} {standard_ms / max(fast_ms, 1e-6):>7.1f}x")
+    
+    total = len(SAMPLE_QUERIES) + 2 + len(SPLIT_SCRIPTS)
+    print(f"\nParity: {total - mismatches}/{total} queries and scripts identical")
+    return 1 if mismatches else 0
+
+def bench_profile(repeat: int) -> int:
+    """Profile every mode on the sample queries and a reporting query, and list the hot spots
+    
+    Profiling must not change results. Totals come from the process-wide
+    histograms, which are then printed in Prometheus text format.
+    """
+    mismatches = 0
+    HISTOGRAMS.clear()
+    for mode in AnalysisMode:
+        plain = SQLOptimizerEngine(mode=mode, cache_size=0)
+        profiled = SQLOptimizerEngine(mode=mode, cache_size=0, profile=True)
+        for query in SAMPLE_QUERIES + [reporting_query(20)]:
+            expected = plain.analyze_query(query)
+            for _ in range(max(1, repeat // 5)):
+                result = profiled.analyze_query(query)
+                format_analysis_result(result)
+            if result.profile is None or _comparable(expected.suggestions) != _comparable(result.suggestions):
+                mismatches += 1
+                print(f"MISMATCH ({mode.value}): {query[:80]}")
+    
+    totals = HISTOGRAMS.totals()
+    entries = [(f"stage {name}", count, seconds) for name, (count, seconds) in totals['stages'].items()]
+    entries += [(f"rule {name}", count, seconds) for name, (count, seconds) in totals['rules'].items()]
+    print(f"{'stage / rule':<32} {'calls':>6} {'total ms':>10} {'mean us':>9}")
+    for name, count, seconds in sorted(entries, key=lambda entry: entry[2], reverse=True):
+        print(f"{name:<32} {count:>6} {seconds * 1000:>10.2f} {seconds / count * 1e6:>9.1f}")
+    print()
+    print(prometheus_text(), end='')
+    print(f"\n{mismatches} profiled result(s) differing from an unprofiled engine")
+    return 1 if mismatches else 0
+
+def bench_store(repeat: int, results: int = 50_000) -> int:
+    """Memory of a list of QueryAnalysisResult objects against a ResultStore holding the same results
+    
+    The workload is the sample queries with varying literals, so every
+    result has its own query text. Each stored result must read back equal
+    to the object it came from.
+    """
+    engine = SQLOptimizerEngine()
+    queries = [f"{query} -- run {run}" for run in range(results // len(SAMPLE_QUERIES) + 1)
+               for query in SAMPLE_QUERIES][:results]
+    
+    tracemalloc.start()
+    start = tracemalloc.get_traced_memory()[0]
+    analyzed = [engine.analyze_query(query) for query in queries]
+    list_bytes = tracemalloc.get_traced_memory()[0] - start
+    start = tracemalloc.get_traced_memory()[0]
+    store = ResultStore.from_results(analyzed)
+    store_bytes = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    
+    mismatches = 0
+    for result, stored in zip(analyzed, store):
+        if (stored.original_query, stored.performance_score, stored.complexity_analysis,
+                _comparable(stored.suggestions)) != (result.original_query, result.performance_score,
+                                                     result.complexity_analysis, _comparable(result.suggestions)):
+            mismatches += 1
+    
+    suggestions = sum(len(result.suggestions) for result in analyzed)
+    print(f"{'container':<12} {'results':>8} {'suggestions':>12} {'MB':>8} {'bytes/result':>13}")
+    for name, size in (('list', list_bytes), ('ResultStore', store_bytes)):
+        print(f"{name:<12} {len(analyzed):>8} {suggestions:>12} {size / 1e6:>8.1f} {size / len(analyzed):>13.0f}")
+    print(f"\n{len(store.texts)} distinct suggestion texts; {mismatches} stored result(s) differing from the original")
+    return 1 if mismatches else 0
+
+def bench_features(repeat: int, results: int = 200_000) -> int:
+    """Vectorized corpus features and scores against a Python loop over the same results (needs NumPy)"""
+    from query_features import FEATURES, feature_matrix, scores
+    
+    engine = SQLOptimizerEngine(cache_size=0)
+    engine.set_statistics({'orders': {'row_count': 50_000_000, 'columns': {'user_id': {'distinct_count': 2_000_000}}},
+                           'users': {'row_count': 2_000_000}})
+    analyzed = [engine.analyze_query(query) for query in SAMPLE_QUERIES + [reporting_query(5)]]
+    corpus = [analyzed[i % len(analyzed)] for i in range(results)]
+    store = ResultStore.from_results(corpus, keep_queries=False)
+    
+    def python_loop():
+        rows = []
+        for result in corpus:
+            levels = Counter(s.level.value for s in result.suggestions)
+            rows.append((result.complexity_analysis, levels, engine._calculate_performance_score(result.suggestions)))
+        return rows
+    
+    runs = max(1, repeat // 5)
+    loop_ms = _median_ms(python_loop, runs)
+    matrix_ms = _median_ms(lambda: feature_matrix(store), runs)
+    matrix = feature_matrix(store)
+    score_ms = _median_ms(lambda: scores(matrix), runs)
+    mismatches = int((scores(matrix) != [result.performance_score for result in corpus]).sum())
+    
+    print(f"{'results':>8} {'features':>9} {'python loop ms':>15} {'matrix ms':>10} {'scores ms':>10} {'speedup':>8}")
+    print(f"{results:>8} {len(FEATURES):>9} {loop_ms:>15.1f} {matrix_ms:>10.1f} {score_ms:>10.2f} "
+          f"{loop_ms / max(matrix_ms + score_ms, 1e-6):>7.1f}x")
+    print(f"\n{mismatches} vectorized score(s) differing from the engine's")
+    return 1 if mismatches else 0
+
+async def _http_post(reader, writer, path: str, payload: dict):
+    """One request on a keep-alive connection: (status, decoded JSON body)"""
+    body = json.dumps(payload).encode('utf-8')
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: bench\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+async def _load_test(service, clients: int, requests_per_client: int):
+    """Keep-alive clients posting sample queries as fast as answers come back"""
+    latencies, statuses, answers = [], Counter(), {}
+    
+    async def client(number: int):
+        reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+        for i in range(requests_per_client):
+            query = SAMPLE_QUERIES[(number + i) % len(SAMPLE_QUERIES)]
+            start = time.perf_counter()
+            status, body = await _http_post(reader, writer, '/analyze', {'query': query})
+            latencies.append((time.perf_counter() - start) * 1000)
+            statuses[status] += 1
+            if status == 200:
+                answers.setdefault(query, body)
+        writer.close()
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(client(number) for number in range(clients)))
+    return time.perf_counter() - start, latencies, statuses, answers
+
+def bench_service(repeat: int, clients: int = 32) -> int:
+    """Load-test the HTTP service in-process: throughput, latency and back-pressure
+    
+    A second run with a tiny queue must refuse part of a burst with 503
+    rather than queue it. Responses must match analyze_query run directly.
+    """
+    from server import OptimizerService, ServiceConfig
+    
+    expected = {query: result_record(SQLOptimizerEngine().analyze_query(query)) for query in SAMPLE_QUERIES}
+    
+    def comparable(record):
+        return (record['score'], [(s['rule'], s['issue'], sorted(s.get('index_recommendation', '').split('\n')))
+                                  for s in record['suggestions']])
+    
+    async def run(config: ServiceConfig, clients: int, requests_per_client: int):
+        service = OptimizerService(config)
+        await service.start()
+        try:
+            return await _load_test(service, clients, requests_per_client), service.metrics
+        finally:
+            await service.close()
+    
+    failures = 0
+    print(f"{'scenario':<12} {'requests':>9} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'mean batch':>11} {'statuses':>20}")
+    for name, config, clients_run, per_client in (
+        ('steady', ServiceConfig(port=0), clients, max(5, repeat * 5)),
+        ('overload', ServiceConfig(port=0, workers=1, queue_size=4, batch_size=2), 4 * clients, 1),
+    ):
+        (elapsed, latencies, statuses, answers), metrics = asyncio.run(run(config, clients_run, per_client))
+        total = sum(statuses.values())
+        batches = metrics.batch_sizes
+        print(f"{name:<12} {total:>9} {total / elapsed:>8.0f} {statistics.median(latencies):>8.1f} "
+              f"{_p95(latencies):>8.1f} {batches.sum / max(batches.count, 1):>11.1f} "
+              f"{', '.join(f'{status}x{count}' for status, count in sorted(statuses.items())):>20}")
+        wrong = [query for query, body in answers.items() if comparable(body) != comparable(expected[query])]
+        for query in wrong:
+            print(f"MISMATCH: {query[:80]}")
+        unexpected = set(statuses) - ({200, 503} if name == 'overload' else {200})
+        failures += len(wrong) + len(unexpected) + (name == 'overload' and not statuses[503])
+    print(f"\n{failures} problem(s): mismatched answers, unexpected statuses or no back-pressure under overload")
+    return 1 if failures else 0
+
+def bench_batch(repeat: int) -> int:
+    """Compare a serial analyze_query loop with analyze_many over a process pool"""
+    engine = SQLOptimizerEngine(cache_size=0)
+    queries = SAMPLE_QUERIES * repeat * 10
+    
+    start = time.perf_counter()
+    serial = [engine.analyze_query(query) for query in queries]
+    serial_s = time.perf_counter() - start
+    
+    print(f"{'workers':>8} {'seconds':>8} {'queries/s':>10} {'speedup':>8}")
+    print(f"{'serial':>8} {serial_s:>8.2f} {len(queries) / serial_s:>10.0f} {1:>7.1f}x")
+    mismatches = 0
+    for workers in sorted({2, 4, os.cpu_count() or 1}):
+        start = time.perf_counter()
+        pooled = engine.analyze_many(queries, workers=workers)
+        pooled_s = time.perf_counter() - start
+        if [r.performance_score for r in pooled] != [r.performance_score for r in serial]:
+            mismatches += 1
+            print(f"MISMATCH: results out of order with {workers} workers")
+        print(f"{workers:>8} {pooled_s:>8.2f} {len(queries) / pooled_s:>10.0f} {serial_s / pooled_s:>7.1f}x")
+    return 1 if mismatches else 0
+
+def schema_dump(tables: int, columns_per_table: int) -> str:
+    """Build a pg_dump-style schema with constraints, indexes and ALTER TABLE statements"""
+    statements = []
+    for t in range(tables):
+        columns = ["    id BIGSERIAL PRIMARY KEY"]
+        for c in range(columns_per_table - 2):
+            column_type = ("DECIMAL(10, 2) NOT NULL DEFAULT 0.00", "VARCHAR(255)",
+                           "TIMESTAMP WITH TIME ZONE DEFAULT now()", "INTEGER CHECK (col_0 >= (0))")[c % 4]
+            columns.append(f"    col_{c} {column_type}")
+        columns.append(f"    parent_id BIGINT REFERENCES table_{max(t - 1, 0)}(id)")
+        columns.append("    UNIQUE (col_0, col_1)")
+        statements.append(f"-- table {t}\nCREATE TABLE public.table_{t} (\n" + ",\n".join(columns) + "\n);")
+        statements.append(f"CREATE INDEX idx_{t}_col_2 ON public.table_{t} USING btree (col_2, col_3 DESC);")
+        statements.append(f"ALTER TABLE ONLY public.table_{t} ADD CONSTRAINT uq_{t} UNIQUE (col_1);")
+    return "\n\n".join(statements) + "\n"
+
+def bench_ddl(repeat: int) -> int:
+    """Parse schema dumps with up to tens of thousands of columns"""
+    failures = 0
+    print(f"{'tables':>8} {'columns':>8} {'DDL KB':>8} {'parse ms':>10} {'columns/s':>11}")
+    for tables, columns_per_table in ((10, 50), (100, 100), (500, 100), (200, 500)):
+        ddl = schema_dump(tables, columns_per_table)
+        schema = parse_schema(ddl)
+        parsed_columns = sum(len(table.columns) for table in schema.tables)
+        expected_columns = tables * columns_per_table
+        if parsed_columns != expected_columns or len(schema.indexes) != tables * 4:
+            failures += 1
+            print(f"MISMATCH: {parsed_columns}/{expected_columns} columns, {len(schema.indexes)} indexes")
+        
+        parse_ms = _median_ms(lambda: parse_schema(ddl), max(1, repeat // 10))
+        print(f"{tables:>8} {expected_columns:>8} {len(ddl) / 1024:>8.0f} {parse_ms:>10.1f} "
+              f"{expected_columns / parse_ms * 1000:>11.0f}")
+    return 1 if failures else 0
+
+# Adversarial query builders for the fuzz benchmark, each taking a target
+# size in characters. They repeat the shapes that made "anchor.*?target"
+# rule patterns backtrack quadratically.
+FUZZ_CASES = {
+    'repeated where': lambda size: "SELECT * FROM t " + "where a.b " * (size // 10),
+    'long identifier': lambda size: "SELECT * FROM t WHERE " + "a" * size,
+    'dotted chain': lambda size: "SELECT * FROM t WHERE " + "a." * (size // 2),
+    'whitespace run': lambda size: "SELECT * FROM t WHERE a" + " " * size + "= 1",
+    'open aggregates': lambda size: "SELECT " + "count( " * (size // 7) + "FROM t",
+    'open wildcards': lambda size: "SELECT * FROM t WHERE " + "name like '%x " * (size // 14),
+    'order by words': lambda size: "SELECT * FROM t ORDER BY " + "a " * (size // 2),
+    'quoted digits': lambda size: "SELECT * FROM t WHERE a = '" + "1" * size,
+    'token soup': lambda size: _token_soup(size),
+    'reporting query': lambda size: reporting_query(max(1, size // 420)),
+}
+
+_SOUP = ["where", "select", "from", "order", "by", "like", "'%x'", "count(", "sum(", "upper(",
+         "a.b", "=", "<", "!", "(", ")", ",", "'12'", "7", "join", "on", "\n", " ", "  ", "x"]
+
+def _token_soup(size: int) -> str:
+    rng = random.Random(size)
+    parts = []
+    length = 0
+    while length < size:
+        part = rng.choice(_SOUP)
+        parts.append(part)
+        length += len(part) + 1
+    return " ".join(parts)
+
+def _ungrouped(query: str) -> sql.Statement:
+    """A flat statement straight from the lexer
+    
+    sqlparse's grouping stage is itself superlinear on some of these inputs,
+    so the fuzz benchmark hands the rules an ungrouped token list to measure
+    rule matching alone.
+    """
+    return sql.Statement([sql.Token(ttype, value) for ttype, value in lexer.tokenize(query)])
+
+def bench_fuzz(repeat: int, ceiling_ms_per_kb: float = 20.0, max_growth: float = 4.0) -> int:
+    """Feed adversarial queries of up to 1 MB to the rule stage and enforce latency ceilings
+    
+    A case fails if its cost per KB at 1 MB exceeds ``ceiling_ms_per_kb``, or
+    grows more than ``max_growth`` times from 16 KB to 1 MB (a quadratic
+    pattern grows 64 times over that range).
+    """
+    engines = {mode: SQLOptimizerEngine(mode=mode, cache_size=0) for mode in AnalysisMode}
+    sizes = (16 << 10, 128 << 10, 1 << 20)
+    failures = 0
+    print(f"{'case':<18} {'mode':<12} " + " ".join(f"{size >> 10:>7} KB" for size in sizes) + f" {'growth':>7}")
+    for name, build in FUZZ_CASES.items():
+        queries = [build(size) for size in sizes]
+        statements = [_ungrouped(query) for query in queries]
+        for mode, engine in engines.items():
+            per_kb = []
+            for query, statement in zip(queries, statements):
+                elapsed = _median_ms(lambda: engine._analyze_statement(query, statement), max(1, repeat // 10))
+                per_kb.append(elapsed / (len(query) / 1024))
+            growth = per_kb[-1] / max(per_kb[0], 1e-3)
+            failed = per_kb[-1] > ceiling_ms_per_kb or growth > max_growth
+            failures += failed
+            print(f"{name:<18} {mode.value:<12} " + " ".join(f"{ms:>7.2f}/KB" for ms in per_kb) +
+                  f" {growth:>6.1f}x" + ("  FAIL" if failed else ""))
+    print(f"\n{failures} case(s) over the ceiling of {ceiling_ms_per_kb} ms/KB or {max_growth}x growth")
+    return 1 if failures else 0
+
+def bench_deadline(repeat: int, deadline_ms: float = 50.0, slack: float = 1.5) -> int:
+    """Analyze the 1 MB fuzz queries under a deadline and check the latency ceiling
+    
+    Each query also runs with a second statement after it, so finding where
+    the first one ends counts against the deadline too. A case fails if its
+    slowest run takes more than ``slack`` times the deadline. A generous
+    deadline must give the same result as no deadline.
+    """
+    engine = SQLOptimizerEngine(cache_size=0)
+    failures = 0
+    for query in SAMPLE_QUERIES + [query + ";\nSELECT 1;" for query in SAMPLE_QUERIES]:
+        full = engine.analyze_query(query)
+        budgeted = engine.analyze_query(query, deadline_ms=1000)
+        if not budgeted.complete or _comparable(full.suggestions) != _comparable(budgeted.suggestions):
+            failures += 1
+            print(f"MISMATCH: {query[:80]}")
+    
+    print(f"{'case':<22} {'median ms':>10} {'max ms':>8} {'flagged':>8} {'skipped':>8}")
+    cases = [(name, build(1 << 20)) for name, build in FUZZ_CASES.items()]
+    cases += [(name + ' +stmt', query + ";\nSELECT 1;") for name, query in cases]
+    for name, query in cases:
+        samples = []
+        for _ in range(max(1, repeat // 5)):
+            start = time.perf_counter()
+            result = engine.analyze_query(query, deadline_ms=deadline_ms)
+            samples.append((time.perf_counter() - start) * 1000)
+        skipped = len(result.skipped_rules)
+        failed = max(samples) > deadline_ms * slack
+        failures += failed
+        print(f"{name:<22} {statistics.median(samples):>10.1f} {max(samples):>8.1f} "
+              f"{len({s.rule_id for s in result.suggestions}):>8} {skipped:>8}" + ("  FAIL" if failed else ""))
+    print(f"\n{failures} case(s) over {slack}x the {deadline_ms} ms deadline or differing without one")
+    return 1 if failures else 0
+
+# Default workload for the execute benchmark; text columns hold values like
+# 'country_3' (see _column_values), so the literals below match real rows
+EXECUTE_SCHEMA = """
+CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR(255) UNIQUE, country VARCHAR(20),
+                    status VARCHAR(20), created_at TIMESTAMP);
+CREATE TABLE orders (id INTEGER PRIMARY KEY, user_id INTEGER REFERENCES users(id), status VARCHAR(20),
+                     total DECIMAL(10, 2), created_at TIMESTAMP);
+CREATE INDEX idx_orders_user_id ON orders(user_id);
+"""
+
+EXECUTE_QUERIES = [
+    "SELECT * FROM users WHERE country = 'country_3'",
+    "SELECT id, total FROM orders WHERE user_id IN (SELECT id FROM users WHERE country = 'country_3')",
+    "SELECT email FROM users WHERE status = 'status_1' UNION SELECT email FROM users WHERE country = 'country_2'",
+    "SELECT id, email FROM users WHERE status = 'status_1' UNION SELECT id, email FROM users WHERE status = 'status_2'",
+    "SELECT o.id, o.total FROM orders o JOIN users u ON u.id = o.user_id "
+    "WHERE u.status = 'status_2' ORDER BY o.total DESC LIMIT 10",
+    "SELECT status, COUNT(*) FROM orders WHERE created_at >= '2025-06-01' GROUP BY status",
+]
+
+_TEXT_VALUES = 20      # distinct values per non-unique text column
+_NUMBER_VALUES = 1000  # distinct values per non-unique integer column
+_EPOCH = datetime.date(2024, 1, 1)
+
+def _column_values(table: Table, column, table_rows: dict, rng: random.Random) -> Callable[[int], object]:
+    """Value generator for one column: row number -> value"""
+    column_type = column.type.lower()
+    single_key = table.primary_key == (column.name,)
+    if column.references and column.references[0] in table_rows:
+        parent_rows = table_rows[column.references[0]]
+        return lambda i: rng.randint(1, parent_rows)
+    if any(word in column_type for word in ('int', 'serial')):
+        if single_key or column.is_unique:
+            return lambda i: i + 1
+        return lambda i: rng.randrange(_NUMBER_VALUES)
+    if any(word in column_type for word in ('dec', 'num', 'real', 'float', 'double', 'money')):
+        return lambda i: round(rng.random() * 1000, 2)
+    if 'date' in column_type or 'time' in column_type:
+        return lambda i: str(_EPOCH + datetime.timedelta(days=rng.randrange(730)))
+    if 'bool' in column_type:
+        return lambda i: rng.randrange(2)
+    if single_key or column.is_unique:
+        return lambda i: f'{column.name}_{i}'
+    return lambda i: f'{column.name}_{rng.randrange(_TEXT_VALUES)}'
+
+def populate(conn, schema: Schema, rows: int, seed: int = 0, batch: int = 50_000):
+    """Fill every catalog table with ``rows`` synthetic rows, parents first
+    
+    Foreign key columns draw from the referenced table's key range, so joins
+    match; the planner statistics are refreshed with ANALYZE afterwards.
+    """
+    rng = random.Random(seed)
+    table_rows = {}
+    pending = [table for table in schema.tables if table.columns]
+    while pending:
+        # A table is ready once every table it references has been filled
+        waiting = {table.name for table in pending}
+        ready = [
+            table for table in pending
+            if not any(column.references and column.references[0] in waiting - {table.name}
+                       for column in table.columns)
+        ] or pending[:1]  # reference cycle: fill one table without its foreign keys
+        for table in ready:
+            pending.remove(table)
+            generators = [_column_values(table, column, table_rows, rng) for column in table.columns]
+            placeholders = ', '.join('?' * len(generators))
+            insert = f'INSERT INTO "{table.name}" VALUES ({placeholders})'
+            conn.execute('BEGIN')
+            for start in range(0, rows, batch):
+                conn.executemany(insert, ([generate(i) for generate in generators]
+                                          for i in range(start, min(rows, start + batch))))
+            conn.execute('COMMIT')
+            table_rows[table.name] = rows
+    conn.execute('ANALYZE')
+
+def _timed_rows(conn, query: str, repeat: int):
+    """Run a query ``repeat`` times; return (samples in ms, rows of the last run)"""
+    samples = []
+    result = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = conn.execute(query).fetchall()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples, result
+
+def _p95(samples: List[float]) -> float:
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+def bench_execute(repeat: int, scales: List[int], schema_ddl: Optional[str] = None,
+                  queries: Optional[List[str]] = None) -> int:
+    """Time each query against its generate_optimized_query rewrite on synthetic SQLite data
+    
+    For every scale (rows per table) a fresh database is filled from the
+    schema. Both versions of each query are run ``repeat`` times; the
+    median, p95 and rows returned are reported, and a rewrite that returns
+    a different multiset of rows, or fails to run, counts as a failure.
+    """
+    schema_ddl = schema_ddl or EXECUTE_SCHEMA
+    queries = queries or EXECUTE_QUERIES
+    engine = SQLOptimizerEngine(cache_size=0)
+    engine.set_schema(schema_ddl)
+    rewrites = [engine.generate_optimized_query(query) for query in queries]
+    
+    failures = 0
+    print(f"{'rows':>9} {'query':>5} {'orig med':>9} {'orig p95':>9} {'opt med':>9} {'opt p95':>9} "
+          f"{'speedup':>8} {'rows out':>9}  parity")
+    for scale in scales:
+        with tempfile.TemporaryDirectory() as directory:
+            conn = build_sandbox(engine.schema, database=os.path.join(directory, 'bench.db'))
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            populate(conn, engine.schema, scale)
+            for number, (query, rewrite) in enumerate(zip(queries, rewrites), 1):
+                original_ms, original_rows = _timed_rows(conn, query, repeat)
+                if rewrite == query:
+                    optimized_ms, optimized_rows, parity = original_ms, original_rows, 'unchanged'
+                else:
+                    try:
+                        optimized_ms, optimized_rows = _timed_rows(conn, rewrite, repeat)
+                    except Exception as error:  # the rewrite is not valid SQL for this database
+                        failures += 1
+                        print(f"{scale:>9} {number:>5} {statistics.median(original_ms):>9.2f} "
+                              f"{_p95(original_ms):>9.2f} {'-':>9} {'-':>9} {'-':>8} "
+                              f"{len(original_rows):>9}  ERROR: {error}")
+                        continue
+                    parity = 'ok' if Counter(original_rows) == Counter(optimized_rows) else 'MISMATCH'
+                    failures += parity == 'MISMATCH'
+                speedup = statistics.median(original_ms) / max(statistics.median(optimized_ms), 1e-6)
+                print(f"{scale:>9} {number:>5} {statistics.median(original_ms):>9.2f} {_p95(original_ms):>9.2f} "
+                      f"{statistics.median(optimized_ms):>9.2f} {_p95(optimized_ms):>9.2f} {speedup:>7.2f}x "
+                      f"{len(original_rows):>4}/{len(optimized_rows):<4}  {parity}")
+            conn.close()
+    
+    print()
+    for number, (query, rewrite) in enumerate(zip(queries, rewrites), 1):
+        print(f"{number:>3}: {query}")
+        if rewrite != query:
+            print(f"  -> {rewrite}")
+    print(f"\n{failures} rewrite(s) failed or changed the result")
+    return 1 if failures else 0
+
+def editor_buffer(lines: int) -> str:
+    """Build a script of about ``lines`` lines: the sample queries around a long multi-line reporting query"""
+    block = reporting_query(1).replace(" ORDER BY revenue DESC", "")
+    block_lines = block.replace(" FROM ", "\nFROM ").replace(" JOIN ", "\nJOIN ").replace(
+        " WHERE ", "\nWHERE ").replace(" AND ", "\n  AND ").replace(" GROUP BY ", "\nGROUP BY ")
+    blocks = max(1, (lines - 2 * len(SAMPLE_QUERIES)) // (block_lines.count("\n") + 2))
+    report = "\nUNION ALL\n".join([block_lines] * blocks) + "\nORDER BY revenue DESC"
+    half = len(SAMPLE_QUERIES) // 2
+    statements = SAMPLE_QUERIES[:half] + [report] + SAMPLE_QUERIES[half:]
+    return ";\n\n".join(statements) + ";\n"
+
+def bench_incremental(repeat: int, budget_ms: float = 10.0) -> int:
+    """Replay keystrokes against a 300-line buffer and compare with re-analyzing it from scratch
+    
+    Each scenario types or deletes text one character at a time; every
+    keystroke is one IncrementalAnalyzer.update. The p95 keystroke latency
+    must stay within ``budget_ms``, and after each scenario the results must
+    match a fresh analysis of every statement.
+    """
+    buffer = editor_buffer(300)
+    where = buffer.index("WHERE o.status", len(buffer) // 2)
+    literal = buffer.index("'shipped'", where) + 1
+    scenarios = {
+        'type predicate': [(where + 6, "o.amount > 100 AND "[:n]) for n in range(1, 20)],
+        'retype literal': [(literal, "delivered"[:n]) for n in range(1, 10)],
+        'append query': [(len(buffer), "SELECT * FROM audit_log WHERE actor = 'x'"[:n]) for n in range(1, 42)],
+    }
+    reference = SQLOptimizerEngine(cache_size=0)
+    full_ms = _median_ms(
+        lambda: [reference.analyze_query(query) for query in sqlparse.split(buffer)], max(1, repeat // 5))
+    
+    failures = 0
+    print(f"{buffer.count(chr(10))} lines, {len(buffer) / 1024:.1f} KB; full re-analysis {full_ms:.1f} ms\n")
+    print(f"{'scenario':<16} {'cache':>6} {'keys':>5} {'median ms':>10} {'p95 ms':>8} {'speedup':>8}  parity")
+    for name, edits in scenarios.items():
+        for cache_size in (0, 1024):
+            samples = []
+            for _ in range(max(1, repeat // 5)):
+                analyzer = IncrementalAnalyzer(SQLOptimizerEngine(cache_size=cache_size))
+                analyzer.update(buffer)
+                for position, typed in edits:
+                    analyzer.update(buffer[:position] + typed + buffer[position:])
+                    samples.append(analyzer.stats.elapsed_ms)
+            expected = [reference.analyze_query(query.strip()) for query in sqlparse.split(analyzer.text)]
+            expected = [result for result in expected if result.original_query.rstrip(';').strip()]
+            matches = [_comparable(result.suggestions) for result in analyzer.results] == \
+                [_comparable(result.suggestions) for result in expected]
+            p95 = _p95(samples)
+            failed = p95 > budget_ms or not matches
+            failures += failed
+            print(f"{name:<16} {cache_size:>6} {len(edits):>5} {statistics.median(samples):>10.2f} {p95:>8.2f} "
+                  f"{full_ms / max(statistics.median(samples), 1e-6):>7.0f}x  "
+                  f"{'ok' if matches else 'differs'}{'  FAIL' if failed else ''}")
+    print(f"\n{failures} scenario(s) over the {budget_ms} ms budget or differing from a full analysis")
+    return 1 if failures else 0
+
+BENCHMARKS = {
+    'cache': bench_cache,
+    'parse': bench_parse,
+    'profile': bench_profile,
+    'store': bench_store,
+    'features': bench_features,
+    'service': bench_service,
+    'batch': bench_batch,
+    'ddl': bench_ddl,
+    'fuzz': bench_fuzz,
+    'deadline': bench_deadline,
+    'execute': bench_execute,
+    'incremental': bench_incremental,
+}
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="SQL optimizer engine benchmarks")
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS), help="benchmark to run")
+    parser.add_argument('--repeat', type=int, default=20, help="timed runs per measurement")
+    parser.add_argument('--rows', default='1000,10000,100000',
+                        help="execute: comma-separated rows per table, e.g. 1000,1000000,10000000")
+    parser.add_argument('--schema', help="execute: DDL file to generate data for (default: built-in schema)")
+    parser.add_argument('--queries', help="execute: file of ';'-separated queries (default: built-in queries)")
+    args = parser.parse_args(argv)
+    if args.benchmark == 'execute':
+        schema_ddl = queries = None
+        if args.schema:
+            with open(args.schema, encoding='utf-8') as handle:
+                schema_ddl = handle.read()
+        if args.queries:
+            with open(args.queries, encoding='utf-8') as handle:
+                queries = [query.strip().rstrip(';') for query in sqlparse.split(handle.read()) if query.strip()]
+        scales = [int(float(rows)) for rows in args.rows.split(',')]
+        return bench_execute(args.repeat, scales, schema_ddl, queries)
+    return BENCHMARKS[args.benchmark](args.repeat)
+
+if __name__ == "__main__":
+    sys.exit(main())
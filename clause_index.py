@@ -0,0 +1,125 @@
+"""
+Clause Index
+
+One forward scan over a query that records where each SELECT, FROM, WHERE,
+GROUP BY, HAVING and ORDER BY clause starts and ends, for the outer query
+and every parenthesized subquery. Rules use it to search only the clause
+they are about: a function call after ORDER BY, or inside a subquery's
+select list, is no longer mistaken for one in the WHERE clause.
+
+A clause runs from its keyword to the next clause keyword of the same
+query, a set operation, LIMIT/OFFSET/FETCH, the closing parenthesis of its
+subquery or the end of the statement. Keywords inside string literals,
+quoted names, comments and non-query parentheses (function arguments,
+window definitions) are ignored.
+"""
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+CLAUSES = ('select', 'from', 'where', 'group by', 'having', 'order by')
+
+_SCAN = re.compile(
+    r"""'(?:[^']|'')*'?|"[^"]*"?|`[^`]*`?|\[[^\]]*\]?|--[^\n]*|/\*(?:[^*]|\*(?!/))*(?:\*/)?"""
+    r"""|[();]"""
+    r"""|\b(?P<keyword>select|from|where|having|group\s+by|order\s+by"""
+    r"""|union|intersect|except|limit|offset|fetch|window|returning|for\s+(?:update|share))\b""",
+    re.IGNORECASE,
+)
+_BLANK = re.compile(r'\s*')
+
+@dataclass
+class Clause:
+    """One clause of the query or of a subquery, as offsets into the indexed text"""
+    keyword: str  # a CLAUSES entry
+    depth: int    # 0 for the outer query, 1 for its subqueries, ...
+    start: int    # offset of the keyword
+    body: int     # offset just past the keyword
+    end: int      # offset just past the clause
+    holes: List[Tuple[int, int]] = field(default_factory=list)  # subqueries nested in the clause
+
+@dataclass
+class _Frame:
+    """A parenthesis level (or the statement itself) open during the scan"""
+    start: int
+    query: bool  # the level holds a query rather than an expression
+    clause: Optional[Clause] = None
+
+class ClauseIndex:
+    """Clause spans of one query text"""
+    
+    def __init__(self, text: str, clauses: List[Clause]):
+        self.text = text
+        self.clauses = clauses  # in order of their keywords
+    
+    def spans(self, keyword: str) -> Iterator[Clause]:
+        return (clause for clause in self.clauses if clause.keyword == keyword)
+    
+    def clause_text(self, clause: Clause) -> str:
+        """Text of a clause without its keyword, each nested subquery replaced by ``?``"""
+        pieces = []
+        position = clause.body
+        for start, end in clause.holes:
+            pieces.append(self.text[position:start])
+            position = end
+        pieces.append(self.text[position:clause.end])
+        return ' ? '.join(pieces)
+    
+    def texts(self, keyword: str) -> List[str]:
+        """clause_text of every clause with this keyword, at any depth"""
+        return [self.clause_text(clause) for clause in self.spans(keyword)]
+
+@lru_cache(maxsize=16)
+def build_clause_index(text: str) -> ClauseIndex:
+    """Index the clauses of a query in one pass
+    
+    Memoized on the text, so the rules of one analysis share one index.
+    """
+    clauses: List[Clause] = []
+    stack = [_Frame(0, query=True)]
+    queries = stack[:]  # the frames of stack that hold queries
+    
+    def close(frame: _Frame, position: int):
+        if frame.clause is not None:
+            frame.clause.end = position
+            frame.clause = None
+    
+    for match in _SCAN.finditer(text):
+        token = match.group()
+        keyword = match.group('keyword')
+        frame = stack[-1]
+        if keyword is not None:
+            if not frame.query:
+                # A query opens a subquery only directly after its parenthesis
+                if keyword.lower() != 'select' or _BLANK.match(text, frame.start + 1).end() != match.start():
+                    continue
+                frame.query = True
+                queries.append(frame)
+            close(frame, match.start())
+            keyword = ' '.join(keyword.lower().split())
+            if keyword in CLAUSES:
+                frame.clause = Clause(keyword, len(queries) - 1, match.start(), match.end(), len(text))
+                clauses.append(frame.clause)
+        elif token == '(':
+            stack.append(_Frame(match.start(), query=False))
+        elif token == ')':
+            if len(stack) == 1:
+                continue  # unbalanced
+            stack.pop()
+            close(frame, match.start())
+            if frame.query:
+                queries.pop()
+                enclosing = queries[-1].clause
+                if enclosing is not None:
+                    enclosing.holes.append((frame.start, match.end()))
+        elif token == ';':
+            for open_frame in stack:
+                close(open_frame, match.start())
+            stack = [_Frame(match.end(), query=True)]
+            queries = stack[:]
+    
+    for frame in stack:
+        close(frame, len(text))
+    return ClauseIndex(text, clauses)
@@ -0,0 +1,277 @@
+"""
+Command-Line Batch Analyzer
+
+Walks directory trees of .sql files, analyzes every statement across a pool
+of worker processes and streams one NDJSON record per statement (see
+report_formats.result_record, plus ``file`` and ``statement``). A summary of
+the slowest and worst-scoring files goes to stderr.
+
+With ``--cache-file``, each file's SHA-256 and records are kept between runs;
+a file whose content is unchanged is not re-analyzed, its cached records are
+emitted instead. The cache is discarded when the engine configuration
+(mode, schema, statistics, deadline) or its rule set changes. Records are
+written out, to the output and the new cache file, as each file finishes and
+are not kept for the rest of the run. A file that cannot be read or analyzed
+is reported as failed and the run goes on.
+
+    python cli.py queries/ --workers 8 --cache-file .sql-cache.json > report.ndjson
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import multiprocessing
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from report_formats import SCHEMA_VERSION, encode_record, result_record
+from sql_optimizer_engine import (ENGINE_VERSION, RULE_IDS, RULE_LEVELS, SEVERITY_POINTS, AnalysisMode,
+                                  SQLOptimizerEngine)
+
+CACHE_VERSION = 1
+DEFAULT_PATTERN = '*.sql'
+_READ_SIZE = 1 << 20
+
+@dataclass
+class FileReport:
+    """Outcome of one .sql file"""
+    path: str
+    sha256: str = ''
+    elapsed_ms: float = 0.0
+    records: List[Dict] = field(default_factory=list)  # emptied once written out
+    cached: bool = False
+    error: Optional[str] = None
+    statements: int = 0
+    worst_score: Optional[int] = None  # lowest statement score
+    
+    def set_records(self, records: List[Dict]):
+        self.records = records
+        self.statements = len(records)
+        self.worst_score = min((record['score'] for record in records), default=None)
+
+def find_sql_files(paths: Iterable[str], pattern: str = DEFAULT_PATTERN) -> Iterator[str]:
+    """Files named on the command line, then every match of ``pattern`` under each directory, sorted"""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+            for name in sorted(files):
+                if fnmatch.fnmatch(name, pattern):
+                    yield os.path.join(root, name)
+
+def file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(_READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def config_key(engine: SQLOptimizerEngine, deadline_ms: Optional[float]) -> str:
+    """Everything besides file content that the cached records depend on"""
+    stats_hash = engine.statistics.stats_hash if engine.statistics is not None else None
+    rules = [ENGINE_VERSION, RULE_IDS, {rule: level.value for rule, level in RULE_LEVELS.items()},
+             {level.value: points for level, points in SEVERITY_POINTS.items()}]
+    return json.dumps([SCHEMA_VERSION, rules, engine.mode.value, engine.schema.ddl_hash, stats_hash, deadline_ms])
+
+def load_cache(path: Optional[str], key: str) -> Dict[str, Dict]:
+    """File entries of a cache file written with the same configuration, else {}"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, encoding='utf-8') as handle:
+            cache = json.load(handle)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != CACHE_VERSION or cache.get('config') != key:
+        return {}
+    return cache.get('files', {})
+
+class CacheWriter:
+    """Writes a cache file entry by entry, so no file's records are held until the end
+    
+    The entries go to a temporary file that replaces ``path`` on close, so
+    an interrupted run leaves the old cache in place. Failed files are left
+    out so they are retried.
+    """
+    
+    def __init__(self, path: str, key: str):
+        self.path = path
+        self._temporary = f"{path}.tmp"
+        self._handle = open(self._temporary, 'w', encoding='utf-8')
+        header = json.dumps({'version': CACHE_VERSION, 'config': key}, separators=(',', ':'))
+        self._handle.write(header[:-1] + ',"files":{')
+        self._separator = ''
+    
+    def add(self, report: FileReport):
+        if report.error is not None:
+            return
+        entry = {'sha256': report.sha256, 'elapsed_ms': report.elapsed_ms, 'records': report.records}
+        self._handle.write(f"{self._separator}{json.dumps(report.path)}:{json.dumps(entry, separators=(',', ':'))}")
+        self._separator = ','
+    
+    def close(self):
+        self._handle.write('}}')
+        self._handle.close()
+        os.replace(self._temporary, self.path)
+
+_worker_engine: Optional[SQLOptimizerEngine] = None
+_worker_deadline: Optional[float] = None
+
+def _init_worker(config: Dict, deadline_ms: Optional[float]):
+    """Pool initializer: build the per-process engine once"""
+    global _worker_engine, _worker_deadline
+    _worker_engine = SQLOptimizerEngine._from_worker_config(config)
+    _worker_deadline = deadline_ms
+
+def analyze_sql_file(engine: SQLOptimizerEngine, path: str, known_sha256: Optional[str] = None,
+                     deadline_ms: Optional[float] = None, encoding: str = 'utf-8') -> FileReport:
+    """Analyze every statement of a file, unless its hash equals ``known_sha256``
+    
+    An unchanged file comes back with ``cached`` set and no records, for the
+    caller to fill in from its cache. A file that cannot be read or whose
+    analysis raises comes back with ``error`` set and no records.
+    """
+    report = FileReport(path)
+    started = time.perf_counter()
+    try:
+        report.sha256 = file_digest(path)
+        if report.sha256 == known_sha256:
+            report.cached = True
+            return report
+        records = []
+        for number, result in enumerate(_analyze_statements(engine, path, deadline_ms, encoding), 1):
+            records.append({'v': SCHEMA_VERSION, 'file': path, 'statement': number, **result_record(result)})
+        report.set_records(records)
+    except (OSError, UnicodeDecodeError) as error:
+        report.error = str(error)
+    except Exception as error:
+        # One statement the engine cannot handle fails its file, not the run
+        report.error = f"{type(error).__name__}: {error}"
+    report.elapsed_ms = (time.perf_counter() - started) * 1000
+    return report
+
+def _analyze_statements(engine: SQLOptimizerEngine, path: str, deadline_ms: Optional[float],
+                        encoding: str) -> Iterator:
+    if deadline_ms is None:
+        yield from engine.analyze_file(path, encoding)
+        return
+    from sql_script import iter_statements
+    with open(path, encoding=encoding) as script:
+        for statement in iter_statements(script, group=False):
+            yield engine.analyze_query(str(statement).strip(), deadline_ms=deadline_ms)
+
+def _analyze_in_worker(task: Tuple[str, Optional[str]]) -> FileReport:
+    path, known_sha256 = task
+    return analyze_sql_file(_worker_engine, path, known_sha256, _worker_deadline)
+
+def analyze_paths(engine: SQLOptimizerEngine, paths: List[str], cache: Dict[str, Dict],
+                  workers: Optional[int] = None, deadline_ms: Optional[float] = None) -> Iterator[FileReport]:
+    """Yield a FileReport per file in input order, analyzing changed files across a worker pool"""
+    tasks = [(path, cache.get(path, {}).get('sha256')) for path in paths]
+    workers = min(workers or os.cpu_count() or 1, max(1, len(tasks)))
+    if workers == 1:
+        reports = (analyze_sql_file(engine, path, known, deadline_ms) for path, known in tasks)
+        yield from (_from_cache(report, cache) for report in reports)
+        return
+    
+    with multiprocessing.Pool(workers, initializer=_init_worker,
+                              initargs=(engine._worker_config(), deadline_ms)) as pool:
+        for report in pool.imap(_analyze_in_worker, tasks):
+            yield _from_cache(report, cache)
+
+def _from_cache(report: FileReport, cache: Dict[str, Dict]) -> FileReport:
+    if report.cached:
+        entry = cache.pop(report.path)  # each path is reported once; let the entry go with the report
+        report.set_records(entry['records'])
+        report.elapsed_ms = entry['elapsed_ms']
+    return report
+
+def summarize(reports: List[FileReport], wall_ms: float, top: int) -> str:
+    """Totals plus the slowest and the worst-scoring files"""
+    analyzed = [report for report in reports if report.error is None and not report.cached]
+    cached = [report for report in reports if report.cached]
+    failed = [report for report in reports if report.error is not None]
+    statements = sum(report.statements for report in reports)
+    lines = [
+        f"{len(reports)} file(s), {statements} statement(s) in {wall_ms / 1000:.2f} s: "
+        f"{len(analyzed)} analyzed, {len(cached)} unchanged, {len(failed)} failed"
+    ]
+    ok = [report for report in reports if report.error is None and report.statements]
+    if ok:
+        lines.append(f"\nSlowest files (analysis ms{', as cached' if cached else ''}):")
+        for report in sorted(ok, key=lambda report: report.elapsed_ms, reverse=True)[:top]:
+            lines.append(f"  {report.elapsed_ms:10.1f}  {report.path}")
+        lines.append("\nWorst-scoring files (lowest statement score, statements):")
+        for report in sorted(ok, key=lambda report: report.worst_score)[:top]:
+            lines.append(f"  {report.worst_score:4}  {report.statements:6}  {report.path}")
+    for report in failed:
+        lines.append(f"\nFAILED {report.path}: {report.error}")
+    return '\n'.join(lines) + '\n'
+
+def build_engine(args: argparse.Namespace) -> SQLOptimizerEngine:
+    engine = SQLOptimizerEngine(mode=AnalysisMode(args.mode))
+    if args.schema:
+        with open(args.schema, encoding='utf-8') as handle:
+            engine.set_schema(handle.read())
+    if args.statistics:
+        with open(args.statistics, encoding='utf-8') as handle:
+            engine.set_statistics(handle.read())
+    return engine
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Analyze directories of .sql files and stream NDJSON results")
+    parser.add_argument('paths', nargs='+', help=".sql files or directories to walk")
+    parser.add_argument('--pattern', default=DEFAULT_PATTERN, help="file name pattern inside directories")
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--mode', default=AnalysisMode.STANDARD.value, choices=[mode.value for mode in AnalysisMode])
+    parser.add_argument('--schema', help="DDL file describing the tables")
+    parser.add_argument('--statistics', help="JSON table statistics for the cost model")
+    parser.add_argument('--deadline-ms', type=float, help="time budget per statement (see analyze_query)")
+    parser.add_argument('--cache-file', help="JSON file of content hashes and records; unchanged files are skipped")
+    parser.add_argument('--changed-only', action='store_true', help="emit records only for re-analyzed files")
+    parser.add_argument('--output', '-o', help="NDJSON output file (default: stdout)")
+    parser.add_argument('--top', type=int, default=10, help="files listed per summary table")
+    parser.add_argument('--fail-under', type=int, help="exit with status 2 if any statement scores below this")
+    args = parser.parse_args(argv)
+    
+    started = time.perf_counter()
+    engine = build_engine(args)
+    key = config_key(engine, args.deadline_ms)
+    cache = load_cache(args.cache_file, key)
+    paths = list(find_sql_files(args.paths, args.pattern))
+    
+    reports = []  # without their records, for the summary
+    cache_writer = CacheWriter(args.cache_file, key) if args.cache_file else None
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        for report in analyze_paths(engine, paths, cache, args.workers, args.deadline_ms):
+            reports.append(report)
+            if report.error is None and not (report.cached and args.changed_only):
+                for record in report.records:
+                    output.write(encode_record(record))
+                output.flush()
+            if cache_writer is not None:
+                cache_writer.add(report)
+            report.records = []
+        if cache_writer is not None:
+            cache_writer.close()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    sys.stderr.write(summarize(reports, (time.perf_counter() - started) * 1000, args.top))
+    
+    if any(report.error is not None for report in reports):
+        return 1
+    if args.fail_under is not None and any(
+            report.worst_score is not None and report.worst_score < args.fail_under for report in reports):
+        return 2
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
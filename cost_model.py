@@ -0,0 +1,184 @@
+"""
+Statistics-Driven Cost Model
+
+Optional table statistics (row counts, per-column distinct counts and null
+fractions) let the engine estimate how many rows a query reads from each
+table. Suggestions are then weighted by the rows they affect instead of
+costing a fixed number of points per severity level, so a missing index on
+a 10-row lookup table no longer scores like one on a 500M-row fact table.
+
+Estimates depend on the query shape only (literal values are not consulted),
+so results stay valid for every query with the same fingerprint.
+"""
+
+import hashlib
+import json
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Union
+
+from query_predicates import scan_query
+
+# Selectivity defaults for predicates on columns without statistics, after
+# PostgreSQL's DEFAULT_EQ_SEL / DEFAULT_INEQ_SEL / DEFAULT_MATCH_SEL
+DEFAULT_EQ_SELECTIVITY = 0.005
+DEFAULT_RANGE_SELECTIVITY = 1 / 3
+DEFAULT_MATCH_SELECTIVITY = 0.005
+
+# A suggestion touching REFERENCE_ROWS rows keeps its severity's full
+# deduction; the weight grows with log10 of the rows and is clamped
+REFERENCE_ROWS = 1_000_000
+MIN_WEIGHT = 0.1
+MAX_WEIGHT = 2.0
+
+@dataclass(frozen=True)
+class ColumnStats:
+    """Statistics for one column"""
+    distinct_count: Optional[float] = None
+    null_fraction: float = 0.0
+
+@dataclass(frozen=True)
+class TableStats:
+    """Statistics for one table"""
+    row_count: float
+    columns: Dict[str, ColumnStats] = field(default_factory=dict, compare=False)
+    
+    def column(self, name: str) -> Optional[ColumnStats]:
+        return self.columns.get(name.lower())
+
+@dataclass(frozen=True)
+class Statistics:
+    """Per-table statistics, keyed by lower-case table name"""
+    stats_hash: str
+    tables: Dict[str, TableStats] = field(default_factory=dict, compare=False)
+    
+    def table(self, name: str) -> Optional[TableStats]:
+        return self.tables.get(name.lower())
+
+def load_statistics(stats: Union[Dict, str, Statistics]) -> Statistics:
+    """Build Statistics from a dict (or its JSON text)
+    
+    The layout mirrors what ANALYZE collects::
+        
+        {"orders": {"row_count": 500000000,
+                    "columns": {"user_id": {"distinct_count": 2000000, "null_fraction": 0.0}}}}
+    """
+    if isinstance(stats, Statistics):
+        return stats
+    if isinstance(stats, str):
+        stats = json.loads(stats)
+    canonical = json.dumps(stats, sort_keys=True, default=str)
+    tables = {}
+    for table_name, table in stats.items():
+        columns = {
+            column_name.lower(): ColumnStats(
+                distinct_count=column.get('distinct_count'),
+                null_fraction=float(column.get('null_fraction') or 0.0),
+            )
+            for column_name, column in (table.get('columns') or {}).items()
+        }
+        tables[table_name.lower()] = TableStats(float(table['row_count']), columns)
+    return Statistics(hashlib.sha1(canonical.encode('utf-8')).hexdigest(), tables)
+
+@dataclass
+class TableEstimate:
+    """Estimated rows read from one table reference"""
+    table: str
+    row_count: float
+    rows: float  # after the query's literal predicates on this table
+
+@dataclass
+class QueryEstimate:
+    """Row estimates for the tables a query reads"""
+    tables: Dict[str, TableEstimate]
+    aliases: Dict[str, str]  # alias (or table name) -> table name
+    
+    @property
+    def rows_read(self) -> float:
+        """Rows read if every referenced table is scanned in full"""
+        return sum(estimate.row_count for estimate in self.tables.values())
+    
+    def resolve(self, name: str) -> Optional[TableEstimate]:
+        return self.tables.get(self.aliases.get(name, name))
+
+_INDEX_TARGET = re.compile(r'\bon\s+(\w+)\s*\(')
+
+def selectivity(op: str, negated_null: Optional[bool], column: Optional[ColumnStats]) -> float:
+    """Fraction of a table's rows that satisfy one predicate"""
+    null_fraction = column.null_fraction if column else 0.0
+    if negated_null is not None:
+        return 1 - null_fraction if negated_null else null_fraction
+    if op in ('=', 'in'):
+        if column and column.distinct_count:
+            return (1 - null_fraction) / max(float(column.distinct_count), 1.0)
+        return DEFAULT_EQ_SELECTIVITY
+    if op == 'like':
+        return DEFAULT_MATCH_SELECTIVITY
+    if op in ('<>', '!='):
+        if column and column.distinct_count:
+            return (1 - null_fraction) * (1 - 1 / max(float(column.distinct_count), 1.0))
+        return 1 - DEFAULT_EQ_SELECTIVITY
+    return DEFAULT_RANGE_SELECTIVITY
+
+def estimate_query(query_str: str, statistics: Statistics) -> QueryEstimate:
+    """Estimate the rows each referenced table contributes to a query
+    
+    Predicates comparing a column with a literal, IN lists, LIKE and IS [NOT]
+    NULL reduce a table's estimate, assuming independent columns. Tables
+    without statistics are left out of the estimate.
+    """
+    scan = scan_query(query_str)
+    tables: Dict[str, TableEstimate] = {}
+    for table in scan.tables:
+        table_stats = statistics.table(table)
+        if table_stats is not None:
+            tables[table] = TableEstimate(table, table_stats.row_count, table_stats.row_count)
+    aliases = {alias: table for alias, table in scan.aliases.items() if table in tables}
+    
+    def has_column(table: str, column: str) -> bool:
+        return table in tables and statistics.table(table).column(column) is not None
+    
+    for predicate in scan.predicates:
+        if predicate.is_join:
+            continue
+        estimate = tables.get(scan.resolve(predicate.qualifier, predicate.column, has_column))
+        if estimate is None:
+            continue
+        column_stats = statistics.table(estimate.table).column(predicate.column)
+        estimate.rows *= selectivity(predicate.op, predicate.negated_null, column_stats)
+    
+    for estimate in tables.values():
+        estimate.rows = max(estimate.rows, 1.0) if estimate.row_count else 0.0
+    return QueryEstimate(tables, aliases)
+
+def index_targets(index_recommendation: str) -> List[str]:
+    """Table (or alias) names of the CREATE INDEX lines in a recommendation"""
+    return _INDEX_TARGET.findall(index_recommendation.lower())
+
+def affected_rows(estimate: QueryEstimate, index_recommendation: Optional[str] = None) -> Optional[float]:
+    """Rows a suggestion is about, or None when no referenced table has statistics
+    
+    An index recommendation affects the rows the index would let the query
+    skip on each indexed table; every other suggestion affects all the rows
+    the query reads.
+    """
+    if not estimate.tables:
+        return None
+    if index_recommendation:
+        seen = set()
+        rows = 0.0
+        for name in index_targets(index_recommendation):
+            table = estimate.resolve(name)
+            if table is not None and table.table not in seen:
+                seen.add(table.table)
+                rows += table.row_count - table.rows
+        return rows if seen else None
+    return estimate.rows_read
+
+def impact_weight(rows: Optional[float]) -> float:
+    """Scale factor for a suggestion's severity deduction"""
+    if rows is None:
+        return 1.0
+    weight = math.log10(rows + 1) / math.log10(REFERENCE_ROWS)
+    return min(MAX_WEIGHT, max(MIN_WEIGHT, weight))
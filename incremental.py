@@ -0,0 +1,314 @@
+"""
+Incremental Analysis
+
+Keeps the lexer tokens and analysis results of an editor buffer between
+edits, so live analysis does not re-parse a large query on every keystroke.
+Each update diffs the new text against the previous one, re-lexes only from
+just before the edit until the token stream lines up with the old stream
+again, and re-analyzes only the statements whose text changed. Per token
+it also keeps whether the statement splitter needs it and its piece of the
+normalized text (query_fingerprint.token_pieces), recomputed only around
+the edit, so a changed statement is split and normalized without walking
+all of its tokens again.
+
+Changed statements go through the engine's analyze_normalized with the
+normalized text built from the kept tokens, so with the result cache enabled
+an edit that leaves a statement's shape alone (see query_fingerprint), such
+as retyping a literal or adding a comment, reuses the cached result exactly
+as a cache hit does. Statements are checked on their text directly;
+sqlparse's grouping stage, which dominates the cost of a full parse, never
+runs. Statement boundaries come from sqlparse's StatementSplitter, so a ';'
+inside parentheses or a BEGIN ... END body does not end a statement.
+"""
+
+import time
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from itertools import compress
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlparse import lexer
+from sqlparse import tokens as T
+from sqlparse.engine import StatementSplitter
+
+from query_fingerprint import join_pieces, token_pieces, token_shape
+from sql_optimizer_engine import QueryAnalysisResult, SQLOptimizerEngine
+
+# The only words that change StatementSplitter's split level, besides parentheses
+_SPLIT_WORDS = frozenset(('CREATE', 'DECLARE', 'BEGIN', 'END', 'IF', 'FOR', 'WHILE', 'CASE'))
+
+def _lex(text: str, pos: int) -> Iterator[Tuple[int, object, str]]:
+    """sqlparse's lexer over ``text[pos:]``: (offset, ttype, value)
+    
+    Callers start at offset 0 or just after whitespace, where the lexer's
+    look-behind patterns (word characters, dots, brackets, non-space) see
+    the same as they would in the whole text.
+    """
+    for ttype, value in lexer.tokenize(text[pos:]):
+        yield pos, ttype, value
+        pos += len(value)
+
+def _moves_split_level(ttype, value: str) -> bool:
+    """Whether StatementSplitter needs to see this token to place statement ends"""
+    if ttype is T.Punctuation:
+        return value in '();'
+    return ttype in T.Keyword and value.split(None, 1)[0].upper() in _SPLIT_WORDS
+
+def _split_stream(ttypes: List, values: List[str], movers: List[bool], start: int,
+                  fed: List[int]) -> Iterator[Tuple]:
+    """The tokens from ``start`` that StatementSplitter needs, recording their indexes in ``fed``
+    
+    ``movers`` flags the tokens _moves_split_level picked out when they were
+    lexed. A closing name token, which leaves the split level alone, stands
+    in for whatever follows the last ';', so every statement before it is
+    yielded at its ';'.
+    """
+    for index in compress(range(start, len(values)), movers[start:]):
+        fed.append(index)
+        yield ttypes[index], values[index]
+    fed.append(len(values))
+    yield T.Name, ''
+
+def _is_risky(ttype, value: str, text: str, offset: int) -> bool:
+    """Whether text typed after this token could change how it was lexed
+    
+    An unterminated quote or dollar quote (both lex as Error tokens), bracketed
+    name or block comment lexes as small fallback tokens until its closing delimiter is typed,
+    however far away that is.
+    """
+    if ttype in T.Error or value == '[':
+        return True
+    return value == '/' and text.startswith('*', offset + 1)
+
+def _common_prefix(a: str, b: str) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[:mid] == b[:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    lo, hi = 0, limit
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:] == b[len(b) - mid:]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def _shapes(ttypes: List, values: List[str]) -> List[Optional[str]]:
+    """Token shapes with runs of whitespace and comments collapsed to one None"""
+    shapes: List[Optional[str]] = []
+    for ttype, value in zip(ttypes, values):
+        shape = token_shape(ttype, value)
+        if shape is not None or not shapes or shapes[-1] is not None:
+            shapes.append(shape)
+    return shapes
+
+@dataclass
+class UpdateStats:
+    """What the last update had to redo"""
+    relexed_tokens: int = 0
+    reused: int = 0     # statements whose text did not change
+    refreshed: int = 0  # same shape: served by the result cache
+    analyzed: int = 0   # statements checked from scratch
+    elapsed_ms: float = 0.0
+
+class IncrementalAnalyzer:
+    """Analysis of an editor buffer, updated edit by edit"""
+    
+    def __init__(self, engine: Optional[SQLOptimizerEngine] = None):
+        self.engine = engine or SQLOptimizerEngine()
+        self.text = ''
+        self.results: List[QueryAnalysisResult] = []  # one per non-empty statement
+        self.stats = UpdateStats()
+        self._starts: List[int] = []  # token offsets
+        self._ttypes: List = []
+        self._values: List[str] = []
+        self._movers: List[bool] = []  # per token: _moves_split_level
+        self._pieces: List[str] = []   # per token: its part of the normalized text (token_pieces)
+        self._risky: List[int] = []   # offsets of tokens _is_risky flagged
+        self._ends: List[int] = []    # token index each statement (empty ones too) ends before
+        self._ranges: List[Optional[Tuple[int, int]]] = []  # per statement: tokens without surrounding whitespace, None if empty
+        self._statements: List[Tuple[int, int]] = []  # token ranges of the non-empty statements
+        self._normalized: List[str] = []  # normalized text per non-empty statement
+    
+    def update(self, text: str) -> List[QueryAnalysisResult]:
+        """Analyze the new buffer text, reusing whatever the edit did not touch"""
+        started = time.perf_counter()
+        self.stats = UpdateStats()
+        if text == self.text and self._starts:
+            self.stats.reused = len(self.results)
+            return self.results
+        
+        old_statements, old_results, old_normalized = self._statements, self.results, self._normalized
+        same_shape = self._relex(text)
+        # Same shapes and statement count: every statement normalizes as before
+        same_shape = same_shape and len(self._statements) == len(old_statements)
+        
+        previous: Dict[str, int] = {result.original_query: index for index, result in enumerate(old_results)}
+        results, normalized = [], []
+        for index, (start, end) in enumerate(self._statements):
+            statement_text = self._text(start, end)
+            old = previous.get(statement_text)
+            if old is not None:
+                self.stats.reused += 1
+                results.append(old_results[old])
+                normalized.append(old_normalized[old])
+                continue
+            
+            # An unchanged shape finds its result in the engine's cache, when it has one
+            if same_shape and self.engine.cache is not None:
+                self.stats.refreshed += 1
+            else:
+                self.stats.analyzed += 1
+            normalized.append(old_normalized[index] if same_shape else join_pieces(self._pieces[start:end]))
+            # Flat: the statement is checked as text, without sqlparse's grouping
+            results.append(self.engine.analyze_normalized(statement_text, normalized[-1], flat=True))
+        
+        self.text = text
+        self.results = results
+        self._normalized = normalized
+        self.stats.elapsed_ms = (time.perf_counter() - started) * 1000
+        return results
+    
+    def _relex(self, text: str) -> bool:
+        """Bring the token lists up to date with ``text``
+        
+        Re-lexes from just before the edit and re-splits the statements around the edit. Returns True when the
+        re-lexed tokens have the same shapes as the tokens they replace.
+        """
+        old = self.text
+        prefix = _common_prefix(old, text)
+        suffix = _common_suffix(old, text, min(len(old), len(text)) - prefix)
+        new_end = len(text) - suffix
+        delta = len(text) - len(old)
+        starts, ttypes, values = self._starts, self._ttypes, self._values
+        
+        # Restart two significant tokens before the edit: the lexer looks
+        # ahead past whitespace to tell names from keywords. Then back up to
+        # a token after whitespace, where lexing a slice matches lexing in place
+        restart = max(0, bisect_right(starts, prefix - 1) - 1) if prefix else 0
+        significant = 0
+        while restart > 0 and significant < 2:
+            restart -= 1
+            significant += token_shape(ttypes[restart], values[restart]) is not None
+        while restart > 0 and not values[restart - 1][-1:].isspace():
+            restart -= 1
+        restart_offset = starts[restart] if restart < len(starts) else 0
+        if self._risky and self._risky[0] < restart_offset:
+            restart, restart_offset = 0, 0
+        
+        new_starts: List[int] = []
+        new_ttypes: List = []
+        new_values: List[str] = []
+        resume = len(starts)  # old token index the stream re-joins at
+        for offset, ttype, value in _lex(text, restart_offset):
+            # Past the edit (and its look-behind character), a token starting
+            # where an old token started means the rest of the stream is unchanged
+            if offset > new_end:
+                index = bisect_left(starts, offset - delta)
+                if index < len(starts) and starts[index] == offset - delta:
+                    resume = index
+                    break
+            new_starts.append(offset)
+            new_ttypes.append(ttype)
+            new_values.append(value)
+        
+        same_shape = _shapes(ttypes[restart:resume], values[restart:resume]) == _shapes(new_ttypes, new_values)
+        self.stats.relexed_tokens = len(new_starts)
+        
+        tail = resume
+        self._starts = starts[:restart] + new_starts + [offset + delta for offset in starts[tail:]]
+        self._ttypes = ttypes[:restart] + new_ttypes + ttypes[tail:]
+        self._values = values[:restart] + new_values + values[tail:]
+        self._movers = self._movers[:restart] + list(map(_moves_split_level, new_ttypes, new_values)) + self._movers[tail:]
+        self._repiece(restart, len(new_starts), self._pieces[:restart] + [''] * len(new_starts) + self._pieces[tail:])
+        resume_offset = starts[tail] if tail < len(starts) else len(old)
+        self._risky = (
+            [offset for offset in self._risky if offset < restart_offset]
+            + [offset for offset, ttype, value in zip(new_starts, new_ttypes, new_values)
+               if _is_risky(ttype, value, text, offset)]
+            + [offset + delta for offset in self._risky if offset >= resume_offset]
+        )
+        self.text = text
+        self._split(restart, len(new_starts), len(new_starts) - (resume - restart))
+        return same_shape
+    
+    def _split(self, restart: int, relexed: int, shift: int):
+        """Re-place the statement ends after tokens ``restart`` .. ``restart + relexed`` were re-lexed
+        
+        Ends are placed by sqlparse's StatementSplitter, fed only the tokens
+        that can move its split level. The splitter starts afresh at every
+        statement, so the ends before the re-lexed tokens stand, and once an
+        end past them lands where an old end moved to (by ``shift`` tokens),
+        so do all the ends after it. As in sqlparse, spaces and a line
+        comment after a statement's ';' still belong to that statement.
+        """
+        values, ttypes = self._values, self._ttypes
+        old_ends, old_ranges = self._ends, self._ranges
+        keep = bisect_left(old_ends, restart)
+        ends, ranges = old_ends[:keep], old_ranges[:keep]
+        start = ends[-1] if ends else 0
+        tail = bisect_left(old_ends, restart + relexed - shift)
+        moved = {end + shift: index for index, end in enumerate(old_ends[tail:], tail)}
+        
+        fed: List[int] = []
+        consumed = 0
+        for statement in StatementSplitter().process(_split_stream(ttypes, values, self._movers, start, fed)):
+            consumed += len(statement.tokens)
+            end = fed[consumed - 1] + 1
+            if end > len(values):
+                end = len(values)  # the closing stand-in: the last statement runs to the end
+            while end < len(values) and (ttypes[end] is T.Whitespace or ttypes[end] is T.Comment.Single):
+                end += 1
+            ends.append(end)
+            ranges.append(self._trim(start, end))
+            start = end
+            if end in moved:
+                ends += [old + shift for old in old_ends[moved[end] + 1:]]
+                ranges += [old and (old[0] + shift, old[1] + shift) for old in old_ranges[moved[end] + 1:]]
+                break
+        
+        self._ends, self._ranges = ends, ranges
+        self._statements = [statement for statement in ranges if statement is not None]
+    
+    def _repiece(self, restart: int, relexed: int, pieces: List[str]):
+        """Recompute ``pieces`` for tokens ``restart`` .. ``restart + relexed``, which were re-lexed
+        
+        A piece depends on the tokens back to the previous non-blank one, so
+        the recomputation starts at that token and runs through the first
+        non-blank token after the re-lexed ones; pieces outside stand.
+        """
+        first = restart
+        while first > 0 and not pieces[first - 1]:
+            first -= 1
+        first = max(first - 1, 0)  # the previous non-blank token, or the start
+        end = restart + relexed
+        while end < len(pieces) and not pieces[end]:
+            end += 1
+        end = min(end + 1, len(pieces))
+        fresh = token_pieces(zip(self._ttypes[first:end], self._values[first:end]))
+        skip = 1 if first < restart else 0  # the previous token keeps the piece its own context gave it
+        pieces[first + skip:end] = fresh[skip:]
+        self._pieces = pieces
+    
+    def _trim(self, start: int, end: int) -> Optional[Tuple[int, int]]:
+        """Tokens start .. end without surrounding whitespace, or None if they hold no statement"""
+        values, ttypes = self._values, self._ttypes
+        while start < end and ttypes[start] in T.Whitespace:
+            start += 1
+        while end > start and ttypes[end - 1] in T.Whitespace:
+            end -= 1
+        if any(token_shape(ttypes[i], values[i]) not in (None, ';') for i in range(start, end)):
+            return start, end
+        return None
+    
+    def _text(self, start: int, end: int) -> str:
+        # rstrip: a line comment ending a statement keeps its newline
+        return self.text[self._starts[start]:self._starts[end - 1] + len(self._values[end - 1])].rstrip()
+    
\ No newline at end of file
@@ -0,0 +1,189 @@
+"""
+Workload Index Advisor
+
+Recommends a small set of composite indexes for a whole workload instead of
+one single-column index per predicate per query. Each query shape yields a
+candidate per table it filters or sorts (equality columns, then a range
+column, then sort columns). Candidates that are prefixes of one another are
+consolidated, candidates an existing index already serves are dropped, and
+the rest are ranked by estimated benefit under an index-count budget.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from cost_model import Statistics, selectivity
+from query_fingerprint import fingerprint_normalized, normalize_query
+from query_predicates import RANGE_OPERATORS, scan_query
+from schema_catalog import Schema
+
+DEFAULT_INDEX_BUDGET = 5
+DEFAULT_TABLE_ROWS = 100_000  # assumed for tables without statistics
+
+@dataclass
+class IndexCandidate:
+    """A proposed index and the workload benefit attributed to it"""
+    table: str
+    columns: Tuple[str, ...]
+    equality: int  # leading equality columns; their order is interchangeable
+    benefit: float = 0.0  # estimated rows avoided, summed over the weighted workload
+    queries: int = 0      # query shapes served
+    
+    @property
+    def name(self) -> str:
+        return f"idx_{self.table}_{'_'.join(self.columns)}"
+    
+    @property
+    def ddl(self) -> str:
+        return f"CREATE INDEX {self.name} ON {self.table}({', '.join(self.columns)});"
+    
+    def served_by(self, columns: Tuple[str, ...]) -> bool:
+        """Whether an index on ``columns`` can do everything this candidate does"""
+        if len(columns) < len(self.columns):
+            return False
+        n = self.equality
+        return set(columns[:n]) == set(self.columns[:n]) and columns[n:len(self.columns)] == self.columns[n:]
+
+@dataclass
+class IndexAdvice:
+    """Advisor output: the ranked recommendations plus what was left out and why"""
+    recommended: List[IndexCandidate] = field(default_factory=list)
+    covered: List[IndexCandidate] = field(default_factory=list)      # served by an existing index
+    over_budget: List[IndexCandidate] = field(default_factory=list)
+
+@dataclass
+class _TableAccess:
+    equality: Dict[str, float] = field(default_factory=dict)  # column -> selectivity
+    range: Dict[str, float] = field(default_factory=dict)
+    sort: List[str] = field(default_factory=list)
+
+def _accesses(query: str, schema: Schema, statistics: Optional[Statistics]) -> Dict[str, _TableAccess]:
+    """Indexable column usage of one query, per table"""
+    scan = scan_query(query)
+    
+    def has_column(table: str, column: str) -> bool:
+        return schema.has_column(table, column)
+    
+    def known(table: Optional[str], column: str) -> bool:
+        # With a schema, only columns it declares are indexable
+        if table is None:
+            return False
+        return not schema.tables or has_column(table, column)
+    
+    def column_stats(table: str, column: str):
+        table_stats = statistics.table(table) if statistics is not None else None
+        return table_stats.column(column) if table_stats is not None else None
+    
+    accesses: Dict[str, _TableAccess] = {}
+    for predicate in scan.predicates:
+        if predicate.is_join:
+            # The inner side of a join is probed by its join column
+            for qualifier, column in ((predicate.qualifier, predicate.column), predicate.other):
+                table = scan.resolve(qualifier, column, has_column)
+                if known(table, column):
+                    access = accesses.setdefault(table, _TableAccess())
+                    access.equality.setdefault(column, selectivity('=', None, column_stats(table, column)))
+            continue
+        
+        table = scan.resolve(predicate.qualifier, predicate.column, has_column)
+        if not known(table, predicate.column):
+            continue
+        access = accesses.setdefault(table, _TableAccess())
+        fraction = selectivity(predicate.op, predicate.negated_null, column_stats(table, predicate.column))
+        if predicate.op in ('=', 'in', 'is'):
+            access.equality[predicate.column] = min(fraction, access.equality.get(predicate.column, 1.0))
+        elif predicate.op in RANGE_OPERATORS or (
+                predicate.op == 'like' and not predicate.value.lstrip("'").startswith('%')):
+            access.range[predicate.column] = min(fraction, access.range.get(predicate.column, 1.0))
+    
+    for qualifier, column in scan.order_by:
+        table = scan.resolve(qualifier, column, has_column)
+        if known(table, column):
+            accesses.setdefault(table, _TableAccess()).sort.append(column)
+    return accesses
+
+def _table_rows(table: str, statistics: Optional[Statistics]) -> float:
+    table_stats = statistics.table(table) if statistics is not None else None
+    return table_stats.row_count if table_stats is not None else DEFAULT_TABLE_ROWS
+
+def advise_indexes(queries: Iterable[Union[str, Tuple[str, float]]], schema: Schema,
+                   statistics: Optional[Statistics] = None,
+                   budget: int = DEFAULT_INDEX_BUDGET) -> IndexAdvice:
+    """Recommend at most ``budget`` new indexes for a workload
+    
+    ``queries`` holds query strings or (query, weight) pairs, where the
+    weight is e.g. the number of executions or the total time spent; plain
+    strings weigh 1. Queries are grouped by fingerprint first, so literal
+    variants of a query count as one shape with their weights summed.
+    """
+    shapes: Dict[str, List] = {}
+    for item in queries:
+        query, weight = (item, 1.0) if isinstance(item, str) else item
+        normalized = normalize_query(query)
+        shape = shapes.setdefault(fingerprint_normalized(normalized), [normalized, 0.0])
+        shape[1] += weight
+    
+    # One candidate per (shape, table); equality columns are ordered later
+    raw: List[Tuple[str, _TableAccess, float]] = []
+    equality_use: Dict[Tuple[str, str], float] = {}
+    for normalized, weight in shapes.values():
+        for table, access in _accesses(normalized, schema, statistics).items():
+            raw.append((table, access, weight))
+            for column in access.equality:
+                equality_use[table, column] = equality_use.get((table, column), 0.0) + weight
+    
+    candidates: Dict[Tuple[str, Tuple[str, ...]], IndexCandidate] = {}
+    for table, access, weight in raw:
+        # Columns used by more of the workload go first so that candidates
+        # from different queries share prefixes; then the most selective
+        equality = sorted(access.equality, key=lambda column: (
+            -equality_use[table, column], access.equality[column], column))
+        columns = list(equality)
+        fraction = 1.0
+        for column in equality:
+            fraction *= access.equality[column]
+        if access.range:
+            range_column = min(access.range, key=lambda column: (access.range[column], column))
+            if range_column not in columns:
+                columns.append(range_column)
+                fraction *= access.range[range_column]
+        sorted_output = False
+        for column in access.sort:
+            if column not in columns:
+                columns.append(column)
+                sorted_output = True
+        if not columns:
+            continue
+        
+        rows = _table_rows(table, statistics)
+        matched = rows * fraction
+        # Rows the index lets the query skip, plus the sort it makes unnecessary
+        benefit = weight * ((rows - matched) + (matched if sorted_output else 0.0))
+        key = (table, tuple(columns))
+        candidate = candidates.get(key)
+        if candidate is None:
+            candidate = candidates[key] = IndexCandidate(table, tuple(columns), len(equality))
+        candidate.benefit += benefit
+        candidate.queries += 1
+    
+    # Consolidate: a candidate served by a wider candidate on the same table
+    # hands its benefit to the wider one
+    kept: List[IndexCandidate] = []
+    for candidate in sorted(candidates.values(), key=lambda c: (-len(c.columns), -c.benefit)):
+        wider = next((k for k in kept if k.table == candidate.table and candidate.served_by(k.columns)), None)
+        if wider is None:
+            kept.append(candidate)
+        else:
+            wider.benefit += candidate.benefit
+            wider.queries += candidate.queries
+    
+    advice = IndexAdvice()
+    for candidate in sorted(kept, key=lambda c: (-c.benefit, c.table, c.columns)):
+        existing = schema.indexes_on(candidate.table)
+        if any(candidate.served_by(index.columns) for index in existing):
+            advice.covered.append(candidate)
+        elif len(advice.recommended) < budget:
+            advice.recommended.append(candidate)
+        else:
+            advice.over_budget.append(candidate)
+    return advice
@@ -0,0 +1,225 @@
+"""
+Query Plan Validation
+
+Confirms index advice with a real query planner. The schema catalog is
+loaded into an in-memory SQLite database, the query is planned with
+EXPLAIN QUERY PLAN, and each index recommendation is created in turn and
+the query re-planned; tables that go from a full SCAN to an index SEARCH
+are reported as confirmed improvements.
+
+The sandbox is built from the parsed catalog rather than by executing the
+pasted DDL, so dialect-specific clauses (ENGINE=..., USING btree, SERIAL)
+do not keep a schema from loading. When table statistics are set they are
+written to sqlite_stat1 so the planner sees realistic table sizes.
+"""
+
+import re
+import sqlite3
+from dataclasses import dataclass, field
+from typing import AbstractSet, Dict, Iterable, List, Optional
+
+from cost_model import Statistics
+from query_predicates import scan_query
+from schema_catalog import Schema
+
+_PLAN_ACCESS = re.compile(r'^(SCAN|SEARCH) (\S+)')
+_CREATE_INDEX = re.compile(
+    r'CREATE\s+(UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)\s+ON\s+(\w+)\s*\(([^)]*)\)',
+    re.IGNORECASE,
+)
+_BINDINGS = re.compile(r'uses (\d+)')
+# Type names SQLite accepts: words with an optional (precision[, scale])
+_SQLITE_TYPE = re.compile(r'^[A-Za-z_][\w ]*(?:\(\s*[+-]?\d+\s*(?:,\s*[+-]?\d+\s*)?\))?$')
+
+# MySQL/PostgreSQL functions SQLite lacks; registered as stubs so that
+# queries using them can still be planned
+_STUB_FUNCTIONS = (
+    'year', 'month', 'day', 'hour', 'minute', 'now', 'curdate', 'getdate',
+    'concat', 'date_format', 'date_trunc', 'to_char',
+)
+
+# Rows per key SQLite assumes for index columns without statistics
+_DEFAULT_ROWS_PER_KEY = 10
+
+@dataclass
+class IndexCheck:
+    """The plan change caused by one index recommendation"""
+    statements: List[str]  # CREATE INDEX statements as applied to the sandbox
+    improved: List[str] = field(default_factory=list)  # tables that went from SCAN to SEARCH
+    plan: List[str] = field(default_factory=list)      # EXPLAIN QUERY PLAN details with the index
+    error: Optional[str] = None
+    
+    @property
+    def confirmed(self) -> bool:
+        return bool(self.improved)
+
+@dataclass
+class PlanValidation:
+    """Original plan of a query plus one IndexCheck per recommendation"""
+    query: str
+    plan: List[str] = field(default_factory=list)
+    checks: List[IndexCheck] = field(default_factory=list)
+    error: Optional[str] = None  # set when the query could not be planned at all
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+def _sqlite_type(column_type: str) -> str:
+    column_type = ' '.join(column_type.split())
+    return column_type if _SQLITE_TYPE.match(column_type) else ''
+
+def _stub(*args):
+    return None
+
+def _index_stat(rows: float, statistics: Optional[Statistics], table: str,
+                columns: List[str], unique: bool) -> str:
+    """sqlite_stat1 text for an index: row count, then rows per key prefix"""
+    table_stats = statistics.table(table) if statistics is not None else None
+    stat = [str(max(1, int(rows)))]
+    distinct = 1.0
+    for position, column in enumerate(columns, 1):
+        column_stats = table_stats.column(column) if table_stats is not None else None
+        if column_stats is not None and column_stats.distinct_count:
+            distinct = min(rows, distinct * float(column_stats.distinct_count))
+            per_key = rows / max(distinct, 1.0)
+        else:
+            per_key = _DEFAULT_ROWS_PER_KEY
+        if unique and position == len(columns):
+            per_key = 1
+        stat.append(str(max(1, round(per_key))))
+    return ' '.join(stat)
+
+def _write_statistics(conn: sqlite3.Connection, statistics: Statistics, tables: Optional[Iterable[str]] = None):
+    """Store row counts and index selectivity in sqlite_stat1 and reload them"""
+    conn.execute('ANALYZE')
+    table_names = tables or [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'")]
+    for table in table_names:
+        table_stats = statistics.table(table)
+        if table_stats is None:
+            continue
+        conn.execute('DELETE FROM sqlite_stat1 WHERE tbl = ?', (table,))
+        conn.execute('INSERT INTO sqlite_stat1 VALUES (?, NULL, ?)', (table, str(max(1, int(table_stats.row_count)))))
+        for _, index_name, unique, *_ in conn.execute(f'PRAGMA index_list({_quote(table)})').fetchall():
+            columns = [row[2] for row in conn.execute(f'PRAGMA index_info({_quote(index_name)})')]
+            stat = _index_stat(table_stats.row_count, statistics, table, columns, bool(unique))
+            conn.execute('INSERT INTO sqlite_stat1 VALUES (?, ?, ?)', (table, index_name, stat))
+    conn.execute('ANALYZE sqlite_schema')
+
+def build_sandbox(schema: Schema, statistics: Optional[Statistics] = None,
+                  database: str = ':memory:', tables: Optional[AbstractSet[str]] = None,
+                  check_same_thread: bool = True) -> sqlite3.Connection:
+    """Create a SQLite database (in memory by default) with the catalog's tables and indexes
+    
+    With ``tables``, only those tables (lower-case names) and their indexes
+    are created, which is all a query over them needs to be planned.
+    """
+    conn = sqlite3.connect(database, isolation_level=None, check_same_thread=check_same_thread)
+    for name in _STUB_FUNCTIONS:
+        conn.create_function(name, -1, _stub)
+    
+    for table in schema.tables:
+        if not table.columns or (tables is not None and table.name not in tables):
+            continue
+        definitions = [f'{_quote(column.name)} {_sqlite_type(column.type)}'.rstrip() for column in table.columns]
+        if table.primary_key:
+            definitions.append(f"PRIMARY KEY ({', '.join(map(_quote, table.primary_key))})")
+        conn.execute(f"CREATE TABLE {_quote(table.name)} ({', '.join(definitions)})")
+    
+    for number, index in enumerate(schema.indexes):
+        if index.primary or (tables is not None and index.table not in tables):
+            continue
+        name = index.name or f'{index.table}_index_{number}'
+        unique = 'UNIQUE ' if index.unique else ''
+        try:
+            conn.execute(f"CREATE {unique}INDEX {_quote(name)} ON {_quote(index.table)} "
+                         f"({', '.join(map(_quote, index.columns))})")
+        except sqlite3.Error:
+            continue  # index on a table or column the catalog does not know
+    
+    if statistics is not None:
+        _write_statistics(conn, statistics)
+    return conn
+
+def explain(conn: sqlite3.Connection, query: str) -> List[str]:
+    """EXPLAIN QUERY PLAN details, binding NULL to any positional parameters"""
+    statement = f'EXPLAIN QUERY PLAN {query.strip().rstrip(";")}'
+    try:
+        rows = conn.execute(statement).fetchall()
+    except sqlite3.ProgrammingError as error:
+        match = _BINDINGS.search(str(error))
+        if not match:
+            raise
+        rows = conn.execute(statement, (None,) * int(match.group(1))).fetchall()
+    return [row[3] for row in rows]
+
+def _scanned(plan: List[str], aliases: Dict[str, str]) -> Dict[str, str]:
+    """Table name -> SCAN or SEARCH; a table scanned anywhere counts as SCAN"""
+    access: Dict[str, str] = {}
+    for detail in plan:
+        match = _PLAN_ACCESS.match(detail)
+        if match:
+            table = aliases.get(match.group(2).lower(), match.group(2).lower())
+            if access.get(table) != 'SCAN':
+                access[table] = match.group(1)
+    return access
+
+def _rewrite_index(statement: str, aliases: Dict[str, str]) -> Optional[str]:
+    """Point a recommendation written against a query alias at the real table"""
+    match = _CREATE_INDEX.search(statement)
+    if not match:
+        return None
+    unique, name, target, columns = match.groups()
+    table = aliases.get(target.lower(), target.lower())
+    if table != target.lower() and name.lower().startswith(f'idx_{target.lower()}_'):
+        name = f'idx_{table}_' + name[len(target) + 5:]
+    return f"CREATE {'UNIQUE ' if unique else ''}INDEX {name} ON {table}({columns.strip()})"
+
+def validate_index_advice(schema: Schema, query: str, recommendations: Iterable[str],
+                          statistics: Optional[Statistics] = None) -> PlanValidation:
+    """Plan a query before and after each recommendation
+    
+    Each recommendation is a block of one or more CREATE INDEX statements
+    (an ``index_recommendation`` or an advisor ``ddl`` line); its indexes are
+    created together and rolled back before the next one is tried.
+    """
+    validation = PlanValidation(query)
+    aliases = scan_query(query).aliases
+    conn = build_sandbox(schema, statistics)
+    try:
+        try:
+            validation.plan = explain(conn, query)
+        except sqlite3.Error as error:
+            validation.error = str(error)
+            return validation
+        before = _scanned(validation.plan, aliases)
+        
+        for recommendation in recommendations:
+            statements = [
+                rewritten for rewritten in (_rewrite_index(line, aliases) for line in recommendation.splitlines())
+                if rewritten
+            ]
+            check = IndexCheck(statements)
+            validation.checks.append(check)
+            conn.execute('SAVEPOINT advice')
+            try:
+                for statement in statements:
+                    conn.execute(statement)
+                if statistics is not None:
+                    _write_statistics(conn, statistics, {_CREATE_INDEX.search(s).group(3) for s in statements})
+                check.plan = explain(conn, query)
+                after = _scanned(check.plan, aliases)
+                check.improved = sorted(
+                    table for table, access in before.items()
+                    if access == 'SCAN' and after.get(table) == 'SEARCH'
+                )
+            except sqlite3.Error as error:
+                check.error = str(error)
+            finally:
+                conn.execute('ROLLBACK TO advice')
+                conn.execute('RELEASE advice')
+                if statistics is not None:
+                    conn.execute('ANALYZE sqlite_schema')
+    finally:
+        conn.close()
+    return validation
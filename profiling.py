@@ -0,0 +1,148 @@
+"""
+Analysis Profiling
+
+Opt-in timing of the engine's stages and rule checks. An engine created with
+``profile=True`` attaches an AnalysisProfile to every result it returns,
+holding the wall time of parsing, each _check_* rule, complexity analysis,
+row estimates, scoring and (once the result is formatted) rendering. Every
+recorded time also goes into process-wide histograms that can be dumped in
+the Prometheus text exposition format.
+"""
+
+import bisect
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+# Histogram bucket upper bounds in seconds, from 10 µs to 2.5 s
+DEFAULT_BUCKETS = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5,
+)
+
+STAGE_METRIC = 'sql_optimizer_stage_seconds'
+RULE_METRIC = 'sql_optimizer_rule_seconds'
+
+class Histogram:
+    """Bucketed observation counts, a running sum and a total count"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # the last one is +Inf
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.sum += seconds
+        self.count += 1
+    
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """(le label, observations at or below it) for every bucket and +Inf"""
+        bounds = [repr(bound) for bound in self.buckets] + ['+Inf']
+        running = 0
+        result = []
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+def histogram_lines(metric: str, labels: str, histogram: Histogram) -> List[str]:
+    """Prometheus sample lines of one histogram; ``labels`` is e.g. 'stage="parse"' or ''"""
+    prefix = f"{labels}," if labels else ""
+    lines = [f'{metric}_bucket{{{prefix}le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{metric}_sum{suffix} {histogram.sum!r}")
+    lines.append(f"{metric}_count{suffix} {histogram.count}")
+    return lines
+
+class ProfileHistograms:
+    """Thread-safe histograms of stage and rule times, keyed by name"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._stages: Dict[str, Histogram] = {}
+        self._rules: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+    
+    def observe_stage(self, stage: str, seconds: float):
+        self._observe(self._stages, stage, seconds)
+    
+    def observe_rule(self, rule_id: str, seconds: float):
+        self._observe(self._rules, rule_id, seconds)
+    
+    def observe_profile(self, profile: 'AnalysisProfile'):
+        """Record a profile built in another process (see SQLOptimizerEngine.iter_analyze)"""
+        for stage, ms in profile.stages.items():
+            self.observe_stage(stage, ms / 1000)
+        for rule_id, ms in profile.rules.items():
+            self.observe_rule(rule_id, ms / 1000)
+    
+    def _observe(self, histograms: Dict[str, Histogram], name: str, seconds: float):
+        with self._lock:
+            histogram = histograms.get(name)
+            if histogram is None:
+                histogram = histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+    
+    def totals(self) -> Dict[str, Dict[str, Tuple[int, float]]]:
+        """{'stages': {name: (count, seconds)}, 'rules': {...}}, for a quick hot-spot table"""
+        with self._lock:
+            return {
+                'stages': {name: (h.count, h.sum) for name, h in self._stages.items()},
+                'rules': {name: (h.count, h.sum) for name, h in self._rules.items()},
+            }
+    
+    def clear(self):
+        with self._lock:
+            self._stages.clear()
+            self._rules.clear()
+    
+    def prometheus_text(self) -> str:
+        """Both histogram families in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            for metric, label, histograms, help_text in (
+                (STAGE_METRIC, 'stage', self._stages, "Wall time of SQL analysis stages"),
+                (RULE_METRIC, 'rule', self._rules, "Wall time of SQL analysis rule checks"),
+            ):
+                lines.append(f"# HELP {metric} {help_text}")
+                lines.append(f"# TYPE {metric} histogram")
+                for name in sorted(histograms):
+                    lines.extend(histogram_lines(metric, f'{label}="{name}"', histograms[name]))
+        return '\n'.join(lines) + '\n'
+
+# Every profiled analysis in this process is recorded here
+HISTOGRAMS = ProfileHistograms()
+
+def prometheus_text() -> str:
+    """The process-wide histograms in the Prometheus text exposition format"""
+    return HISTOGRAMS.prometheus_text()
+
+@dataclass
+class AnalysisProfile:
+    """Wall time in milliseconds of each stage and rule check of one analysis"""
+    stages: Dict[str, float] = field(default_factory=dict)  # parse, fingerprint, token_walk, complexity, estimates, rewrite, score, format
+    rules: Dict[str, float] = field(default_factory=dict)   # RULE_IDS entry -> time spent in its _check_* method
+    
+    @property
+    def total_ms(self) -> float:
+        return sum(self.stages.values()) + sum(self.rules.values())
+    
+    def stage(self, name: str, started: float):
+        """Record a stage that began at time.perf_counter() value ``started``"""
+        seconds = time.perf_counter() - started
+        self.stages[name] = self.stages.get(name, 0.0) + seconds * 1000
+        HISTOGRAMS.observe_stage(name, seconds)
+    
+    def rule(self, rule_id: str, started: float):
+        """Record a rule check that began at time.perf_counter() value ``started``"""
+        seconds = time.perf_counter() - started
+        self.rules[rule_id] = self.rules.get(rule_id, 0.0) + seconds * 1000
+        HISTOGRAMS.observe_rule(rule_id, seconds)
+    
+    def hot_spots(self, limit: int = 5) -> List[Tuple[str, float]]:
+        """The slowest stages and rules, slowest first"""
+        entries = list(self.stages.items()) + [(f"rule:{rule_id}", ms) for rule_id, ms in self.rules.items()]
+        return sorted(entries, key=lambda entry: entry[1], reverse=True)[:limit]
@@ -0,0 +1,94 @@
+"""
+Corpus Features
+
+Turns the analyses of a query corpus into one NumPy feature matrix, a row
+per query, so that ranking and dashboards over millions of queries are array
+operations instead of loops over result dicts. Scoring is vectorized over the
+matrix and matches SQLOptimizerEngine's performance_score exactly.
+
+A ResultStore is read straight from its column arrays; any other iterable of
+results is stored in one first. NumPy is an optional dependency, needed only
+by this module.
+"""
+
+from typing import Iterable, Optional, Union
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover - depends on the environment
+    raise ImportError("query_features needs NumPy: pip install -r requirements-features.txt") from error
+
+from cost_model import MAX_WEIGHT, MIN_WEIGHT, REFERENCE_ROWS
+from results_store import COMPLEXITY_COUNTERS, COMPLEXITY_FLAGS, ResultStore
+from sql_optimizer_engine import SEVERITY_POINTS, OptimizationLevel, QueryAnalysisResult, SQLOptimizerEngine
+
+LEVELS = (OptimizationLevel.CRITICAL, OptimizationLevel.HIGH, OptimizationLevel.MEDIUM, OptimizationLevel.LOW)
+
+# Columns of the feature matrix. <level> counts the suggestions of that
+# severity; <level>_impact sums their cost-model impact weights, which
+# equals the count when no statistics were set.
+FEATURES = (
+    COMPLEXITY_COUNTERS
+    + COMPLEXITY_FLAGS
+    + tuple(level.value for level in LEVELS)
+    + tuple(f"{level.value}_impact" for level in LEVELS)
+)
+COLUMNS = {name: index for index, name in enumerate(FEATURES)}
+
+_IMPACT_COLUMNS = [COLUMNS[f"{level.value}_impact"] for level in LEVELS]
+_POINTS = np.array([SEVERITY_POINTS[level] for level in LEVELS], dtype=np.float64)
+
+def feature_matrix(results: Union[ResultStore, Iterable[QueryAnalysisResult]]) -> np.ndarray:
+    """A float64 matrix with one row per result and one column per FEATURES entry"""
+    store = results if isinstance(results, ResultStore) else ResultStore.from_results(results, keep_queries=False)
+    count = len(store)
+    matrix = np.zeros((count, len(FEATURES)), dtype=np.float64)
+    for name in COMPLEXITY_COUNTERS:
+        matrix[:, COLUMNS[name]] = np.frombuffer(store.counters[name], dtype=np.int32)
+    flags = np.frombuffer(store.flags, dtype=np.uint8)
+    for bit, name in enumerate(COMPLEXITY_FLAGS):
+        matrix[:, COLUMNS[name]] = (flags >> bit) & 1
+    
+    # Scatter every suggestion into its result's row and its level's columns
+    offsets = np.frombuffer(store._suggestion_offsets, dtype=np.uint64).astype(np.int64)
+    owners = np.repeat(np.arange(count), np.diff(offsets))
+    level_of_text = np.array([LEVELS.index(text.level) for text in store._texts], dtype=np.int64)
+    levels = level_of_text[np.frombuffer(store._suggestion_texts, dtype=np.uint32)]
+    first_level = COLUMNS[LEVELS[0].value]
+    np.add.at(matrix, (owners, first_level + levels), 1.0)
+    np.add.at(matrix, (owners, np.take(_IMPACT_COLUMNS, levels)),
+              impact_weights(np.frombuffer(store._estimated, dtype=np.int64)))
+    return matrix
+
+def impact_weights(estimated_rows: np.ndarray) -> np.ndarray:
+    """cost_model.impact_weight over an array of row estimates, negative meaning unknown"""
+    rows = estimated_rows.astype(np.float64)
+    weights = np.clip(np.log10(np.maximum(rows, 0) + 1) / np.log10(REFERENCE_ROWS), MIN_WEIGHT, MAX_WEIGHT)
+    return np.where(rows < 0, 1.0, weights)
+
+def scores(matrix: np.ndarray) -> np.ndarray:
+    """Performance scores (0-100) of every row, as the engine computes them one by one"""
+    deductions = matrix[:, _IMPACT_COLUMNS] @ _POINTS
+    return np.maximum(0, np.round(100 - deductions)).astype(np.int64)
+
+def rank(matrix: np.ndarray, weights: Optional[np.ndarray] = None, top: Optional[int] = None) -> np.ndarray:
+    """Row indexes from worst to best score
+    
+    With ``weights`` (e.g. total execution time per query) rows are ranked by
+    weight x score penalty instead, like workload.rank_shapes.
+    """
+    penalty = (100 - scores(matrix)).astype(np.float64)
+    if weights is not None:
+        penalty = penalty * weights
+    order = np.argsort(-penalty, kind='stable')
+    return order[:top] if top is not None else order
+
+def corpus_features(queries: Iterable[str], engine: Optional[SQLOptimizerEngine] = None,
+                    workers: Optional[int] = None) -> np.ndarray:
+    """Analyze a corpus (over the engine's worker pool) and return its feature matrix
+    
+    Results are streamed into a ResultStore without query texts, so memory
+    stays proportional to the number of queries, not to their text.
+    """
+    engine = engine or SQLOptimizerEngine()
+    return feature_matrix(ResultStore.from_results(engine.iter_analyze(queries, workers), keep_queries=False))
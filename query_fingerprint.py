@@ -0,0 +1,155 @@
+"""
+Query Fingerprinting
+
+Normalizes SQL text into a canonical "shape" so that queries differing only
+in literal values, IN-list length, letter case, comments or whitespace map
+to the same fingerprint. Literals are replaced by placeholders that keep the properties
+the optimization rules look at (leading/trailing LIKE wildcards, numeric or
+date-like strings). SQLOptimizerEngine runs its checks on the normalized
+text itself, so queries with the same fingerprint get the same suggestions.
+Fingerprints are SHA-1 based, so they are stable across
+processes and runs and can be stored alongside query logs.
+"""
+
+import hashlib
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlparse import lexer, tokens as T
+
+_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+# A parenthesized list of literal placeholders after IN, e.g. "in (?,'?',-?)"
+_LITERAL = r"""(?:-?\?|'[^']*'|"[^"]*")"""
+_IN_LIST = re.compile(rf"\bin \({_LITERAL}(?:,{_LITERAL})*\)")
+# Multi-row VALUES lists of literals, e.g. "values (?,?),(?,?)"
+_VALUES_ROWS = re.compile(rf"(\bvalues \({_LITERAL}(?:,{_LITERAL})*\))(?:,\({_LITERAL}(?:,{_LITERAL})*\))+")
+
+# Tokens that never need surrounding whitespace in the normalized text
+_TIGHT_BEFORE = frozenset({',', ')', '.', ';'})
+_TIGHT_AFTER = frozenset({'(', '.', ','})
+
+def _string_placeholder(value: str) -> str:
+    """Collapse a quoted literal to a placeholder that keeps its rule-relevant class"""
+    quote, inner = value[0], value[1:-1]
+    if inner.isascii() and inner.isdigit():
+        inner = '0'
+    elif _DATE.fullmatch(inner):
+        inner = '0000-00-00'
+    elif quote == '"':
+        # Double quotes usually delimit identifiers, which are part of the shape
+        return value
+    else:
+        inner = ('%' if inner.startswith('%') else '') + '?' + ('%' if inner.endswith('%') and len(inner) > 1 else '')
+    return f"{quote}{inner}{quote}"
+
+@lru_cache(maxsize=1024)
+def _is_symbolic_operator(ttype, value: str) -> bool:
+    return ttype in T.Operator and not value.isalpha()
+
+@lru_cache(maxsize=8192)
+def token_shape(ttype, value: str) -> Optional[str]:
+    """Normalized text of one lexer token, or None for whitespace and comments
+    
+    Memoized: keywords, names and punctuation repeat throughout a query, and
+    the token type checks are the bulk of normalizing one.
+    """
+    if ttype in T.Whitespace or ttype in T.Newline or ttype in T.Comment:
+        return None
+    if ttype in T.Literal.Number:
+        return '?'
+    if ttype in T.Literal.String.Single or ttype in T.Literal.String.Symbol:
+        return _string_placeholder(value)
+    value = value.lower()
+    if ttype in T.Keyword and not value.isalpha():
+        value = ' '.join(value.split())
+    return value
+
+def normalize_query(query: str) -> str:
+    """Return the canonical text of a query's shape
+    
+    Numbers become ``?``, string literals become class placeholders, IN-lists
+    and multi-row VALUES lists of literals collapse to a single element,
+    comments are dropped, keywords and identifiers are lower-cased, and
+    whitespace is collapsed to single spaces (and removed next to punctuation
+    and symbolic operators).
+    """
+    return normalize_tokens(lexer.tokenize(query))
+
+def normalize_tokens(tokens: Iterable[Tuple]) -> str:
+    """normalize_query for a query that is already lexed into (ttype, value) pairs"""
+    return join_pieces(token_pieces(tokens))
+
+def token_pieces(tokens: Iterable[Tuple]) -> List[str]:
+    """What normalize_tokens emits for each (ttype, value) token
+    
+    That is the token's shape, after a space where one is kept, or '' for
+    whitespace and comments. A token's piece depends only on the tokens
+    since the previous non-blank one, so callers that keep the pieces of a
+    token stream (see incremental) recompute them only around an edit.
+    """
+    pieces = []
+    pending_space = False
+    tight_after = True
+    for ttype, value in tokens:
+        value = token_shape(ttype, value)
+        if value is None:
+            pending_space = True
+            pieces.append('')
+            continue
+        
+        symbolic = _is_symbolic_operator(ttype, value)
+        tight = tight_after
+        tight_after = symbolic or value in _TIGHT_AFTER
+        if pending_space and not tight and not symbolic and value not in _TIGHT_BEFORE:
+            value = ' ' + value
+        pieces.append(value)
+        pending_space = False
+    return pieces
+    
+def join_pieces(pieces: Iterable[str]) -> str:
+    """normalize_tokens from token_pieces, which may start mid-stream (a space before the first token is dropped)"""
+    normalized = ''.join(pieces)
+    if normalized.startswith(' '):
+        normalized = normalized[1:]
+    normalized = normalized.rstrip('; ')
+    if 'in (' in normalized:
+        normalized = _IN_LIST.sub('in (?)', normalized)
+    if 'values (' in normalized:
+        normalized = _VALUES_ROWS.sub(r'\1', normalized)
+    return normalized
+
+def fingerprint_normalized(normalized: str) -> str:
+    """Fingerprint of text that is already the output of normalize_query"""
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()[:16]
+
+def fingerprint(query: str) -> str:
+    """Stable hex fingerprint of a query's normalized shape"""
+    return fingerprint_normalized(normalize_query(query))
+
+@dataclass
+class QueryShape:
+    """One distinct query shape seen in a stream of queries"""
+    fingerprint: str
+    normalized: str
+    example: str     # first query seen with this shape
+    count: int = 0
+
+def group_by_fingerprint(queries: Iterable[str]) -> Dict[str, QueryShape]:
+    """Deduplicate a stream of queries into shapes keyed by fingerprint
+    
+    Memory grows with the number of distinct shapes, not with the number of
+    queries, so large logs can be reduced to one representative per shape
+    before the expensive parse and rule evaluation.
+    """
+    shapes: Dict[str, QueryShape] = {}
+    for query in queries:
+        normalized = normalize_query(query)
+        key = fingerprint_normalized(normalized)
+        shape = shapes.get(key)
+        if shape is None:
+            shape = shapes[key] = QueryShape(key, normalized, query)
+        shape.count += 1
+    return shapes
@@ -0,0 +1,150 @@
+"""
+Query Predicates
+
+A single forward scan over the words of a query that collects the tables it
+reads (with their aliases), the column predicates of its WHERE and ON
+clauses and its ORDER BY columns. The cost model and the index advisor both
+work from this summary; it is deliberately approximate and never parses.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Words, literals and operators of a lower-cased query
+_WORD = re.compile(r"'(?:[^']|'')*'|\"[^\"]*\"|[\w.$]+|<=|>=|<>|!=|\S")
+
+COMPARISONS = frozenset({'=', '<', '>', '<=', '>=', '<>', '!=', 'in', 'like', 'between'})
+RANGE_OPERATORS = frozenset({'<', '>', '<=', '>=', 'between'})
+
+_NOT_ALIASES = frozenset({
+    'where', 'join', 'inner', 'left', 'right', 'full', 'outer', 'cross', 'natural',
+    'on', 'using', 'group', 'order', 'having', 'limit', 'offset', 'union', 'intersect',
+    'except', 'window', 'set', 'values', 'select', 'as', 'for', 'returning',
+})
+_ORDER_BY_END = frozenset({'limit', 'offset', 'fetch', 'union', 'intersect', 'except', 'for', ')', ';'})
+_SORT_MODIFIERS = frozenset({'asc', 'desc', 'nulls', 'first', 'last'})
+
+@dataclass
+class Predicate:
+    """A comparison of a column with a literal, IS [NOT] NULL, or with another column"""
+    qualifier: Optional[str]
+    column: str
+    op: str
+    value: Optional[str] = None                    # the literal word, if any
+    negated_null: Optional[bool] = None            # set for IS NULL / IS NOT NULL
+    other: Optional[Tuple[Optional[str], str]] = None  # (qualifier, column) of a join predicate
+    
+    @property
+    def is_join(self) -> bool:
+        return self.other is not None
+
+@dataclass
+class QueryScan:
+    """Tables, predicates and sort columns of one query"""
+    tables: List[str] = field(default_factory=list)
+    aliases: Dict[str, str] = field(default_factory=dict)  # alias (or table name) -> table name
+    predicates: List[Predicate] = field(default_factory=list)
+    order_by: List[Tuple[Optional[str], str]] = field(default_factory=list)
+    
+    def resolve(self, qualifier: Optional[str], column: str,
+                has_column: Optional[Callable[[str, str], bool]] = None) -> Optional[str]:
+        """Table a (possibly unqualified) column reference belongs to
+        
+        Unqualified columns resolve to the only referenced table that
+        ``has_column(table, column)`` accepts, or to the only table in the
+        query; otherwise they are ambiguous and None is returned.
+        """
+        if qualifier:
+            return self.aliases.get(qualifier)
+        if has_column is not None:
+            owners = [table for table in self.tables if has_column(table, column)]
+            if len(owners) == 1:
+                return owners[0]
+        return self.tables[0] if len(self.tables) == 1 else None
+
+def _is_literal(word: str) -> bool:
+    return word[0] in "'(?-" or word[0].isdigit()
+
+def _is_column(word: str) -> bool:
+    return (word[0].isalpha() or word[0] == '_') and word not in _NOT_ALIASES
+
+def _split(word: str) -> Tuple[Optional[str], str]:
+    qualifier, _, column = word.rpartition('.')
+    return qualifier or None, column
+
+def _scan_order_by(words: List[str], i: int, order_by: List[Tuple[Optional[str], str]]) -> int:
+    """Collect the leading plain-column ORDER BY items; return the index after the clause
+    
+    Only a prefix of plain columns can be served by an index, so collection
+    stops at the first expression.
+    """
+    items: List[List[str]] = [[]]
+    depth = 0
+    while i < len(words):
+        word = words[i]
+        if depth == 0 and word in _ORDER_BY_END:
+            break
+        if depth == 0 and word == ',':
+            items.append([])
+        else:
+            depth += (word == '(') - (word == ')')
+            items[-1].append(word)
+        i += 1
+    
+    for item in items:
+        if not item or not _is_column(item[0]) or any(word not in _SORT_MODIFIERS for word in item[1:]):
+            break
+        order_by.append(_split(item[0]))
+    return i
+
+def scan_query(query: str) -> QueryScan:
+    """Collect the tables, predicates and ORDER BY columns of a query
+    
+    Tables come from FROM and JOIN clauses, including comma-separated FROM
+    lists; the scan is linear in the length of the query.
+    """
+    words = _WORD.findall(query.lower())
+    scan = QueryScan()
+    count = len(words)
+    i = 0
+    in_from_list = False
+    while i < count:
+        word = words[i]
+        if word in ('from', 'join') or (word == ',' and in_from_list):
+            in_from_list = word != 'join'
+            i += 1
+            if i < count and words[i] not in ('(', 'select'):
+                table = words[i].split('.')[-1].strip('"')
+                alias = table
+                nxt = i + 1
+                if nxt < count and words[nxt] == 'as':
+                    nxt += 1
+                if nxt < count and words[nxt] not in _NOT_ALIASES and words[nxt][0].isalpha():
+                    alias = words[nxt]
+                    i = nxt
+                if table not in scan.tables:
+                    scan.tables.append(table)
+                scan.aliases[alias] = table
+                scan.aliases.setdefault(table, table)
+            continue
+        if word in _NOT_ALIASES:
+            in_from_list = False
+        
+        if word == 'order' and i + 1 < count and words[i + 1] == 'by':
+            i = _scan_order_by(words, i + 2, scan.order_by)
+            continue
+        
+        if i + 2 < count and _is_column(word):
+            op = words[i + 1]
+            operand = words[i + 2]
+            if op in COMPARISONS and _is_literal(operand):
+                scan.predicates.append(Predicate(*_split(word), op, value=operand))
+            elif op == '=' and _is_column(operand) and (i + 3 >= count or words[i + 3] != '('):
+                scan.predicates.append(Predicate(*_split(word), op, other=_split(operand)))
+            elif op == 'is':
+                negated = operand == 'not'
+                if words[i + 2 + negated:i + 3 + negated] == ['null']:
+                    scan.predicates.append(Predicate(*_split(word), op, negated_null=negated))
+        i += 1
+    return scan
@@ -0,0 +1,454 @@
+"""
+Query Rewriter
+
+Semantics-preserving rewrites applied to the sqlparse tree of a query, one
+after another. Each rewrite only fires when its preconditions can be
+proven from the query text and the schema catalog:
+
+- ``in_to_exists``: ``col IN (SELECT x FROM t WHERE ...)`` becomes a
+  correlated ``EXISTS`` (never ``NOT IN``, whose NULL handling differs)
+- ``union_all``: ``UNION`` becomes ``UNION ALL`` when every branch reads the
+  same table, selects one of its keys and filters a shared column on
+  distinct literals, so the branches can produce no duplicates
+- ``expand_star``: ``SELECT *`` and ``alias.*`` are expanded from the
+  catalog's column lists
+
+After every step the rewritten query is re-verified: it must parse as one
+statement of the same type, and if the original can be planned in the
+SQLite sandbox built from the catalog, so must the rewrite. A step that
+fails verification is dropped and reported as rejected. Verification never
+runs the queries, so it does not show that a rewrite returns the same rows;
+that rests on each rewrite's preconditions. ``python benchmarks.py execute``
+compares the rows of both queries on synthetic data.
+
+The sandbox holds only the catalog tables a query names, and both sandboxes
+and rewrite results are memoized per catalog (ddl_hash), so rewriting
+against a catalog of thousands of tables costs about what a small one does.
+"""
+
+import copy
+import re
+import sqlite3
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple
+
+import sqlparse
+from sqlparse import sql
+from sqlparse import tokens as T
+
+from schema_catalog import Schema, Table
+
+@dataclass
+class Transformation:
+    """One rewrite applied to (or rejected for) a query"""
+    name: str
+    description: str
+    before: str
+    after: str
+    error: Optional[str] = None  # why verification rejected the step
+
+@dataclass
+class RewriteResult:
+    """A query after the rewrite pipeline, with the steps that produced it"""
+    original: str
+    query: str
+    transformations: List[Transformation] = field(default_factory=list)
+    rejected: List[Transformation] = field(default_factory=list)
+    
+    @property
+    def changed(self) -> bool:
+        return self.query != self.original
+
+@dataclass
+class _Select:
+    """The top-level clauses of one SELECT (or one UNION branch)"""
+    tokens: List[sql.Token]
+    distinct: bool = False
+    columns: Optional[sql.Token] = None
+    sources: List[Tuple[str, str]] = field(default_factory=list)  # (table, qualifier) per FROM/JOIN item
+    plain_sources: bool = True  # False when a source is a subquery or function
+    from_tokens: List[sql.Token] = field(default_factory=list)
+    where: Optional[sql.Where] = None
+    clauses: List[str] = field(default_factory=list)  # other keywords: JOIN kinds, ON, USING, GROUP BY, ...
+
+_SOURCE_END = ('GROUP BY', 'ORDER BY', 'LIMIT', 'HAVING', 'OFFSET', 'WINDOW', 'FETCH', 'FOR')
+
+def _meaningful(tokens) -> List[sql.Token]:
+    return [token for token in tokens if not token.is_whitespace and token.ttype not in T.Comment]
+
+def _keyword(token: sql.Token) -> str:
+    return ' '.join(token.normalized.split()) if token.is_keyword else ''
+
+def _parse_select(tokens: List[sql.Token]) -> Optional[_Select]:
+    """Split one SELECT into its clauses; None if it is not a plain SELECT"""
+    words = _meaningful(tokens)
+    if not words or words[0].ttype is not T.DML or words[0].normalized != 'SELECT':
+        return None
+    select = _Select(tokens)
+    state = 'columns'
+    for token in words[1:]:
+        keyword = _keyword(token)
+        if isinstance(token, sql.Where):
+            select.where = token
+            state = 'tail'
+        elif state == 'columns':
+            if keyword in ('DISTINCT', 'ALL') and select.columns is None:
+                select.distinct = keyword == 'DISTINCT'
+            elif keyword == 'FROM':
+                state = 'from'
+            elif select.columns is None:
+                select.columns = token
+            else:
+                return None  # e.g. SELECT ... INTO
+        elif state in ('from', 'on'):
+            if keyword.endswith('JOIN') or keyword in ('ON', 'USING'):
+                select.clauses.append(keyword)
+                state = 'on' if keyword in ('ON', 'USING') else 'from'
+                continue
+            if keyword in _SOURCE_END:
+                select.clauses.append(keyword)
+                state = 'tail'
+                continue
+            if state == 'on':
+                continue
+            select.from_tokens.append(token)
+            items = token.get_identifiers() if isinstance(token, sql.IdentifierList) else [token]
+            for item in items:
+                if isinstance(item, sql.Identifier) and not any(
+                        isinstance(child, (sql.Parenthesis, sql.Function)) for child in item.tokens):
+                    table = item.get_real_name()
+                    select.sources.append((table, item.get_alias() or table))
+                elif not (item.ttype is T.Punctuation):
+                    select.plain_sources = False
+        elif keyword:
+            select.clauses.append(keyword)
+    return select
+
+class _Editor:
+    """Collects text replacements over a statement's character offsets"""
+    
+    def __init__(self, statement: sql.Statement):
+        self.text = str(statement)
+        self.offsets: Dict[int, int] = {}
+        offset = 0
+        for leaf in statement.flatten():
+            self.offsets[id(leaf)] = offset
+            offset += len(leaf.value)
+        self.edits: List[Tuple[int, int, str]] = []
+    
+    def span(self, token: sql.Token) -> Tuple[int, int]:
+        leaves = list(token.flatten()) if token.is_group else [token]
+        start = self.offsets[id(leaves[0])]
+        end = self.offsets[id(leaves[-1])] + len(leaves[-1].value)
+        return start, end
+    
+    def replace(self, first: sql.Token, last: sql.Token, text: str):
+        self.edits.append((self.span(first)[0], self.span(last)[1], text))
+    
+    def apply(self) -> str:
+        text = self.text
+        for start, end, replacement in sorted(self.edits, reverse=True):
+            text = text[:start] + replacement + text[end:]
+        return text
+
+def _text(tokens: List[sql.Token]) -> str:
+    return ''.join(str(token) for token in tokens).strip()
+
+def _branches(statement: sql.Statement) -> Tuple[List[_Select], List[sql.Token]]:
+    """Top-level SELECTs of a statement and the set operators between them"""
+    parts: List[List[sql.Token]] = [[]]
+    operators: List[sql.Token] = []
+    for token in statement.tokens:
+        if _keyword(token) in ('UNION', 'UNION ALL', 'INTERSECT', 'EXCEPT', 'MINUS'):
+            operators.append(token)
+            parts.append([])
+        else:
+            parts[-1].append(token)
+    selects = [_parse_select(part) for part in parts]
+    return ([] if None in selects else selects), operators
+
+def _plain_column(token: sql.Token) -> Optional[Tuple[Optional[str], str]]:
+    """(qualifier, column) of a bare column reference, or None"""
+    if not isinstance(token, sql.Identifier):
+        return None
+    words = _meaningful(token.tokens)
+    if len(words) == 1 and words[0].ttype in T.Name:
+        return None, words[0].value
+    if len(words) == 3 and words[0].ttype in T.Name and words[1].match(T.Punctuation, '.') \
+            and words[2].ttype in T.Name:
+        return words[0].value, words[2].value
+    return None
+
+def _conjuncts(where: sql.Where) -> Optional[List[sql.Token]]:
+    """Top-level AND-ed terms of a WHERE clause, or None if it uses OR or NOT"""
+    terms: List[List[sql.Token]] = [[]]
+    for token in _meaningful(where.tokens)[1:]:
+        keyword = _keyword(token)
+        if keyword in ('OR', 'NOT'):
+            return None
+        if keyword == 'AND':
+            terms.append([])
+        else:
+            terms[-1].append(token)
+    return [term[0] for term in terms if len(term) == 1]
+
+def _negation_free(where: sql.Where) -> bool:
+    """Whether a WHERE clause has no top-level NOT"""
+    # NOT anywhere at the top level could negate the IN, where NULLs make
+    # NOT IN and NOT EXISTS differ
+    return not any(_keyword(token) == 'NOT' for token in where.tokens)
+
+def _in_to_exists(statement: sql.Statement, schema: Schema) -> Optional[Tuple[str, str]]:
+    """Turn ``col IN (SELECT ...)`` in a top-level WHERE into a correlated EXISTS"""
+    selects, _ = _branches(statement)
+    editor = _Editor(statement)
+    rewritten = []
+    for select in selects:
+        if select.where is None or not _negation_free(select.where):
+            continue
+        words = _meaningful(select.where.tokens)
+        for i in range(1, len(words) - 2):
+            column, keyword, subquery = words[i:i + 3]
+            if _keyword(keyword) != 'IN' or not isinstance(subquery, sql.Parenthesis):
+                continue
+            outer = _plain_column(column)
+            inner = _parse_select(subquery.tokens[1:-1])
+            if outer is None or inner is None or _keyword(words[i - 1]) not in ('WHERE', 'AND'):
+                continue
+            if len(inner.sources) != 1 or not inner.plain_sources or inner.clauses or inner.distinct:
+                continue
+            inner_column = _plain_column(inner.columns)
+            outer_qualifier = outer[0] or (select.sources[0][1] if len(select.sources) == 1 else None)
+            inner_qualifier = inner.sources[0][1]
+            if inner_column is None or outer_qualifier is None or \
+                    outer_qualifier.lower() == inner_qualifier.lower() or \
+                    (inner_column[0] and inner_column[0].lower() != inner_qualifier.lower()):
+                continue
+            
+            correlation = f'{inner_qualifier}.{inner_column[1]} = {outer_qualifier}.{outer[1]}'
+            condition = ''
+            if inner.where is not None:
+                condition = _text(inner.where.tokens[1:])
+                if _conjuncts(inner.where) is None:
+                    condition = f'({condition})'
+                condition += ' AND '
+            editor.replace(column, subquery,
+                           f'EXISTS (SELECT 1 FROM {_text(inner.from_tokens)} WHERE {condition}{correlation})')
+            rewritten.append(f'{outer[1]} IN (SELECT {inner_column[1]} ...)')
+    if not rewritten:
+        return None
+    return editor.apply(), 'Rewrote ' + ', '.join(rewritten) + ' as correlated EXISTS'
+
+def _key_columns(table: Table, schema: Schema) -> List[Tuple[str, ...]]:
+    """Column sets that identify a row: the primary key and NOT NULL unique keys"""
+    not_null = {column.name.lower() for column in table.columns if column.not_null or column.is_primary}
+    keys = [tuple(column.lower() for column in table.primary_key)] if table.primary_key else []
+    keys += [(column.name.lower(),) for column in table.columns if column.is_unique and column.not_null]
+    for index in schema.indexes_on(table.name):
+        columns = tuple(column.lower() for column in index.columns)
+        if (index.unique or index.primary) and set(columns) <= not_null:
+            keys.append(columns)
+    return keys
+
+def _literal(token: sql.Token) -> Optional[Tuple[str, object]]:
+    """Comparable form of a literal; strings compare case- and trailing-space-insensitively"""
+    if token.ttype in T.String.Single:
+        return 'string', token.value[1:-1].replace("''", "'").lower().rstrip()
+    if token.ttype in T.Number:
+        return 'number', float(token.value)
+    return None
+
+def _equalities(select: _Select) -> Dict[str, Tuple[str, object]]:
+    """column -> literal for the ``column = literal`` terms of a branch's WHERE"""
+    if select.where is None:
+        return {}
+    found = {}
+    for term in _conjuncts(select.where) or ():
+        if not isinstance(term, sql.Comparison):
+            continue
+        words = _meaningful(term.tokens)
+        if len(words) != 3 or words[1].value != '=':
+            continue
+        column = _plain_column(words[0])
+        literal = _literal(words[2])
+        if column is not None and literal is not None:
+            found[column[1].lower()] = literal
+    return found
+
+def _union_all(statement: sql.Statement, schema: Schema) -> Optional[Tuple[str, str]]:
+    """Turn UNION into UNION ALL when the branches provably return distinct rows"""
+    selects, operators = _branches(statement)
+    if not operators or any(_keyword(op) != 'UNION' for op in operators):
+        return None
+    tables = {select.sources[0][0].lower() for select in selects if len(select.sources) == 1}
+    table = schema.table(tables.pop()) if len(tables) == 1 else None
+    if table is None:
+        return None
+    select_lists = set()
+    for number, select in enumerate(selects):
+        allowed = ('ORDER BY', 'LIMIT', 'OFFSET') if number == len(selects) - 1 else ()
+        if len(select.sources) != 1 or not select.plain_sources or select.columns is None or \
+                any(clause not in allowed for clause in select.clauses):
+            return None
+        select_lists.add(' '.join(str(select.columns).lower().split()))
+    if len(select_lists) != 1:
+        return None
+    
+    # Every branch must return whole-key columns, so it has no duplicates
+    # itself and equal rows across branches would mean the same table row
+    columns_token = selects[0].columns
+    if columns_token.ttype is T.Wildcard:
+        selected = {column.name.lower() for column in table.columns}
+    else:
+        items = columns_token.get_identifiers() if isinstance(columns_token, sql.IdentifierList) else [columns_token]
+        references = [_plain_column(item) for item in items]
+        if None in references:
+            return None
+        selected = {column.lower() for _, column in references}
+    if not any(key and set(key) <= selected for key in _key_columns(table, schema)):
+        return None
+    
+    # ... and some column must be compared with a different literal in each branch
+    equalities = [_equalities(select) for select in selects]
+    for column in set.intersection(*(set(found) for found in equalities)):
+        literals = [found[column] for found in equalities]
+        if len({kind for kind, _ in literals}) == 1 and len(set(literals)) == len(literals):
+            editor = _Editor(statement)
+            for op in operators:
+                editor.replace(op, op, 'UNION ALL')
+            return editor.apply(), f'Replaced UNION with UNION ALL: branches select a key of {table.name} ' \
+                                   f'and filter {column} on distinct values'
+    return None
+
+def _expand_star(statement: sql.Statement, schema: Schema) -> Optional[Tuple[str, str]]:
+    """Replace ``*`` and ``alias.*`` in top-level select lists with catalog columns"""
+    selects, _ = _branches(statement)
+    editor = _Editor(statement)
+    expanded = []
+    for select in selects:
+        if select.columns is None or not select.plain_sources or not select.sources or \
+                any(clause == 'USING' or clause.startswith('NATURAL') for clause in select.clauses):
+            continue
+        sources = [(schema.table(table), qualifier) for table, qualifier in select.sources]
+        if any(table is None or not table.columns for table, _ in sources):
+            continue
+        items = select.columns.get_identifiers() if isinstance(select.columns, sql.IdentifierList) \
+            else [select.columns]
+        for item in items:
+            if item.ttype is T.Wildcard:
+                if len(sources) == 1:
+                    names = [column.name for column in sources[0][0].columns]
+                else:
+                    names = [f'{qualifier}.{column.name}' for table, qualifier in sources for column in table.columns]
+            elif isinstance(item, sql.Identifier) and item.is_wildcard():
+                qualifier = item.get_parent_name()
+                matches = [(table, q) for table, q in sources if qualifier and q.lower() == qualifier.lower()]
+                if len(matches) != 1:
+                    continue
+                names = [f'{qualifier}.{column.name}' for column in matches[0][0].columns]
+            else:
+                continue
+            editor.replace(item, item, ', '.join(names))
+            expanded.append(str(item))
+    if not expanded:
+        return None
+    return editor.apply(), 'Expanded ' + ', '.join(expanded) + ' from the schema catalog'
+
+# Applied in this order; each step sees the output of the previous one
+REWRITES: List[Tuple[str, Callable[[sql.Statement, Schema], Optional[Tuple[str, str]]]]] = [
+    ('in_to_exists', _in_to_exists),
+    ('union_all', _union_all),
+    ('expand_star', _expand_star),
+]
+
+def _verify(before: str, after: str, statement_type: str, conn: Optional[sqlite3.Connection]) -> Optional[str]:
+    """Why a rewrite must be rejected, or None if it checks out"""
+    statements = [s for s in sqlparse.parse(after) if str(s).strip()]
+    if len(statements) != 1 or statements[0].get_type() != statement_type:
+        return 'rewrite does not parse as a single statement of the same type'
+    if conn is not None:
+        from plan_validation import explain
+        try:
+            explain(conn, before)
+        except sqlite3.Error:
+            return None  # the sandbox cannot plan this dialect; parsing is all we can check
+        try:
+            explain(conn, after)
+        except sqlite3.Error as error:
+            return f'rewrite cannot be planned: {error}'
+    return None
+
+# Verification sandboxes per (ddl_hash, tables) and rewrite results per
+# (ddl_hash, query). Sandboxes are only ever planned against, so threads share them
+SANDBOX_MEMO_SIZE = 64
+REWRITE_MEMO_SIZE = 1024
+_sandboxes: "OrderedDict[Tuple[str, FrozenSet[str]], sqlite3.Connection]" = OrderedDict()
+_rewrites: "OrderedDict[Tuple[str, str], RewriteResult]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+_WORD = re.compile(r'\w+')
+
+def _memo_get(memo: OrderedDict, key):
+    with _memo_lock:
+        value = memo.get(key)
+        if value is not None:
+            memo.move_to_end(key)
+        return value
+
+def _memo_put(memo: OrderedDict, key, value, size: int):
+    with _memo_lock:
+        memo[key] = value
+        while len(memo) > size:
+            memo.popitem(last=False)
+
+def _sandbox(schema: Schema, query: str) -> sqlite3.Connection:
+    """The sandbox with the catalog tables a query names, built on first use"""
+    tables = frozenset(word for word in set(_WORD.findall(query.lower())) if schema.table(word) is not None)
+    key = (schema.ddl_hash, tables)
+    conn = _memo_get(_sandboxes, key)
+    if conn is None:
+        from plan_validation import build_sandbox
+        conn = build_sandbox(schema, tables=tables, check_same_thread=False)
+        _memo_put(_sandboxes, key, conn, SANDBOX_MEMO_SIZE)
+    return conn
+
+def rewrite_query(query: str, schema: Schema) -> RewriteResult:
+    """Run every rewrite in REWRITES over a query, verifying each step
+    
+    Results are memoized per catalog and query text; each call gets its
+    own copy.
+    """
+    key = (schema.ddl_hash, query)
+    result = _memo_get(_rewrites, key)
+    if result is None:
+        result = _rewrite(query, schema)
+        _memo_put(_rewrites, key, result, REWRITE_MEMO_SIZE)
+    return copy.deepcopy(result)
+
+def _rewrite(query: str, schema: Schema) -> RewriteResult:
+    result = RewriteResult(query, query)
+    statements = [s for s in sqlparse.parse(query) if str(s).strip()]
+    if len(statements) != 1:
+        return result
+    statement = statements[0]
+    statement_type = statement.get_type()
+    
+    conn = None
+    for name, rewrite in REWRITES:
+        rewritten = rewrite(statement, schema)
+        if rewritten is None:
+            continue
+        after, description = rewritten
+        if conn is None and schema.tables:
+            conn = _sandbox(schema, query)  # only once a step needs verifying
+        step = Transformation(name, description, result.query, after)
+        step.error = _verify(result.query, after, statement_type, conn)
+        if step.error:
+            result.rejected.append(step)
+        else:
+            result.transformations.append(step)
+            result.query = after
+            statement = sqlparse.parse(after)[0]
+    return result
@@ -0,0 +1,170 @@
+"""
+Report Formats
+
+Renders analysis results as Markdown, JSON or NDJSON, chunk by chunk. Every
+renderer is a generator, so a batch of any size can be written straight to a
+file or socket (see write_results) without building the whole report as one
+string first.
+
+JSON and NDJSON share one compact, versioned record per result (see
+result_record). Downstream tooling can rely on its keys: new keys may be
+added, but existing ones keep their name and meaning within a
+SCHEMA_VERSION. Results read back from a ResultStore render the same way.
+"""
+
+import json
+from typing import Dict, Iterable, Iterator, TextIO
+
+from sql_optimizer_engine import OptimizationLevel, QueryAnalysisResult
+
+SCHEMA_VERSION = 1
+
+LEVEL_EMOJI = {
+    OptimizationLevel.CRITICAL: "🚨",
+    OptimizationLevel.HIGH: "⚠️",
+    OptimizationLevel.MEDIUM: "⚡",
+    OptimizationLevel.LOW: "💡"
+}
+
+_COMPACT = (',', ':')
+
+def result_record(analysis: QueryAnalysisResult) -> Dict:
+    """The JSON record of one result
+    
+    Always present: ``v`` (SCHEMA_VERSION), ``query``, ``score``,
+    ``complete``, ``complexity`` and ``suggestions``, each suggestion with
+    ``rule``, ``level``, ``category``, ``issue`` and ``suggestion``.
+    Present only when set: ``skipped_rules``, ``profile`` and, per
+    suggestion, ``optimized_query``, ``index_recommendation`` and
+    ``estimated_rows``.
+    """
+    record = {
+        'v': SCHEMA_VERSION,
+        'query': analysis.original_query,
+        'score': analysis.performance_score,
+        'complete': analysis.complete,
+        'complexity': analysis.complexity_analysis,
+        'suggestions': [],
+    }
+    for suggestion in analysis.suggestions:
+        entry = {
+            'rule': suggestion.rule_id,
+            'level': suggestion.level.value,
+            'category': suggestion.category,
+            'issue': suggestion.issue,
+            'suggestion': suggestion.suggestion,
+        }
+        if suggestion.optimized_query is not None:
+            entry['optimized_query'] = suggestion.optimized_query
+        if suggestion.index_recommendation is not None:
+            entry['index_recommendation'] = suggestion.index_recommendation
+        if suggestion.estimated_rows is not None:
+            entry['estimated_rows'] = suggestion.estimated_rows
+        record['suggestions'].append(entry)
+    if analysis.skipped_rules:
+        record['skipped_rules'] = list(analysis.skipped_rules)
+    profile = getattr(analysis, 'profile', None)  # a StoredResult has none
+    if profile is not None:
+        record['profile'] = {'stages': profile.stages, 'rules': profile.rules}
+    return record
+
+def encode_record(record: Dict) -> str:
+    """One record as a compact JSON line"""
+    return json.dumps(record, ensure_ascii=False, separators=_COMPACT) + "\n"
+
+def iter_markdown(analysis: QueryAnalysisResult) -> Iterator[str]:
+    """The Markdown report of one result, in chunks (format_analysis_result joins them)"""
+    yield "# SQL Query Analysis Report\n\n"
+    yield f"**Performance Score:** {analysis.performance_score}/100\n\n"
+    if not analysis.complete:
+        yield (f"⏱️ **Partial analysis:** the time budget ran out before "
+               f"{len(analysis.skipped_rules)} check(s) ran: {', '.join(analysis.skipped_rules)}\n\n")
+    
+    suggestions = analysis.suggestions
+    if suggestions:
+        yield "## 🔍 Query Analysis\n\n"
+        
+        # Group suggestions by category
+        categories = {}
+        for suggestion in suggestions:
+            categories.setdefault(suggestion.category, []).append(suggestion)
+        
+        for category, grouped in categories.items():
+            yield f"### {category}\n\n"
+            for suggestion in grouped:
+                yield f"{LEVEL_EMOJI.get(suggestion.level, '📝')} **{suggestion.level.value.title()} Priority**\n\n"
+                yield f"**Issue:** {suggestion.issue}\n\n"
+                yield f"**Recommendation:** {suggestion.suggestion}\n\n"
+                if suggestion.optimized_query:
+                    yield f"**Optimized Query:**\n```sql\n{suggestion.optimized_query}\n```\n\n"
+                if suggestion.index_recommendation:
+                    yield f"**Index Recommendations:**\n```sql\n{suggestion.index_recommendation}\n```\n\n"
+                if suggestion.estimated_rows is not None:
+                    yield f"**Estimated Rows Affected:** {suggestion.estimated_rows:,}\n\n"
+                yield "---\n\n"
+    elif analysis.complete:
+        yield "## ✅ Great Job!\n\nYour query looks well-optimized. No major issues detected.\n\n"
+    
+    # Complexity analysis
+    complexity = analysis.complexity_analysis
+    yield (
+        f"## 📊 Complexity Analysis\n\n"
+        f"- **Joins:** {complexity.get('join_count', 0)}\n"
+        f"- **Subqueries:** {complexity.get('subquery_count', 0)}\n"
+        f"- **WHERE Conditions:** {complexity.get('where_conditions', 0)}\n"
+        f"- **Has ORDER BY:** {'Yes' if complexity.get('has_order_by') else 'No'}\n"
+        f"- **Has GROUP BY:** {'Yes' if complexity.get('has_group_by') else 'No'}\n"
+        f"- **Has HAVING:** {'Yes' if complexity.get('has_having') else 'No'}\n"
+    )
+    for table, rows in complexity.get('estimated_rows', {}).items():
+        yield f"- **Estimated Rows from {table}:** {rows:,}\n"
+    yield "\n"
+
+def iter_markdown_batch(results: Iterable[QueryAnalysisResult]) -> Iterator[str]:
+    """Markdown reports of many results, separated by horizontal rules"""
+    for number, analysis in enumerate(results):
+        if number:
+            yield "\n***\n\n"
+        yield from iter_markdown(analysis)
+
+def iter_json(results: Iterable[QueryAnalysisResult]) -> Iterator[str]:
+    """One JSON array of result records, yielded a record at a time"""
+    yield "["
+    for number, analysis in enumerate(results):
+        if number:
+            yield ","
+        yield encode_record(result_record(analysis))[:-1]
+    yield "]\n"
+
+def iter_ndjson(results: Iterable[QueryAnalysisResult]) -> Iterator[str]:
+    """One result record per line"""
+    for analysis in results:
+        yield encode_record(result_record(analysis))
+
+FORMATS = {
+    'markdown': iter_markdown_batch,
+    'json': iter_json,
+    'ndjson': iter_ndjson,
+}
+
+def render(results: Iterable[QueryAnalysisResult], fmt: str = 'ndjson') -> Iterator[str]:
+    """Chunks of a FORMATS report of the results"""
+    try:
+        renderer = FORMATS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {', '.join(FORMATS)}") from None
+    return renderer(results)
+
+def write_results(results: Iterable[QueryAnalysisResult], stream: TextIO, fmt: str = 'ndjson') -> int:
+    """Write a report to a text stream as it is rendered; returns the number of results written"""
+    count = 0
+    
+    def counted():
+        nonlocal count
+        for analysis in results:
+            count += 1
+            yield analysis
+    
+    for chunk in render(counted(), fmt):
+        stream.write(chunk)
+    return count
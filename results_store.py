@@ -0,0 +1,255 @@
+"""
+Compact Results Store
+
+Holds the analyses of a large workload in a fraction of the memory of a list
+of QueryAnalysisResult objects. Scores, complexity counters and flags live
+in column arrays, one entry per result; suggestions are references into a
+table of interned (rule, level, category, issue, suggestion) texts, since a
+workload repeats the same few dozen messages millions of times; query texts
+and rendered queries are packed as UTF-8 into one buffer each.
+
+Reading a result back returns a lightweight StoredResult view; suggestion
+objects and query strings are only rebuilt when they are accessed. Profiles
+are not kept.
+"""
+
+from array import array
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sql_optimizer_engine import RULE_IDS, OptimizationLevel, OptimizationSuggestion, QueryAnalysisResult
+
+COMPLEXITY_COUNTERS = ('join_count', 'subquery_count', 'where_conditions')
+COMPLEXITY_FLAGS = ('has_order_by', 'has_group_by', 'has_having')
+_COMPLETE = 1 << len(COMPLEXITY_FLAGS)  # flag bit of QueryAnalysisResult.complete
+_NONE = -1
+
+_RULE_BITS = {rule_id: 1 << bit for bit, rule_id in enumerate(RULE_IDS)}
+
+class _TextColumn:
+    """Strings packed as UTF-8 into one buffer, addressed by insertion index"""
+    __slots__ = ('_data', '_offsets')
+    
+    def __init__(self):
+        self._data = bytearray()
+        self._offsets = array('Q', [0])
+    
+    def append(self, text: str) -> int:
+        self._data += text.encode('utf-8', 'surrogatepass')
+        self._offsets.append(len(self._data))
+        return len(self._offsets) - 2
+    
+    def __getitem__(self, index: int) -> str:
+        return self._data[self._offsets[index]:self._offsets[index + 1]].decode('utf-8', 'surrogatepass')
+    
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+    
+    def nbytes(self) -> int:
+        return len(self._data) + self._offsets.itemsize * len(self._offsets)
+
+class SuggestionText:
+    """The interned, query-independent part of a suggestion"""
+    __slots__ = ('rule_id', 'level', 'category', 'issue', 'suggestion')
+    
+    def __init__(self, rule_id: Optional[str], level: OptimizationLevel, category: str, issue: str, suggestion: str):
+        self.rule_id = rule_id
+        self.level = level
+        self.category = category
+        self.issue = issue
+        self.suggestion = suggestion
+
+class StoredResult:
+    """Read-only view of one stored result; rebuilds text fields on access"""
+    __slots__ = ('_store', 'index')
+    
+    def __init__(self, store: 'ResultStore', index: int):
+        self._store = store
+        self.index = index
+    
+    @property
+    def original_query(self) -> Optional[str]:
+        """The query text, or None for a store created with keep_queries=False"""
+        store = self._store
+        return store._queries[self.index] if store._queries is not None else None
+    
+    @property
+    def performance_score(self) -> int:
+        return self._store.scores[self.index]
+    
+    @property
+    def complete(self) -> bool:
+        return bool(self._store.flags[self.index] & _COMPLETE)
+    
+    @property
+    def skipped_rules(self) -> List[str]:
+        mask = self._store.skipped[self.index]
+        return [rule_id for rule_id, bit in _RULE_BITS.items() if mask & bit]
+    
+    @property
+    def complexity_analysis(self) -> Dict:
+        store, index = self._store, self.index
+        if index in store._empty_complexity:
+            return {}
+        complexity: Dict = {name: store.counters[name][index] for name in COMPLEXITY_COUNTERS}
+        flags = store.flags[index]
+        for bit, name in enumerate(COMPLEXITY_FLAGS):
+            complexity[name] = bool(flags & (1 << bit))
+        if index in store._estimated_rows:
+            complexity['estimated_rows'] = dict(store._estimated_rows[index])
+        return complexity
+    
+    @property
+    def rule_ids(self) -> List[Optional[str]]:
+        """Rule ids of the suggestions, without building the suggestions"""
+        store = self._store
+        start, end = store._suggestion_offsets[self.index], store._suggestion_offsets[self.index + 1]
+        return [store._texts[text_id].rule_id for text_id in store._suggestion_texts[start:end]]
+    
+    @property
+    def suggestions(self) -> List[OptimizationSuggestion]:
+        store = self._store
+        start, end = store._suggestion_offsets[self.index], store._suggestion_offsets[self.index + 1]
+        return [store._suggestion(position) for position in range(start, end)]
+    
+    def to_result(self) -> QueryAnalysisResult:
+        """A full QueryAnalysisResult with the stored contents (without a profile)"""
+        return QueryAnalysisResult(
+            original_query=self.original_query,
+            suggestions=self.suggestions,
+            performance_score=self.performance_score,
+            complexity_analysis=self.complexity_analysis,
+            complete=self.complete,
+            skipped_rules=self.skipped_rules
+        )
+
+class ResultStore:
+    """Append-only, column-oriented store of analysis results"""
+    
+    def __init__(self, keep_queries: bool = True):
+        """Pass ``keep_queries=False`` to drop query texts, often the largest part of a workload"""
+        self._queries: Optional[_TextColumn] = _TextColumn() if keep_queries else None
+        # One entry per result
+        self.scores = array('B')
+        self.counters: Dict[str, array] = {name: array('i') for name in COMPLEXITY_COUNTERS}
+        self.flags = array('B')    # COMPLEXITY_FLAGS bits, then _COMPLETE
+        self.skipped = array('I')  # bit i set: RULE_IDS[i] was skipped by a deadline
+        self._suggestion_offsets = array('Q', [0])
+        self._estimated_rows: Dict[int, Tuple[Tuple[str, int], ...]] = {}  # only results with statistics
+        self._empty_complexity = set()  # results whose complexity stage did not run
+        # One entry per suggestion
+        self._suggestion_texts = array('I')  # index into _texts
+        self._optimized = array('q')         # index into _rendered, or _NONE
+        self._index_recommendations = array('q')
+        self._estimated = array('q')         # estimated_rows, or _NONE
+        self._rendered = _TextColumn()
+        # Interned suggestion texts
+        self._texts: List[SuggestionText] = []
+        self._text_ids: Dict[Tuple, int] = {}
+    
+    @classmethod
+    def from_results(cls, results: Iterable[QueryAnalysisResult], keep_queries: bool = True) -> 'ResultStore':
+        """Fill a store from any iterable, e.g. SQLOptimizerEngine.iter_analyze, without holding the results"""
+        store = cls(keep_queries)
+        store.extend(results)
+        return store
+    
+    def append(self, result: QueryAnalysisResult) -> int:
+        """Store one result and return its index"""
+        index = len(self.scores)
+        if self._queries is not None:
+            self._queries.append(result.original_query)
+        self.scores.append(max(0, min(100, result.performance_score)))
+        
+        complexity = result.complexity_analysis
+        if not complexity:
+            self._empty_complexity.add(index)
+        for name in COMPLEXITY_COUNTERS:
+            self.counters[name].append(complexity.get(name, 0))
+        flags = _COMPLETE if result.complete else 0
+        for bit, name in enumerate(COMPLEXITY_FLAGS):
+            if complexity.get(name):
+                flags |= 1 << bit
+        self.flags.append(flags)
+        if complexity.get('estimated_rows'):
+            self._estimated_rows[index] = tuple(complexity['estimated_rows'].items())
+        
+        mask = 0
+        for rule_id in result.skipped_rules:
+            mask |= _RULE_BITS[rule_id]
+        self.skipped.append(mask)
+        
+        for suggestion in result.suggestions:
+            self._suggestion_texts.append(self._intern(suggestion))
+            self._optimized.append(self._render(suggestion.optimized_query))
+            self._index_recommendations.append(self._render(suggestion.index_recommendation))
+            self._estimated.append(suggestion.estimated_rows if suggestion.estimated_rows is not None else _NONE)
+        self._suggestion_offsets.append(len(self._suggestion_texts))
+        return index
+    
+    def extend(self, results: Iterable[QueryAnalysisResult]):
+        for result in results:
+            self.append(result)
+    
+    def _intern(self, suggestion: OptimizationSuggestion) -> int:
+        key = (suggestion.rule_id, suggestion.level, suggestion.category, suggestion.issue, suggestion.suggestion)
+        text_id = self._text_ids.get(key)
+        if text_id is None:
+            text_id = self._text_ids[key] = len(self._texts)
+            self._texts.append(SuggestionText(*key))
+        return text_id
+    
+    def _render(self, text: Optional[str]) -> int:
+        return self._rendered.append(text) if text is not None else _NONE
+    
+    def _suggestion(self, position: int) -> OptimizationSuggestion:
+        text = self._texts[self._suggestion_texts[position]]
+        optimized = self._optimized[position]
+        index_recommendation = self._index_recommendations[position]
+        estimated = self._estimated[position]
+        return OptimizationSuggestion(
+            level=text.level,
+            category=text.category,
+            issue=text.issue,
+            suggestion=text.suggestion,
+            optimized_query=self._rendered[optimized] if optimized != _NONE else None,
+            index_recommendation=self._rendered[index_recommendation] if index_recommendation != _NONE else None,
+            rule_id=text.rule_id,
+            estimated_rows=estimated if estimated != _NONE else None
+        )
+    
+    def __len__(self) -> int:
+        return len(self.scores)
+    
+    def __getitem__(self, index: int) -> StoredResult:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return StoredResult(self, index)
+    
+    def __iter__(self) -> Iterator[StoredResult]:
+        return (StoredResult(self, index) for index in range(len(self)))
+    
+    @property
+    def texts(self) -> List[SuggestionText]:
+        """The distinct suggestion texts seen so far"""
+        return list(self._texts)
+    
+    def rule_counts(self) -> Dict[Optional[str], int]:
+        """Suggestions per rule id across all results, counted on the interned ids"""
+        per_text = [0] * len(self._texts)
+        for text_id in self._suggestion_texts:
+            per_text[text_id] += 1
+        counts: Dict[Optional[str], int] = {}
+        for text, count in zip(self._texts, per_text):
+            counts[text.rule_id] = counts.get(text.rule_id, 0) + count
+        return counts
+    
+    def nbytes(self) -> int:
+        """Approximate size of the column buffers (the interned texts not included)"""
+        columns = [self.scores, self.flags, self.skipped, self._suggestion_offsets, self._suggestion_texts,
+                   self._optimized, self._index_recommendations, self._estimated, *self.counters.values()]
+        size = sum(column.itemsize * len(column) for column in columns) + self._rendered.nbytes()
+        if self._queries is not None:
+            size += self._queries.nbytes()
+        return size
@@ -0,0 +1,508 @@
+"""
+Schema Catalog
+
+Parses DDL once into an immutable catalog shared by the optimizer engine and
+the query generator. Catalogs are memoized by a hash of the DDL text, so
+re-submitting the same schema costs a hash and a dictionary lookup instead
+of a full parse.
+
+The parser works on a token stream rather than on regular expressions over
+the raw text, so nested parentheses (DECIMAL(10,2)), quoted identifiers,
+comments, table-level constraints, CREATE INDEX and the ALTER TABLE ... ADD
+CONSTRAINT statements found in schema dumps are all handled in one pass.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+SCHEMA_MEMO_SIZE = 16
+
+@dataclass(frozen=True)
+class Column:
+    """A column of a table"""
+    name: str
+    type: str
+    is_primary: bool = False
+    not_null: bool = False
+    is_unique: bool = False
+    references: Optional[Tuple[str, str]] = None  # (table, column)
+
+@dataclass(frozen=True)
+class ForeignKey:
+    """A foreign key from columns of one table to columns of another"""
+    table: str
+    columns: Tuple[str, ...]
+    ref_table: str
+    ref_columns: Tuple[str, ...]
+
+@dataclass(frozen=True)
+class Index:
+    """An index declared with CREATE INDEX or implied by a PRIMARY KEY/UNIQUE constraint"""
+    name: Optional[str]
+    table: str
+    columns: Tuple[str, ...]
+    unique: bool = False
+    primary: bool = False
+
+@dataclass(frozen=True)
+class Table:
+    """A table and its columns, in declaration order"""
+    name: str
+    columns: Tuple[Column, ...]
+    primary_key: Tuple[str, ...] = ()
+    foreign_keys: Tuple[ForeignKey, ...] = ()
+    _by_name: Dict[str, Column] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        self._by_name.update((column.name, column) for column in self.columns)
+    
+    def column(self, name: str) -> Optional[Column]:
+        return self._by_name.get(name.lower())
+
+@dataclass(frozen=True)
+class Schema:
+    """Immutable catalog of tables with lookup indexes by table and column name"""
+    ddl_hash: str
+    tables: Tuple[Table, ...]
+    indexes: Tuple[Index, ...] = ()
+    _by_table: Dict[str, Table] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_column: Dict[str, Tuple[str, ...]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    _by_index_table: Dict[str, Tuple[Index, ...]] = field(default_factory=dict, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        by_column: Dict[str, List[str]] = {}
+        for table in self.tables:
+            self._by_table[table.name] = table
+            for column in table.columns:
+                by_column.setdefault(column.name, []).append(table.name)
+        self._by_column.update((name, tuple(names)) for name, names in by_column.items())
+        
+        by_index_table: Dict[str, List[Index]] = {}
+        for index in self.indexes:
+            by_index_table.setdefault(index.table, []).append(index)
+        self._by_index_table.update((name, tuple(indexes)) for name, indexes in by_index_table.items())
+    
+    def table(self, name: str) -> Optional[Table]:
+        """Look up a table by (lower-case) name"""
+        return self._by_table.get(name.lower())
+    
+    def tables_with_column(self, column: str) -> Tuple[str, ...]:
+        """Names of the tables that declare a column"""
+        return self._by_column.get(column.lower(), ())
+    
+    def has_column(self, table: str, column: str) -> bool:
+        return table.lower() in self.tables_with_column(column)
+    
+    def indexes_on(self, table: str) -> Tuple[Index, ...]:
+        """Declared and constraint-implied indexes of a table"""
+        return self._by_index_table.get(table.lower(), ())
+    
+    @property
+    def schema_info(self) -> Dict:
+        """The catalog in the dict layout the engines have always exposed
+        
+        Built once per catalog and shared; treat it as read-only.
+        """
+        info = self.__dict__.get('_schema_info')
+        if info is None:
+            info = {
+                'tables': {
+                    table.name: {'columns': [
+                        {
+                            'name': column.name,
+                            'type': column.type,
+                            'is_primary': column.is_primary,
+                            'not_null': column.not_null,
+                            'is_unique': column.is_unique,
+                        }
+                        for column in table.columns
+                    ]}
+                    for table in self.tables
+                },
+                'indexes': [
+                    {
+                        'name': index.name,
+                        'table': index.table,
+                        'columns': list(index.columns),
+                        'unique': index.unique,
+                        'primary': index.primary,
+                    }
+                    for index in self.indexes
+                ],
+                'relationships': [
+                    {
+                        'table': fk.table,
+                        'columns': list(fk.columns),
+                        'ref_table': fk.ref_table,
+                        'ref_columns': list(fk.ref_columns),
+                    }
+                    for table in self.tables for fk in table.foreign_keys
+                ],
+            }
+            object.__setattr__(self, '_schema_info', info)
+        return info
+
+# DDL tokens, most frequent first. Strings, dollar-quoted bodies and quoted
+# identifiers are kept whole so that their contents can never unbalance
+# parentheses or end a statement early; whitespace and comments are dropped.
+_TOKEN = re.compile(r"""
+      (?P<word>\w+)
+    | (?P<skip>\s+|--[^\n]*|\#[^\n]*|/\*.*?\*/)
+    | (?P<string>'(?:[^'\\]|\\.|'')*')
+    | (?P<quoted>"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\])
+    | (?P<dollar>\$(?P<tag>\w*)\$.*?\$(?P=tag)\$)
+    | (?P<punct>.)
+""", re.DOTALL | re.VERBOSE)
+
+# Words that start a table-level constraint inside CREATE TABLE (...)
+_CONSTRAINT_WORDS = frozenset({
+    'CONSTRAINT', 'PRIMARY', 'FOREIGN', 'UNIQUE', 'CHECK', 'EXCLUDE',
+    'INDEX', 'KEY', 'FULLTEXT', 'SPATIAL',
+})
+
+# Words that end a column's type and start its inline constraints
+_COLUMN_OPTION_WORDS = frozenset({
+    'NOT', 'NULL', 'DEFAULT', 'PRIMARY', 'REFERENCES', 'UNIQUE', 'CHECK',
+    'CONSTRAINT', 'COLLATE', 'GENERATED', 'AUTO_INCREMENT', 'AUTOINCREMENT',
+    'IDENTITY', 'COMMENT', 'ON', 'AS',
+})
+
+# Statement modifiers skipped while looking for the object name
+_NAME_PREFIX_WORDS = frozenset({'IF', 'NOT', 'EXISTS', 'ONLY', 'CONCURRENTLY'})
+
+class _Token:
+    __slots__ = ('kind', 'text', 'upper', 'start', 'end')
+    
+    def __init__(self, kind: str, text: str, start: int, end: int):
+        self.kind = kind
+        self.text = text
+        self.upper = text.upper() if kind == 'word' else text
+        self.start = start
+        self.end = end
+
+def _statements(ddl: str) -> Iterator[List[_Token]]:
+    """Tokenize DDL and split it on semicolons outside parentheses"""
+    statement: List[_Token] = []
+    depth = 0
+    for match in _TOKEN.finditer(ddl):
+        kind = match.lastgroup
+        if kind == 'skip':
+            continue
+        text = match.group()
+        if kind == 'punct':
+            if text == '(':
+                depth += 1
+            elif text == ')':
+                depth = max(0, depth - 1)
+            elif text == ';' and depth == 0:
+                if statement:
+                    yield statement
+                statement = []
+                continue
+        statement.append(_Token(kind, text, match.start(), match.end()))
+    if statement:
+        yield statement
+
+def _identifier(token: _Token) -> str:
+    """Normalize a (possibly quoted) identifier to a lower-case name"""
+    text = token.text
+    if token.kind == 'quoted':
+        text = text[1:-1]
+    return text.lower()
+
+def _qualified_name(tokens: List[_Token], pos: int) -> Tuple[str, int]:
+    """Read schema.table (or just table) at pos and return the last part"""
+    name = _identifier(tokens[pos])
+    pos += 1
+    while pos + 1 < len(tokens) and tokens[pos].text == '.':
+        name = _identifier(tokens[pos + 1])
+        pos += 2
+    return name, pos
+
+def _skip_prefix(tokens: List[_Token], pos: int) -> int:
+    while pos < len(tokens) and tokens[pos].upper in _NAME_PREFIX_WORDS:
+        pos += 1
+    return pos
+
+def _group(tokens: List[_Token], pos: int) -> Tuple[List[_Token], int]:
+    """Return the tokens inside the parenthesized group opened at pos"""
+    depth = 0
+    for end in range(pos, len(tokens)):
+        token = tokens[end]
+        if token.kind != 'punct':
+            continue
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+            if depth == 0:
+                return tokens[pos + 1:end], end + 1
+    return tokens[pos + 1:], len(tokens)
+
+def _split_commas(tokens: List[_Token]) -> Iterator[List[_Token]]:
+    """Split a token list on commas outside parentheses"""
+    depth = 0
+    start = 0
+    for i, token in enumerate(tokens):
+        if token.kind != 'punct':
+            continue
+        if token.text == '(':
+            depth += 1
+        elif token.text == ')':
+            depth -= 1
+        elif token.text == ',' and depth == 0:
+            if i > start:
+                yield tokens[start:i]
+            start = i + 1
+    if start < len(tokens):
+        yield tokens[start:]
+
+def _column_list(tokens: List[_Token], pos: int) -> Tuple[Tuple[str, ...], int]:
+    """Read the next "(a, b DESC, ...)" group and return its leading plain column names"""
+    while pos < len(tokens) and tokens[pos].text != '(':
+        pos += 1
+    if pos >= len(tokens):
+        return (), pos
+    inner, pos = _group(tokens, pos)
+    columns = []
+    for part in _split_commas(inner):
+        # An expression such as lower(c) ends the usable column prefix
+        if part[0].kind not in ('word', 'quoted') or (len(part) > 1 and part[1].text == '('):
+            break
+        columns.append(_identifier(part[0]))
+    return tuple(columns), pos
+
+def _find_word(tokens: List[_Token], word: str, pos: int = 0) -> int:
+    for i in range(pos, len(tokens)):
+        if tokens[i].upper == word:
+            return i
+    return -1
+
+class _TableBuilder:
+    """Mutable table state while the DDL is being read"""
+    
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: Dict[str, Dict] = {}
+        self.primary_key: Tuple[str, ...] = ()
+        self.foreign_keys: List[ForeignKey] = []
+    
+    def freeze(self) -> Table:
+        primary = set(self.primary_key)
+        columns = tuple(
+            Column(
+                name=name,
+                type=info['type'],
+                is_primary=name in primary,
+                not_null=info['not_null'] or name in primary,
+                is_unique=info['is_unique'],
+                references=info['references'],
+            )
+            for name, info in self.columns.items()
+        )
+        return Table(self.name, columns, self.primary_key, tuple(self.foreign_keys))
+
+class _SchemaBuilder:
+    """Collects tables and indexes statement by statement"""
+    
+    def __init__(self, ddl: str):
+        self.ddl = ddl
+        self.tables: Dict[str, _TableBuilder] = {}
+        self.indexes: List[Index] = []
+    
+    def feed(self, tokens: List[_Token]):
+        head = [token.upper for token in tokens[:8]]
+        if head[0] == 'ALTER':
+            if len(head) > 1 and head[1] == 'TABLE':
+                self._alter_table(tokens)
+            return
+        if head[0] != 'CREATE':
+            return
+        
+        # CREATE [OR REPLACE] [TEMPORARY|UNLOGGED|...] TABLE / CREATE [UNIQUE] INDEX
+        table_at = head.index('TABLE') if 'TABLE' in head else -1
+        index_at = head.index('INDEX') if 'INDEX' in head else -1
+        if table_at > 0 and (index_at < 0 or table_at < index_at):
+            self._create_table(tokens, table_at + 1)
+        elif index_at > 0:
+            self._create_index(tokens, index_at + 1, unique='UNIQUE' in head[:index_at])
+    
+    def _create_table(self, tokens: List[_Token], pos: int):
+        pos = _skip_prefix(tokens, pos)
+        if pos >= len(tokens):
+            return
+        name, pos = _qualified_name(tokens, pos)
+        if pos >= len(tokens) or tokens[pos].text != '(':
+            return  # CREATE TABLE ... AS SELECT / LIKE / PARTITION OF
+        body, _ = _group(tokens, pos)
+        table = self.tables[name] = _TableBuilder(name)
+        for element in _split_commas(body):
+            if self._is_table_constraint(element):
+                self._table_constraint(table, element)
+            else:
+                self._column(table, element)
+    
+    def _is_table_constraint(self, element: List[_Token]) -> bool:
+        if element[0].kind != 'word' or element[0].upper not in _CONSTRAINT_WORDS:
+            return False
+        # A column may be named like a constraint keyword ("key TEXT",
+        # "key VARCHAR(255)"). MySQL's KEY/INDEX is followed by a column list,
+        # or by a name (and USING method) and then a column list; a type's
+        # parentheses hold numbers or strings, never column names.
+        if element[0].upper in ('KEY', 'INDEX') and len(element) > 1 and element[1].text != '(':
+            pos = 4 if len(element) > 4 and element[2].upper == 'USING' else 2
+            if len(element) <= pos + 1 or element[pos].text != '(':
+                return False
+            first = element[pos + 1]
+            return first.kind == 'quoted' or (first.kind == 'word' and not first.text[0].isdigit())
+        return True
+    
+    def _column(self, table: _TableBuilder, element: List[_Token]):
+        name = _identifier(element[0])
+        type_end = 1
+        depth = 0
+        while type_end < len(element):
+            token = element[type_end]
+            if token.text == '(':
+                depth += 1
+            elif token.text == ')':
+                depth -= 1
+            elif depth == 0 and token.upper in _COLUMN_OPTION_WORDS:
+                break
+            type_end += 1
+        # Slice the original text so "DECIMAL(10, 2)" keeps its spelling
+        column_type = self.ddl[element[1].start:element[type_end - 1].end] if type_end > 1 else 'unknown'
+        
+        options = [token.upper for token in element[type_end:]]
+        references = None
+        ref_at = _find_word(element, 'REFERENCES', type_end)
+        if 0 < ref_at < len(element) - 1:
+            ref_table, after = _qualified_name(element, ref_at + 1)
+            ref_columns, _ = _column_list(element, after)
+            references = (ref_table, ref_columns[0] if ref_columns else 'id')
+            table.foreign_keys.append(ForeignKey(table.name, (name,), ref_table, (references[1],)))
+        
+        is_primary = 'PRIMARY' in options
+        is_unique = 'UNIQUE' in options
+        table.columns[name] = {
+            'type': column_type,
+            'not_null': any(word == 'NOT' and following == 'NULL'
+                            for word, following in zip(options, options[1:])),
+            'is_unique': is_unique,
+            'references': references,
+        }
+        if is_primary:
+            table.primary_key = (name,)
+            self.indexes.append(Index(None, table.name, (name,), unique=True, primary=True))
+        elif is_unique:
+            self.indexes.append(Index(None, table.name, (name,), unique=True))
+    
+    def _table_constraint(self, table: _TableBuilder, element: List[_Token]):
+        pos = 0
+        constraint_name = None
+        if element[0].upper == 'CONSTRAINT' and len(element) > 1:
+            constraint_name = _identifier(element[1])
+            pos = 2
+        if pos >= len(element):
+            return
+        kind = element[pos].upper
+        
+        if kind == 'PRIMARY':
+            columns, _ = _column_list(element, pos)
+            if columns:
+                table.primary_key = columns
+                self.indexes.append(Index(constraint_name, table.name, columns, unique=True, primary=True))
+        elif kind == 'FOREIGN':
+            columns, after = _column_list(element, pos)
+            ref_at = _find_word(element, 'REFERENCES', after)
+            if columns and 0 < ref_at < len(element) - 1:
+                ref_table, after = _qualified_name(element, ref_at + 1)
+                ref_columns, _ = _column_list(element, after)
+                table.foreign_keys.append(ForeignKey(table.name, columns, ref_table, ref_columns))
+                if len(columns) == 1 and columns[0] in table.columns:
+                    table.columns[columns[0]]['references'] = (ref_table, ref_columns[0] if ref_columns else 'id')
+        elif kind in ('UNIQUE', 'INDEX', 'KEY', 'FULLTEXT', 'SPATIAL'):
+            # UNIQUE [KEY|INDEX] [name] (cols), or MySQL's KEY name (cols)
+            name_pos = pos + 1
+            while name_pos < len(element) and element[name_pos].upper in ('KEY', 'INDEX'):
+                name_pos += 1
+            if name_pos < len(element) and element[name_pos].text != '(':
+                constraint_name = _identifier(element[name_pos])
+            columns, _ = _column_list(element, name_pos)
+            if columns:
+                unique = kind == 'UNIQUE'
+                self.indexes.append(Index(constraint_name, table.name, columns, unique=unique))
+                if unique and len(columns) == 1 and columns[0] in table.columns:
+                    table.columns[columns[0]]['is_unique'] = True
+    
+    def _create_index(self, tokens: List[_Token], pos: int, unique: bool):
+        pos = _skip_prefix(tokens, pos)
+        name = None
+        if pos < len(tokens) and tokens[pos].upper != 'ON':
+            name, pos = _qualified_name(tokens, pos)
+        on_at = _find_word(tokens, 'ON', pos)
+        if not 0 < on_at < len(tokens) - 1:
+            return
+        table, after = _qualified_name(tokens, _skip_prefix(tokens, on_at + 1))
+        columns, _ = _column_list(tokens, after)
+        if columns:
+            self.indexes.append(Index(name, table, columns, unique=unique))
+    
+    def _alter_table(self, tokens: List[_Token]):
+        pos = _skip_prefix(tokens, 2)
+        if pos >= len(tokens):
+            return
+        name, pos = _qualified_name(tokens, pos)
+        table = self.tables.get(name)
+        if table is None:
+            return
+        for action in _split_commas(tokens[pos:]):
+            if action[0].upper != 'ADD' or len(action) < 2:
+                continue
+            if action[1].upper == 'COLUMN':
+                rest = action[_skip_prefix(action, 2):]
+                if rest:
+                    self._column(table, rest)
+            elif self._is_table_constraint(action[1:]):
+                self._table_constraint(table, action[1:])
+            else:
+                self._column(table, action[1:])
+    
+    def freeze(self, ddl_hash: str) -> Schema:
+        tables = tuple(table.freeze() for table in self.tables.values())
+        return Schema(ddl_hash=ddl_hash, tables=tables, indexes=tuple(self.indexes))
+
+def parse_schema(schema_ddl: str, ddl_hash: Optional[str] = None) -> Schema:
+    """Parse CREATE TABLE, CREATE INDEX and ALTER TABLE ... ADD statements into a Schema (not memoized)"""
+    builder = _SchemaBuilder(schema_ddl)
+    for statement in _statements(schema_ddl):
+        builder.feed(statement)
+    return builder.freeze(ddl_hash or schema_hash(schema_ddl))
+
+def schema_hash(schema_ddl: str) -> str:
+    return hashlib.sha1(schema_ddl.encode('utf-8')).hexdigest()
+
+_memo: "OrderedDict[str, Schema]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+def load_schema(schema_ddl: str) -> Schema:
+    """Return the catalog for a DDL string, parsing it only on first sight"""
+    key = schema_hash(schema_ddl)
+    with _memo_lock:
+        schema = _memo.get(key)
+        if schema is not None:
+            _memo.move_to_end(key)
+            return schema
+    
+    schema = parse_schema(schema_ddl, key)
+    with _memo_lock:
+        _memo[key] = schema
+        while len(_memo) > SCHEMA_MEMO_SIZE:
+            _memo.popitem(last=False)
+    return schema
+
+EMPTY_SCHEMA = parse_schema('')
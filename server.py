@@ -0,0 +1,473 @@
+"""
+HTTP JSON Service
+
+A small asyncio HTTP/1.1 server (standard library only) that exposes the
+optimizer and the query generator to other services:
+
+    POST /analyze   {"query": ..., "schema": DDL?, "deadline_ms": ms?}  -> report_formats record
+    POST /optimize  {"query": ..., "schema": DDL?}                      -> rewritten query and steps
+    POST /generate  {"description": ..., "schema": DDL?}                -> generated query
+    GET  /health                                                        -> status and queue depth
+    GET  /metrics                                                       -> Prometheus text
+
+Parsing, analysis and generation are CPU-bound, so the event loop only
+validates requests and puts them on a bounded queue. A dispatcher drains the
+queue in batches (up to ``batch_size`` jobs, waiting at most
+``batch_wait_ms`` for a batch to fill) and sends each batch to a process
+pool, with at most one batch in flight per worker. When the queue is full,
+requests are refused at once with 503 and Retry-After instead of queueing
+without bound.
+
+    python server.py --port 8080 --workers 4 --schema schema.sql
+    python benchmarks.py service   # local load test
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+
+from profiling import HISTOGRAMS, AnalysisProfile, Histogram, histogram_lines
+from query_generator import SQLQueryGenerator
+from report_formats import result_record
+from sql_optimizer_engine import AnalysisMode, SQLOptimizerEngine
+
+JSON_TYPE = 'application/json'
+METRICS_TYPE = 'text/plain; version=0.0.4'
+
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Endpoint -> (required string field, optional fields and their types)
+ENDPOINTS = {
+    '/analyze': ('query', {'schema': str, 'deadline_ms': (int, float)}),
+    '/optimize': ('query', {'schema': str}),
+    '/generate': ('description', {'schema': str}),
+}
+
+@dataclass
+class ServiceConfig:
+    """Listening address, pool size and back-pressure limits"""
+    host: str = '127.0.0.1'
+    port: int = 8080
+    workers: Optional[int] = None  # default: CPU count
+    queue_size: int = 1024         # jobs waiting for a worker before requests get 503
+    batch_size: int = 32
+    batch_wait_ms: float = 2.0
+    max_body: int = 1 << 20        # bytes
+    timeout_s: float = 30.0        # per job, queueing included
+    mode: AnalysisMode = AnalysisMode.STANDARD
+    schema: str = ''               # default DDL for requests that send none
+    profile: bool = False          # collect engine stage/rule histograms for /metrics
+
+class RequestError(Exception):
+    """A request the service answers with an error status"""
+    
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+# Worker-process side
+
+_worker_engine: Optional[SQLOptimizerEngine] = None
+_worker_generator: Optional[SQLQueryGenerator] = None
+_worker_schema = ''
+
+def _init_worker(config: Dict, schema_ddl: str):
+    """Pool initializer: build the per-process engine and generator once"""
+    global _worker_engine, _worker_generator, _worker_schema
+    _worker_engine = SQLOptimizerEngine._from_worker_config(config)
+    _worker_generator = SQLQueryGenerator()
+    _worker_schema = schema_ddl
+
+def _run_job(endpoint: str, payload: Dict) -> Dict:
+    # Schemas are memoized by load_schema, so switching per job is cheap
+    schema_ddl = payload.get('schema') or _worker_schema
+    if endpoint == '/generate':
+        _worker_generator.set_schema(schema_ddl)
+        return {'query': _worker_generator.generate_query(payload['description'])}
+    
+    _worker_engine.set_schema(schema_ddl)
+    if endpoint == '/analyze':
+        return result_record(_worker_engine.analyze_query(payload['query'], payload.get('deadline_ms')))
+    rewrite = _worker_engine.rewrite_query(payload['query'])
+    return {
+        'query': rewrite.query,
+        'changed': rewrite.changed,
+        'transformations': [{'name': step.name, 'description': step.description}
+                            for step in rewrite.transformations],
+        'rejected': [{'name': step.name, 'error': step.error} for step in rewrite.rejected],
+    }
+
+def _run_batch(jobs: List[Tuple[str, Dict]]) -> List[Tuple[bool, object]]:
+    """Run a batch of jobs in a worker: (True, response) or (False, error message) per job"""
+    results = []
+    for endpoint, payload in jobs:
+        try:
+            results.append((True, _run_job(endpoint, payload)))
+        except Exception as error:  # reported to that request only
+            results.append((False, f"{type(error).__name__}: {error}"))
+    return results
+
+# Event-loop side
+
+@dataclass
+class _Job:
+    endpoint: str
+    payload: Dict
+    future: asyncio.Future
+
+class ServiceMetrics:
+    """Request counters and histograms for /metrics"""
+    
+    def __init__(self):
+        self.requests: Dict[Tuple[str, int], int] = {}
+        self.latency: Dict[str, Histogram] = {}
+        self.batch_sizes = Histogram(BATCH_BUCKETS)
+        self.rejected = 0  # refused because the queue was full
+    
+    def observe(self, endpoint: str, status: int, seconds: float):
+        key = (endpoint, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        if endpoint not in self.latency:
+            self.latency[endpoint] = Histogram(LATENCY_BUCKETS)
+        self.latency[endpoint].observe(seconds)
+
+class OptimizerService:
+    """The HTTP front end, the job queue and its dispatcher, and the process pool"""
+    
+    def __init__(self, config: Optional[ServiceConfig] = None):
+        self.config = config or ServiceConfig()
+        self.workers = self.config.workers or os.cpu_count() or 1
+        self.metrics = ServiceMetrics()
+        self.started = time.time()
+        self.in_flight = 0  # batches running in the pool
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._connections: Dict[asyncio.Task, asyncio.StreamWriter] = {}
+    
+    @property
+    def port(self) -> int:
+        """The bound port (useful with port 0)"""
+        return self._server.sockets[0].getsockname()[1]
+    
+    async def start(self):
+        config = self.config
+        self._pool = self._new_pool()
+        self._queue = asyncio.Queue(config.queue_size)
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        self._server = await asyncio.start_server(self._handle_connection, config.host, config.port)
+    
+    def _new_pool(self) -> ProcessPoolExecutor:
+        """A pool whose workers do not inherit the server's sockets
+        
+        The pool starts its workers lazily, after the server is listening.
+        Forked workers would hold copies of the listening socket and of
+        client connections, so a connection the server closes would not see
+        EOF while a worker lives; forkserver and spawn workers start clean.
+        """
+        config = self.config
+        engine = SQLOptimizerEngine(mode=config.mode, profile=config.profile)
+        method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        return ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context(method),
+                                   initializer=_init_worker, initargs=(engine._worker_config(), config.schema))
+    
+    async def serve_forever(self):
+        """Serve until SIGINT or SIGTERM, then shut down cleanly"""
+        await self.start()
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(signum, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass  # no signal handlers on this platform or thread; Ctrl-C still raises
+        try:
+            await stop.wait()
+        finally:
+            await self.close()
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            if not job.future.done():
+                job.future.set_exception(RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server shutting down"))
+        # Idle connections see EOF; busy ones finish their request once the pool drains
+        for writer in self._connections.values():
+            writer.close()
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.shutdown, wait=True, cancel_futures=True)
+        await asyncio.gather(*self._connections, return_exceptions=True)
+    
+    # Batching
+    
+    async def _dispatch(self):
+        """Move queued jobs to the pool in batches, one batch per free worker"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._slots.acquire()
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.config.batch_wait_ms / 1000
+            while len(batch) < self.config.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+            batch = [job for job in batch if not job.future.done()]  # drop timed-out requests
+            if not batch:
+                self._slots.release()
+                continue
+            self.metrics.batch_sizes.observe(len(batch))
+            self.in_flight += 1
+            pool = self._pool
+            try:
+                work = loop.run_in_executor(pool, _run_batch, [(job.endpoint, job.payload) for job in batch])
+            except BrokenProcessPool as failure:
+                # The pool broke before its batches finished and is not replaced yet
+                work = loop.create_future()
+                work.set_exception(failure)
+            work.add_done_callback(lambda done, jobs=batch, pool=pool: self._finish_batch(jobs, done, pool))
+    
+    def _finish_batch(self, jobs: List[_Job], done: asyncio.Future, pool: ProcessPoolExecutor):
+        """Answer a batch's jobs; replace ``pool``, the one it ran on, if it broke and is still current"""
+        self.in_flight -= 1
+        self._slots.release()
+        error = None
+        if done.cancelled():
+            error = RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server shutting down")
+        elif done.exception() is not None:
+            # The batch did not run to completion: a worker died or could not start
+            failure = done.exception()
+            error = RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, f"{type(failure).__name__}: {failure}")
+            if isinstance(failure, BrokenProcessPool) and pool is self._pool \
+                    and self._server is not None and self._server.is_serving():
+                # Other batches on the broken pool fail too; only the first replaces it
+                self._pool = self._new_pool()
+                pool.shutdown(wait=False)
+        for index, job in enumerate(jobs):
+            if job.future.done():
+                continue
+            if error is not None:
+                job.future.set_exception(error)
+                continue
+            ok, value = done.result()[index]
+            if ok:
+                job.future.set_result(value)
+            else:
+                job.future.set_exception(RequestError(HTTPStatus.INTERNAL_SERVER_ERROR, value))
+    
+    async def submit(self, endpoint: str, payload: Dict) -> Dict:
+        """Queue one job and wait for its response; 503 at once when the queue is full"""
+        job = _Job(endpoint, payload, asyncio.get_running_loop().create_future())
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.metrics.rejected += 1
+            raise RequestError(HTTPStatus.SERVICE_UNAVAILABLE, "server busy, retry later") from None
+        try:
+            return await asyncio.wait_for(job.future, self.config.timeout_s)
+        except asyncio.TimeoutError:
+            raise RequestError(HTTPStatus.GATEWAY_TIMEOUT, "request timed out") from None
+    
+    # HTTP
+    
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                started = time.perf_counter()
+                keep_alive = False
+                path = 'invalid'
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                    path = target.split('?', 1)[0]
+                    headers = await _read_headers(reader)
+                    keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                    body = await self._read_body(reader, headers)
+                    status, content_type, content = await self._route(method, path, body)
+                except RequestError as error:
+                    status, content_type, content = error.status, JSON_TYPE, _json({'error': str(error)})
+                    if error.status in (HTTPStatus.BAD_REQUEST, HTTPStatus.REQUEST_ENTITY_TOO_LARGE):
+                        keep_alive = False  # the rest of the stream cannot be trusted
+                except ValueError:
+                    status, content_type, content = HTTPStatus.BAD_REQUEST, JSON_TYPE, _json({'error': "malformed request"})
+                    keep_alive = False
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    raise
+                except Exception as error:  # a bug must cost this request, not the connection
+                    status, content_type = HTTPStatus.INTERNAL_SERVER_ERROR, JSON_TYPE
+                    content = _json({'error': f"{type(error).__name__}: {error}"})
+                    keep_alive = False
+                extra = 'Retry-After: 1\r\n' if status == HTTPStatus.SERVICE_UNAVAILABLE else ''
+                writer.write(
+                    f"HTTP/1.1 {status.value} {status.phrase}\r\nContent-Type: {content_type}\r\n"
+                    f"Content-Length: {len(content)}\r\n{extra}"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode('latin-1') + content
+                )
+                await writer.drain()
+                self.metrics.observe(path if path in ENDPOINTS or path in ('/health', '/metrics') else 'other',
+                                     status.value, time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+    
+    async def _read_body(self, reader: asyncio.StreamReader, headers: Dict[str, str]) -> bytes:
+        length = int(headers.get('content-length', 0))
+        if length < 0:
+            raise ValueError("negative Content-Length")
+        if length > self.config.max_body:
+            raise RequestError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, f"body over {self.config.max_body} bytes")
+        return await reader.readexactly(length) if length else b''
+    
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[HTTPStatus, str, bytes]:
+        if path == '/health' and method == 'GET':
+            return HTTPStatus.OK, JSON_TYPE, _json(self.health())
+        if path == '/metrics' and method == 'GET':
+            return HTTPStatus.OK, METRICS_TYPE, self.prometheus_text().encode('utf-8')
+        if path not in ENDPOINTS:
+            raise RequestError(HTTPStatus.NOT_FOUND, f"no endpoint {path}")
+        if method != 'POST':
+            raise RequestError(HTTPStatus.METHOD_NOT_ALLOWED, f"{path} takes POST")
+        payload = _validate(path, body)
+        response = await self.submit(path, payload)
+        profile = response.pop('profile', None) if path == '/analyze' else None
+        if profile is not None:
+            # Worker processes record into their own histograms; fold their timings into ours
+            HISTOGRAMS.observe_profile(AnalysisProfile(profile['stages'], profile['rules']))
+        return HTTPStatus.OK, JSON_TYPE, _json(response)
+    
+    def health(self) -> Dict:
+        return {
+            'status': 'ok',
+            'workers': self.workers,
+            'queue_depth': self._queue.qsize(),
+            'queue_size': self.config.queue_size,
+            'batches_in_flight': self.in_flight,
+            'uptime_s': round(time.time() - self.started, 1),
+        }
+    
+    def prometheus_text(self) -> str:
+        metrics = self.metrics
+        lines = [
+            "# HELP sql_service_requests_total HTTP requests by endpoint and status",
+            "# TYPE sql_service_requests_total counter",
+        ]
+        for (endpoint, status), count in sorted(metrics.requests.items()):
+            lines.append(f'sql_service_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+        lines += [
+            "# HELP sql_service_rejected_total Requests refused with 503 because the queue was full",
+            "# TYPE sql_service_rejected_total counter",
+            f"sql_service_rejected_total {metrics.rejected}",
+            "# HELP sql_service_queue_depth Jobs waiting for a worker",
+            "# TYPE sql_service_queue_depth gauge",
+            f"sql_service_queue_depth {self._queue.qsize()}",
+            "# HELP sql_service_batches_in_flight Batches running in the process pool",
+            "# TYPE sql_service_batches_in_flight gauge",
+            f"sql_service_batches_in_flight {self.in_flight}",
+            "# HELP sql_service_batch_size Jobs per batch sent to the pool",
+            "# TYPE sql_service_batch_size histogram",
+        ]
+        lines += histogram_lines('sql_service_batch_size', '', metrics.batch_sizes)
+        lines += [
+            "# HELP sql_service_request_seconds Request latency, queueing included",
+            "# TYPE sql_service_request_seconds histogram",
+        ]
+        for endpoint in sorted(metrics.latency):
+            lines += histogram_lines('sql_service_request_seconds', f'endpoint="{endpoint}"', metrics.latency[endpoint])
+        text = '\n'.join(lines) + '\n'
+        if self.config.profile:
+            text += HISTOGRAMS.prometheus_text()
+        return text
+
+async def _read_headers(reader: asyncio.StreamReader) -> Dict[str, str]:
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, separator, value = line.decode('latin-1').partition(':')
+        if not separator:
+            raise ValueError("malformed header")
+        headers[name.strip().lower()] = value.strip()
+
+def _validate(endpoint: str, body: bytes) -> Dict:
+    """The JSON payload of a job request, checked against ENDPOINTS"""
+    required, optional = ENDPOINTS[endpoint]
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError:
+        raise RequestError(HTTPStatus.BAD_REQUEST, "body is not valid JSON") from None
+    if not isinstance(payload, dict):
+        raise RequestError(HTTPStatus.BAD_REQUEST, "body must be a JSON object")
+    if not isinstance(payload.get(required), str) or not payload[required].strip():
+        raise RequestError(HTTPStatus.BAD_REQUEST, f"'{required}' must be a non-empty string")
+    for name, types in optional.items():
+        if payload.get(name) is not None and (not isinstance(payload[name], types) or isinstance(payload[name], bool)):
+            raise RequestError(HTTPStatus.BAD_REQUEST, f"'{name}' has the wrong type")
+    return {name: payload[name] for name in (required, *optional) if payload.get(name) is not None}
+
+def _json(value) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def main(argv=None):
+    defaults = ServiceConfig()
+    parser = argparse.ArgumentParser(description="HTTP JSON service for the SQL optimizer and query generator")
+    parser.add_argument('--host', default=defaults.host)
+    parser.add_argument('--port', type=int, default=defaults.port)
+    parser.add_argument('--workers', type=int, help="worker processes (default: CPU count)")
+    parser.add_argument('--queue-size', type=int, default=defaults.queue_size, help="queued jobs before 503")
+    parser.add_argument('--batch-size', type=int, default=defaults.batch_size)
+    parser.add_argument('--batch-wait-ms', type=float, default=defaults.batch_wait_ms)
+    parser.add_argument('--timeout', type=float, default=defaults.timeout_s, help="seconds per request")
+    parser.add_argument('--mode', default=defaults.mode.value, choices=[mode.value for mode in AnalysisMode])
+    parser.add_argument('--schema', help="DDL file used when a request sends no schema")
+    parser.add_argument('--profile', action='store_true', help="export engine stage/rule histograms on /metrics")
+    args = parser.parse_args(argv)
+    
+    schema = ''
+    if args.schema:
+        with open(args.schema, encoding='utf-8') as handle:
+            schema = handle.read()
+    config = ServiceConfig(host=args.host, port=args.port, workers=args.workers, queue_size=args.queue_size,
+                           batch_size=args.batch_size, batch_wait_ms=args.batch_wait_ms, timeout_s=args.timeout,
+                           mode=AnalysisMode(args.mode), schema=schema, profile=args.profile)
+    service = OptimizerService(config)
+    print(f"Serving on http://{config.host}:{config.port} with {service.workers} worker(s)")
+    try:
+        asyncio.run(service.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -1,593 +1,1088 @@
-"""
-Custom SQL Query Optimizer Engine
-
-A rule-based SQL optimization system that analyzes SQL queries and provides
-performance improvement suggestions without external API dependencies.
-"""
-
-import re
-import sqlparse
-from sqlparse import sql, tokens as T
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
-from enum import Enum
-
-class OptimizationLevel(Enum):
-    LOW = "low"
-    MEDIUM = "medium"
-    HIGH = "high"
-    CRITICAL = "critical"
-
-@dataclass
-class OptimizationSuggestion:
-    """Represents a single optimization suggestion"""
-    level: OptimizationLevel
-    category: str
-    issue: str
-    suggestion: str
-    optimized_query: Optional[str] = None
-    index_recommendation: Optional[str] = None
-
-@dataclass
-class QueryAnalysisResult:
-    """Complete analysis result for a SQL query"""
-    original_query: str
-    suggestions: List[OptimizationSuggestion]
-    performance_score: int  # 0-100 (higher is better)
-    complexity_analysis: Dict[str, any]
-
-class SQLOptimizerEngine:
-    """Main SQL optimization engine"""
-    
-    def __init__(self):
-        self.schema_info = {}
-        self.optimization_rules = self._load_optimization_rules()
-    
-    def set_schema(self, schema_ddl: str):
-        """Parse and store database schema information"""
-        self.schema_info = self._parse_schema(schema_ddl)
-    
-    def analyze_query(self, query: str) -> QueryAnalysisResult:
-        """Analyze a SQL query and provide optimization suggestions"""
-        # Parse the SQL query
-        parsed = sqlparse.parse(query)[0]
-        
-        suggestions = []
-        complexity_analysis = {}
-        
-        # Run all optimization checks
-        suggestions.extend(self._check_select_star(parsed))
-        suggestions.extend(self._check_missing_where_clause(parsed))
-        suggestions.extend(self._check_non_sargable_predicates(parsed))
-        suggestions.extend(self._check_function_in_where(parsed))
-        suggestions.extend(self._check_implicit_conversions(parsed))
-        suggestions.extend(self._check_unnecessary_joins(parsed))
-        suggestions.extend(self._check_missing_indexes(parsed))
-        suggestions.extend(self._check_subquery_optimization(parsed))
-        suggestions.extend(self._check_order_by_without_limit(parsed))
-        suggestions.extend(self._check_like_wildcards(parsed))
-        suggestions.extend(self._check_distinct_usage(parsed))
-        suggestions.extend(self._check_union_vs_union_all(parsed))
-        suggestions.extend(self._check_cartesian_products(parsed))
-        suggestions.extend(self._check_unnecessary_sorting(parsed))
-        suggestions.extend(self._check_nullable_columns(parsed))
-        suggestions.extend(self._check_data_type_mismatches(parsed))
-        suggestions.extend(self._check_inefficient_aggregations(parsed))
-        
-        # Calculate performance score
-        performance_score = self._calculate_performance_score(suggestions)
-        
-        # Analyze complexity
-        complexity_analysis = self._analyze_complexity(parsed)
-        
-        return QueryAnalysisResult(
-            original_query=query,
-            suggestions=suggestions,
-            performance_score=performance_score,
-            complexity_analysis=complexity_analysis
-        )
-    
-    def generate_optimized_query(self, query: str) -> str:
-        """Generate an optimized version of the query"""
-        analysis = self.analyze_query(query)
-        optimized = query
-        
-        # Apply automatic optimizations
-        for suggestion in analysis.suggestions:
-            if suggestion.optimized_query:
-                optimized = suggestion.optimized_query
-                break  # Apply the first available optimization
-        
-        return optimized
-    
-    def _parse_schema(self, schema_ddl: str) -> Dict:
-        """Parse schema DDL to extract table and column information"""
-        schema_info = {'tables': {}, 'indexes': []}
-        
-        # Simple regex-based parsing for CREATE TABLE statements
-        table_pattern = r'CREATE TABLE\s+(\w+)\s*\((.*?)\)'
-        
-        for match in re.finditer(table_pattern, schema_ddl, re.DOTALL | re.IGNORECASE):
-            table_name = match.group(1).lower()
-            columns_str = match.group(2)
-            
-            columns = []
-            # Extract column definitions
-            column_lines = [line.strip() for line in columns_str.split(',')]
-            for line in column_lines:
-                if line:
-                    parts = line.split()
-                    if parts:
-                        column_name = parts[0].lower()
-                        column_type = parts[1] if len(parts) > 1 else 'unknown'
-                        is_primary = 'primary' in line.lower() and 'key' in line.lower()
-                        columns.append({
-                            'name': column_name,
-                            'type': column_type,
-                            'is_primary': is_primary
-                        })
-            
-            schema_info['tables'][table_name] = {'columns': columns}
-        
-        return schema_info
-    
-    def _check_select_star(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for SELECT * usage"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        if 'select *' in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Column Selection",
-                issue="Using SELECT * retrieves all columns",
-                suggestion="Specify only the columns you need to reduce data transfer and improve performance",
-                optimized_query=self._suggest_specific_columns(str(parsed))
-            ))
-        
-        return suggestions
-    
-    def _check_missing_where_clause(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for queries without WHERE clauses"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check if it's a SELECT without WHERE
-        if 'select' in query_str and 'where' not in query_str and 'limit' not in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.HIGH,
-                category="Data Filtering",
-                issue="Query lacks WHERE clause and may return all rows",
-                suggestion="Add appropriate WHERE conditions to limit the result set and improve performance"
-            ))
-        
-        return suggestions
-    
-    def _check_non_sargable_predicates(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for non-SARGable predicates that prevent index usage"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for leading wildcards in LIKE
-        if re.search(r"like\s+['\"]%", query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.HIGH,
-                category="Index Usage",
-                issue="LIKE with leading wildcard (%) prevents index usage",
-                suggestion="Consider using full-text search or restructuring the query to avoid leading wildcards"
-            ))
-        
-        return suggestions
-    
-    def _check_function_in_where(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for functions applied to columns in WHERE clauses"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Common functions that prevent index usage
-        functions = ['upper', 'lower', 'substring', 'year', 'month', 'day']
-        
-        for func in functions:
-            if re.search(rf'where.*{func}\s*\(', query_str):
-                suggestions.append(OptimizationSuggestion(
-                    level=OptimizationLevel.MEDIUM,
-                    category="Index Usage",
-                    issue=f"Function {func.upper()}() in WHERE clause prevents index usage",
-                    suggestion=f"Consider using computed columns or restructuring to avoid {func.upper()}() in WHERE clause"
-                ))
-        
-        return suggestions
-    
-    def _check_implicit_conversions(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for potential implicit data type conversions"""
-        suggestions = []
-        query_str = str(parsed)
-        
-        # Look for quoted numbers (potential string to number conversion)
-        if re.search(r"=\s*['\"][0-9]+['\"]", query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Data Types",
-                issue="Potential implicit conversion between string and numeric types",
-                suggestion="Ensure data types match to avoid implicit conversions that can prevent index usage"
-            ))
-        
-        return suggestions
-    
-    def _check_unnecessary_joins(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for potentially unnecessary joins"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Count joins
-        join_count = len(re.findall(r'\bjoin\b', query_str))
-        
-        if join_count > 3:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Query Structure",
-                issue=f"Query has {join_count} joins which may impact performance",
-                suggestion="Review if all joins are necessary. Consider breaking complex queries into simpler ones or using CTEs"
-            ))
-        
-        return suggestions
-    
-    def _check_missing_indexes(self, parsed) -> List[OptimizationSuggestion]:
-        """Suggest indexes based on WHERE and JOIN conditions"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Extract table and column names from WHERE conditions
-        where_matches = re.findall(r'where\s+.*?(\w+)\.(\w+)\s*=', query_str)
-        join_matches = re.findall(r'on\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)', query_str)
-        
-        recommended_indexes = set()
-        
-        # Suggest indexes for WHERE conditions
-        for table, column in where_matches:
-            index_name = f"idx_{table}_{column}"
-            recommended_indexes.add(f"CREATE INDEX {index_name} ON {table}({column});")
-        
-        # Suggest indexes for JOIN conditions
-        for t1, c1, t2, c2 in join_matches:
-            index1 = f"idx_{t1}_{c1}"
-            index2 = f"idx_{t2}_{c2}"
-            recommended_indexes.add(f"CREATE INDEX {index1} ON {t1}({c1});")
-            recommended_indexes.add(f"CREATE INDEX {index2} ON {t2}({c2});")
-        
-        if recommended_indexes:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.HIGH,
-                category="Indexing",
-                issue="Query may benefit from additional indexes",
-                suggestion="Consider creating the following indexes to improve query performance",
-                index_recommendation="\n".join(recommended_indexes)
-            ))
-        
-        return suggestions
-    
-    def _check_subquery_optimization(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for subqueries that could be optimized"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for EXISTS subqueries that could be JOINs
-        if 'exists' in query_str and 'select' in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Query Structure",
-                issue="EXISTS subquery detected",
-                suggestion="Consider converting EXISTS subquery to JOIN for better performance in some cases"
-            ))
-        
-        # Check for IN with subqueries
-        if re.search(r'in\s*\(\s*select', query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Query Structure",
-                issue="IN with subquery detected",
-                suggestion="Consider using JOIN or EXISTS instead of IN with subquery for better performance"
-            ))
-        
-        return suggestions
-    
-    def _check_order_by_without_limit(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for ORDER BY without LIMIT"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        if 'order by' in query_str and 'limit' not in query_str and 'top' not in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Data Retrieval",
-                issue="ORDER BY without LIMIT may sort unnecessary rows",
-                suggestion="If you don't need all sorted results, consider adding LIMIT to reduce sorting overhead"
-            ))
-        
-        return suggestions
-    
-    def _check_like_wildcards(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for inefficient LIKE patterns"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for patterns that start and end with wildcards
-        if re.search(r"like\s+['\"]%.*%['\"]", query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Search Optimization",
-                issue="LIKE with wildcards on both ends requires full table scan",
-                suggestion="Consider using full-text search capabilities for better performance on text searches"
-            ))
-        
-        return suggestions
-    
-    def _check_distinct_usage(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for unnecessary or inefficient DISTINCT usage"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        if 'select distinct' in query_str:
-            # Check if DISTINCT is used with aggregation functions
-            if any(func in query_str for func in ['count(', 'sum(', 'avg(', 'min(', 'max(']):
-                suggestions.append(OptimizationSuggestion(
-                    level=OptimizationLevel.MEDIUM,
-                    category="Query Structure",
-                    issue="DISTINCT used with aggregation functions may be redundant",
-                    suggestion="Review if DISTINCT is necessary when using aggregation functions"
-                ))
-            
-            # Suggest using GROUP BY instead of DISTINCT when possible
-            if 'order by' in query_str:
-                suggestions.append(OptimizationSuggestion(
-                    level=OptimizationLevel.LOW,
-                    category="Query Structure",
-                    issue="DISTINCT with ORDER BY can be expensive",
-                    suggestion="Consider using GROUP BY instead of DISTINCT when ordering results"
-                ))
-        
-        return suggestions
-    
-    def _check_union_vs_union_all(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for UNION usage where UNION ALL would be more efficient"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        if 'union' in query_str and 'union all' not in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Query Structure",
-                issue="UNION removes duplicates which requires extra processing",
-                suggestion="Use UNION ALL if duplicates are acceptable or if you're certain there are no duplicates",
-                optimized_query=str(parsed).replace('UNION', 'UNION ALL')
-            ))
-        
-        return suggestions
-    
-    def _check_cartesian_products(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for potential cartesian products (missing JOIN conditions)"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Count tables and JOIN clauses
-        from_tables = len(re.findall(r'\bfrom\s+\w+', query_str))
-        join_clauses = len(re.findall(r'\bjoin\b', query_str))
-        where_joins = len(re.findall(r'where.*?\w+\.\w+\s*=\s*\w+\.\w+', query_str))
-        
-        # If we have multiple tables but no proper joins
-        if from_tables > 1 and join_clauses == 0 and where_joins == 0:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.CRITICAL,
-                category="Query Structure",
-                issue="Potential cartesian product detected - multiple tables without JOIN conditions",
-                suggestion="Add proper JOIN conditions or WHERE clauses to avoid cartesian products"
-            ))
-        
-        return suggestions
-    
-    def _check_unnecessary_sorting(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for multiple or unnecessary sorting operations"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for ORDER BY in subqueries
-        if 'order by' in query_str:
-            # Count ORDER BY clauses
-            order_by_count = len(re.findall(r'order\s+by', query_str))
-            
-            if order_by_count > 1:
-                suggestions.append(OptimizationSuggestion(
-                    level=OptimizationLevel.MEDIUM,
-                    category="Performance",
-                    issue="Multiple ORDER BY clauses detected",
-                    suggestion="Remove ORDER BY from subqueries unless absolutely necessary"
-                ))
-            
-            # Check for ORDER BY with functions
-            if re.search(r'order\s+by.*?\w+\s*\(', query_str):
-                suggestions.append(OptimizationSuggestion(
-                    level=OptimizationLevel.MEDIUM,
-                    category="Index Usage",
-                    issue="ORDER BY uses functions which prevents index usage",
-                    suggestion="Consider creating computed columns or functional indexes"
-                ))
-        
-        return suggestions
-    
-    def _check_nullable_columns(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for operations on potentially nullable columns"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for comparisons that might not handle NULLs properly
-        if re.search(r'where.*?\w+\s*[<>=!]', query_str) and 'is null' not in query_str and 'is not null' not in query_str:
-            # This is a heuristic - in practice, you'd need schema information
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Data Integrity",
-                issue="Consider NULL handling in WHERE conditions",
-                suggestion="Explicitly handle NULL values with IS NULL or IS NOT NULL clauses where appropriate"
-            ))
-        
-        return suggestions
-    
-    def _check_data_type_mismatches(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for potential data type mismatches that could cause performance issues"""
-        suggestions = []
-        query_str = str(parsed)
-        
-        # Check for comparing strings to numbers (more sophisticated than before)
-        if re.search(r"\w+\s*[<>=]\s*['\"]\d+['\"]|['\"]\d+['\"]\s*[<>=]\s*\w+", query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.MEDIUM,
-                category="Data Types",
-                issue="Potential data type mismatch between string and numeric values",
-                suggestion="Ensure consistent data types in comparisons to avoid implicit conversions"
-            ))
-        
-        # Check for date string comparisons
-        if re.search(r"\w+\s*[<>=]\s*['\"]\d{4}-\d{2}-\d{2}['\"]|['\"]\d{4}-\d{2}-\d{2}['\"]\s*[<>=]\s*\w+", query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Data Types",
-                issue="String comparison with date format detected",
-                suggestion="Use proper date functions like DATE() for date comparisons"
-            ))
-        
-        return suggestions
-    
-    def _check_inefficient_aggregations(self, parsed) -> List[OptimizationSuggestion]:
-        """Check for inefficient aggregation patterns"""
-        suggestions = []
-        query_str = str(parsed).lower()
-        
-        # Check for COUNT(*) vs COUNT(column)
-        if 'count(*)' in query_str and 'where' not in query_str:
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Performance",
-                issue="COUNT(*) without WHERE clause may be slow on large tables",
-                suggestion="Consider using table statistics or adding WHERE conditions to limit the count"
-            ))
-        
-        # Check for nested aggregations
-        if re.search(r'\b(count|sum|avg|min|max)\s*\(.*?\b(count|sum|avg|min|max)\s*\(', query_str):
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.HIGH,
-                category="Query Structure",
-                issue="Nested aggregation functions detected",
-                suggestion="Break down complex aggregations into multiple queries or use window functions"
-            ))
-        
-        # Check for aggregation without GROUP BY but with non-aggregate columns
-        has_aggregate = any(func in query_str for func in ['count(', 'sum(', 'avg(', 'min(', 'max('])
-        has_group_by = 'group by' in query_str
-        
-        if has_aggregate and not has_group_by:
-            # This is a simplified check - in practice, you'd need to parse the SELECT list
-            suggestions.append(OptimizationSuggestion(
-                level=OptimizationLevel.LOW,
-                category="Query Structure",
-                issue="Mixing aggregate and non-aggregate columns may require GROUP BY",
-                suggestion="Ensure all non-aggregate columns in SELECT are included in GROUP BY clause"
-            ))
-        
-        return suggestions
-    
-    def _calculate_performance_score(self, suggestions: List[OptimizationSuggestion]) -> int:
-        """Calculate a performance score based on issues found"""
-        base_score = 100
-        
-        for suggestion in suggestions:
-            if suggestion.level == OptimizationLevel.CRITICAL:
-                base_score -= 25
-            elif suggestion.level == OptimizationLevel.HIGH:
-                base_score -= 15
-            elif suggestion.level == OptimizationLevel.MEDIUM:
-                base_score -= 10
-            elif suggestion.level == OptimizationLevel.LOW:
-                base_score -= 5
-        
-        return max(0, base_score)
-    
-    def _analyze_complexity(self, parsed) -> Dict:
-        """Analyze query complexity"""
-        query_str = str(parsed).lower()
-        
-        return {
-            'join_count': len(re.findall(r'\bjoin\b', query_str)),
-            'subquery_count': len(re.findall(r'\bselect\b', query_str)) - 1,
-            'where_conditions': len(re.findall(r'\band\b|\bor\b', query_str)) + 1,
-            'has_order_by': 'order by' in query_str,
-            'has_group_by': 'group by' in query_str,
-            'has_having': 'having' in query_str
-        }
-    
-    def _suggest_specific_columns(self, query: str) -> str:
-        """Suggest replacing SELECT * with specific columns"""
-        # This is a simplified example - in practice, you'd need schema info
-        return query.replace('SELECT *', 'SELECT column1, column2, column3  -- Replace with actual column names')
-    
-    def _load_optimization_rules(self) -> Dict:
-        """Load predefined optimization rules"""
-        return {
-            'avoid_select_star': True,
-            'require_where_clause': True,
-            'check_index_usage': True,
-            'optimize_joins': True,
-            'detect_n_plus_one': True
-        }
-
-def format_analysis_result(analysis: QueryAnalysisResult) -> str:
-    """Format the analysis result as markdown for display"""
-    result = f"# SQL Query Analysis Report\n\n"
-    result += f"**Performance Score:** {analysis.performance_score}/100\n\n"
-    
-    if analysis.suggestions:
-        result += f"## 🔍 Query Analysis\n\n"
-        
-        # Group suggestions by category
-        categories = {}
-        for suggestion in analysis.suggestions:
-            if suggestion.category not in categories:
-                categories[suggestion.category] = []
-            categories[suggestion.category].append(suggestion)
-        
-        for category, suggestions in categories.items():
-            result += f"### {category}\n\n"
-            
-            for suggestion in suggestions:
-                # Level emoji
-                level_emoji = {
-                    OptimizationLevel.CRITICAL: "🚨",
-                    OptimizationLevel.HIGH: "⚠️",
-                    OptimizationLevel.MEDIUM: "⚡",
-                    OptimizationLevel.LOW: "💡"
-                }
-                
-                result += f"{level_emoji.get(suggestion.level, '📝')} **{suggestion.level.value.title()} Priority**\n\n"
-                result += f"**Issue:** {suggestion.issue}\n\n"
-                result += f"**Recommendation:** {suggestion.suggestion}\n\n"
-                
-                if suggestion.optimized_query:
-                    result += f"**Optimized Query:**\n```sql\n{suggestion.optimized_query}\n```\n\n"
-                
-                if suggestion.index_recommendation:
-                    result += f"**Index Recommendations:**\n```sql\n{suggestion.index_recommendation}\n```\n\n"
-                
-                result += "---\n\n"
-    else:
-        result += "## ✅ Great Job!\n\nYour query looks well-optimized. No major issues detected.\n\n"
-    
-    # Complexity analysis
-    complexity = analysis.complexity_analysis
-    result += f"## 📊 Complexity Analysis\n\n"
-    result += f"- **Joins:** {complexity.get('join_count', 0)}\n"
-    result += f"- **Subqueries:** {complexity.get('subquery_count', 0)}\n"
-    result += f"- **WHERE Conditions:** {complexity.get('where_conditions', 0)}\n"
-    result += f"- **Has ORDER BY:** {'Yes' if complexity.get('has_order_by') else 'No'}\n"
-    result += f"- **Has GROUP BY:** {'Yes' if complexity.get('has_group_by') else 'No'}\n"
-    result += f"- **Has HAVING:** {'Yes' if complexity.get('has_having') else 'No'}\n\n"
-    
-    return result
-
+"""
+Custom SQL Query Optimizer Engine
+
+A rule-based SQL optimization system that analyzes SQL queries and provides
+performance improvement suggestions without external API dependencies.
+"""
+
+import copy
+import os
+import re
+import time
+import multiprocessing
+import sqlparse
+from sqlparse import sql, tokens as T
+from collections import Counter
+from typing import List, Dict, FrozenSet, Tuple, Optional, Iterator, Iterable, Union, Match, Pattern
+from dataclasses import dataclass, field, replace
+from enum import Enum
+
+from analysis_cache import AnalysisCache, DEFAULT_CACHE_SIZE
+from clause_index import build_clause_index
+from query_rewriter import RewriteResult, rewrite_query
+from cost_model import Statistics, affected_rows, estimate_query, impact_weight, load_statistics
+from profiling import HISTOGRAMS, AnalysisProfile
+from query_fingerprint import fingerprint_normalized, normalize_query, normalize_tokens
+from schema_catalog import EMPTY_SCHEMA, Schema, load_schema
+from sql_script import first_statement
+
+class OptimizationLevel(Enum):
+    LOW = "low"
+    MEDIUM = "medium"
+    HIGH = "high"
+    CRITICAL = "critical"
+
+class AnalysisMode(Enum):
+    STANDARD = "standard"        # a keyword prefilter picks the checks; each scans the query text
+    FAST = "fast"                # standard checks on lexer output; sqlparse grouping is skipped
+
+@dataclass
+class OptimizationSuggestion:
+    """Represents a single optimization suggestion"""
+    level: OptimizationLevel
+    category: str
+    issue: str
+    suggestion: str
+    optimized_query: Optional[str] = None
+    index_recommendation: Optional[str] = None
+    rule_id: Optional[str] = None  # RULE_IDS entry of the check that produced it
+    estimated_rows: Optional[int] = None  # rows the issue affects, when statistics are set
+
+@dataclass
+class QueryAnalysisResult:
+    """Complete analysis result for a SQL query"""
+    original_query: str
+    suggestions: List[OptimizationSuggestion]
+    performance_score: int  # 0-100 (higher is better)
+    complexity_analysis: Dict[str, any]
+    complete: bool = True   # False when a deadline cut the analysis short
+    skipped_rules: List[str] = field(default_factory=list)  # RULE_IDS entries the deadline skipped
+    profile: Optional[AnalysisProfile] = None  # stage and rule timings, from engines created with profile=True
+
+# Bumped whenever a check can report differently for the same query, so
+# results stored between runs (cli.py --cache-file) are recomputed
+ENGINE_VERSION = 2
+
+# Checks run by analyze_query, in report order; each id names a _check_<id> method
+RULE_IDS = (
+    'select_star',
+    'missing_where_clause',
+    'non_sargable_predicates',
+    'function_in_where',
+    'implicit_conversions',
+    'unnecessary_joins',
+    'missing_indexes',
+    'subquery_optimization',
+    'order_by_without_limit',
+    'like_wildcards',
+    'distinct_usage',
+    'union_vs_union_all',
+    'cartesian_products',
+    'unnecessary_sorting',
+    'nullable_columns',
+    'data_type_mismatches',
+    'inefficient_aggregations',
+)
+
+# Trigger keywords per rule, matched against the lower-cased query text: a
+# check can only fire when one of its triggers occurs, so the standard path
+# skips every rule none of whose triggers the prefilter scan found
+RULE_TRIGGERS: Dict[str, Tuple[str, ...]] = {
+    'select_star': ('select *',),
+    'missing_where_clause': ('select',),
+    'non_sargable_predicates': ('like',),
+    'function_in_where': ('upper', 'lower', 'substring', 'year', 'month', 'day'),
+    'implicit_conversions': ("'", '"'),
+    'unnecessary_joins': ('join',),
+    'missing_indexes': ('.',),  # both patterns match qualified columns
+    'subquery_optimization': ('exists', '('),
+    'order_by_without_limit': ('order by',),
+    'like_wildcards': ('like',),
+    'distinct_usage': ('select distinct',),
+    'union_vs_union_all': ('union',),
+    'cartesian_products': ('from',),
+    'unnecessary_sorting': ('order by',),
+    'nullable_columns': ('where',),
+    'data_type_mismatches': ("'", '"'),
+    'inefficient_aggregations': ('count', 'sum', 'avg', 'min', 'max'),
+}
+
+# Checks whose issue one of query_rewriter's rewrites fixes: rule id -> rewrite
+# name. Their suggestions carry the query after that rewrite step as
+# optimized_query, but only when the step passed verification.
+REWRITE_RULES = {
+    'select_star': 'expand_star',
+    'union_vs_union_all': 'union_all',
+}
+
+# Rules whose checks need sqlparse's grouped tree rather than the statement
+# text. The fast mode groups a statement only when one of these is triggered;
+# none of the built-in checks need it.
+GROUPED_RULES: FrozenSet[str] = frozenset()
+
+class _TriggerScan:
+    """Finds which of a set of keywords occur in a text
+    
+    Each keyword is looked up with str's substring search, longest first; a
+    keyword found implies the keywords it contains, which are not searched
+    again. Searches stop at the first occurrence and run in C, which beats a
+    single regex alternation over the text (tried at every position) by 5x
+    on short queries and large ones alike.
+    """
+    
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = sorted(set(keywords), key=len, reverse=True)
+        self.implied = {keyword: frozenset(k for k in self.keywords if k in keyword) for keyword in self.keywords}
+    
+    def scan(self, text: str) -> FrozenSet[str]:
+        found = set()
+        for keyword in self.keywords:
+            if keyword not in found and keyword in text:
+                found |= self.implied[keyword]
+        return frozenset(found)
+
+_RULE_TRIGGER_SCAN = _TriggerScan(keyword for triggers in RULE_TRIGGERS.values() for keyword in triggers)
+
+def triggered_rules(query_str: str) -> List[str]:
+    """RULE_IDS entries, in order, whose trigger keywords occur in the lower-cased query"""
+    found = _RULE_TRIGGER_SCAN.scan(query_str)
+    return [rule_id for rule_id in RULE_IDS if not found.isdisjoint(RULE_TRIGGERS[rule_id])]
+
+# Rule patterns. A pattern of the form "anchor.*?target" is retried from
+# every anchor occurrence and backtracks across the rest of the line each
+# time, which is quadratic on large generated queries; such patterns are
+# matched by _LinePattern in a single forward pass instead.
+class _LinePattern:
+    """Linear-time stand-in for re.compile(anchor + '.*?' + target)
+    
+    After each anchor the rest of the line is scanned once; if the target
+    does not occur there, neither can it after a later anchor that ends on
+    the same line, so those anchors are skipped without scanning. Set ``word_start`` when the target
+    starts with ``\\w+``: it is then only tried where a word starts (or
+    directly after the anchor), so a long word is not rescanned from each of
+    its characters.
+    """
+    
+    def __init__(self, anchor: str, target: str, word_start: bool = False):
+        self.anchor = re.compile(anchor)
+        self.target = re.compile((r'(?:|[^\n]*?\b)' if word_start else r'[^\n]*?') + f'(?:{target})')
+    
+    def finditer(self, text: str) -> Iterator[Match]:
+        pos = 0
+        while True:
+            match = self._search(text, pos)
+            if match is None:
+                return
+            yield match
+            pos = match.end()
+    
+    def search(self, text: str) -> Optional[Match]:
+        return self._search(text, 0)
+    
+    def _search(self, text: str, pos: int) -> Optional[Match]:
+        # One finditer walks the anchors, so skipping the rest of a line's
+        # anchors takes no search call per anchor
+        failed_line_end = -1
+        for found in self.anchor.finditer(text, pos):
+            if found.end() < failed_line_end:
+                continue
+            match = self.target.match(text, found.end())
+            if match is not None:
+                return match
+            failed_line_end = text.find('\n', found.end())
+            if failed_line_end < 0:
+                return None
+        return None
+
+# Searched within one clause's text (see clause_index)
+_QUALIFIED_EQ = re.compile(r'\b(\w+)\.(\w+)\s*=')
+_QUALIFIED_JOIN = re.compile(r'\b\w+\.\w+\s*=\s*\w+\.\w+')
+_COMPARISON = re.compile(r'[\w?]\s*[<>=!]')  # ? is a normalized number
+_FUNCTION_CALLS = {
+    func: re.compile(rf'{func}\s*\(')
+    for func in ('upper', 'lower', 'substring', 'year', 'month', 'day')
+}
+_CALL = re.compile(r'\w\s*\(')
+_LIKE_BOTH_WILDCARDS = _LinePattern(r"like\s+['\"]%", r"%['\"]")
+_NESTED_AGGREGATE = _LinePattern(r'\b(?:count|sum|avg|min|max)\s*\(', r'\b(?:count|sum|avg|min|max)\s*\(')
+# A single \w is enough to anchor a comparison and keeps matching linear.
+# Every position can start a \w, so the quoted value, which starts with a
+# quote, is looked for first
+_QUOTED_NUMBER = re.compile(r"['\"]\d+['\"]")
+_QUOTED_DATE = re.compile(r"['\"]\d{4}-\d{2}-\d{2}['\"]")
+_QUOTED_NUMBER_COMPARISON = re.compile(r"\w\s*[<>=]\s*['\"]\d+['\"]|['\"]\d+['\"]\s*[<>=]\s*\w")
+_QUOTED_DATE_COMPARISON = re.compile(
+    r"\w\s*[<>=]\s*['\"]\d{4}-\d{2}-\d{2}['\"]|['\"]\d{4}-\d{2}-\d{2}['\"]\s*[<>=]\s*\w"
+)
+
+_COMPLEXITY_WORDS = re.compile(r'\b(?:join|select|and|or)\b')
+
+# Score deducted per suggestion, scaled by its impact weight when statistics are set
+SEVERITY_POINTS = {
+    OptimizationLevel.CRITICAL: 25,
+    OptimizationLevel.HIGH: 15,
+    OptimizationLevel.MEDIUM: 10,
+    OptimizationLevel.LOW: 5,
+}
+
+# Most severe level each check reports, and its worst-case cost in
+# microseconds per KB of query text (measured on the benchmarks.py fuzz
+# corpus, alone and followed by a line break and a second statement). Under a deadline the checks run in order of severity points per
+# unit of cost.
+RULE_LEVELS = {
+    'select_star': OptimizationLevel.MEDIUM,
+    'missing_where_clause': OptimizationLevel.HIGH,
+    'non_sargable_predicates': OptimizationLevel.HIGH,
+    'function_in_where': OptimizationLevel.MEDIUM,
+    'implicit_conversions': OptimizationLevel.LOW,
+    'unnecessary_joins': OptimizationLevel.MEDIUM,
+    'missing_indexes': OptimizationLevel.HIGH,
+    'subquery_optimization': OptimizationLevel.MEDIUM,
+    'order_by_without_limit': OptimizationLevel.LOW,
+    'like_wildcards': OptimizationLevel.MEDIUM,
+    'distinct_usage': OptimizationLevel.MEDIUM,
+    'union_vs_union_all': OptimizationLevel.MEDIUM,
+    'cartesian_products': OptimizationLevel.CRITICAL,
+    'unnecessary_sorting': OptimizationLevel.MEDIUM,
+    'nullable_columns': OptimizationLevel.LOW,
+    'data_type_mismatches': OptimizationLevel.MEDIUM,
+    'inefficient_aggregations': OptimizationLevel.HIGH,
+}
+RULE_COSTS = {
+    'select_star': 5,
+    'missing_where_clause': 5,
+    'non_sargable_predicates': 5,
+    'function_in_where': 200,
+    'implicit_conversions': 20,
+    'unnecessary_joins': 50,
+    'missing_indexes': 120,
+    'subquery_optimization': 5,
+    'order_by_without_limit': 5,
+    'like_wildcards': 60,
+    'distinct_usage': 5,
+    'union_vs_union_all': 5,
+    'cartesian_products': 900,
+    'unnecessary_sorting': 30,
+    'nullable_columns': 70,
+    'data_type_mismatches': 200,
+    'inefficient_aggregations': 70,
+}
+# Costs, in the same units, of the clause index (built by the first check in
+# CLAUSE_INDEX_RULES to run), the complexity summary, the row estimates and
+# the verified rewrites behind optimized_query
+_CLAUSE_INDEX_COST = 600
+_COMPLEXITY_COST = 150
+_ESTIMATE_COST = 400
+_REWRITE_COST = 50000
+# Cost, per KB, of lexing a query under a deadline: once to find where its
+# first statement ends, again to normalize that statement
+_NORMALIZE_COST = 12000
+CLAUSE_INDEX_RULES = frozenset({
+    'function_in_where', 'missing_indexes', 'cartesian_products', 'unnecessary_sorting', 'nullable_columns',
+})
+_RULE_PRIORITY = {
+    rule_id: SEVERITY_POINTS[RULE_LEVELS[rule_id]] / RULE_COSTS[rule_id] for rule_id in RULE_IDS
+}
+
+class FlatStatement:
+    """Stand-in for a parsed statement when only its text is needed
+    
+    Every check reads the statement through str(), so a check can be re-run
+    on raw query text without parsing it again.
+    """
+    
+    def __init__(self, text: str):
+        self.text = text
+    
+    def __str__(self) -> str:
+        return self.text
+
+class SQLOptimizerEngine:
+    """Main SQL optimization engine"""
+    
+    def __init__(self, mode: AnalysisMode = AnalysisMode.STANDARD,
+                 cache_size: int = DEFAULT_CACHE_SIZE, cache: Optional[AnalysisCache] = None,
+                 profile: bool = False):
+        """Create an engine; pass ``cache`` to share one result cache between
+        engines, or ``cache_size=0`` to disable caching. With ``profile`` every
+        result carries an AnalysisProfile (see profiling)"""
+        self.schema: Schema = EMPTY_SCHEMA
+        self.statistics: Optional[Statistics] = None
+        self.mode = mode
+        self.profile = profile
+        self.cache = cache if cache is not None else (AnalysisCache(cache_size) if cache_size else None)
+        self.optimization_rules = self._load_optimization_rules()
+    
+    def set_schema(self, schema_ddl: str):
+        """Load the (memoized) schema catalog for a DDL string"""
+        self.schema = load_schema(schema_ddl)
+    
+    def set_statistics(self, statistics: Optional[Union[Dict, str, Statistics]]):
+        """Set table statistics for the cost model (see cost_model.load_statistics)
+        
+        With statistics, suggestions are weighted by the rows they affect;
+        pass None to go back to fixed deductions per severity level.
+        """
+        self.statistics = load_statistics(statistics) if statistics is not None else None
+    
+    @property
+    def schema_info(self) -> Dict:
+        """Schema tables and columns in dict form (read-only, shared between engines)"""
+        return self.schema.schema_info
+    
+    def analyze_query(self, query: str, deadline_ms: Optional[float] = None) -> QueryAnalysisResult:
+        """Analyze a SQL query and provide optimization suggestions
+        
+        The checks read the normalized text of the query's first statement
+        (see query_fingerprint.normalize_query), never the raw text, so
+        comments, literal values and layout cannot change a result, and a
+        cached result is exactly what a fresh analysis would return.
+        
+        With ``deadline_ms``, checks run in order of value per cost and a
+        check is skipped when its estimated cost (RULE_COSTS) no longer fits
+        the remaining budget; the result is then marked incomplete and lists
+        the skipped rules. The complexity summary, row estimates and rewrites
+        are left out (and the result marked incomplete) when they no longer
+        fit. Finding where the first statement ends counts against the
+        budget too: a query whose split or normalization does not fit has its
+        raw text checked instead, and its result is marked incomplete. A
+        deadline analysis takes the fast path (no sqlparse grouping) and
+        bypasses the result cache. A complete result equals the result
+        without a deadline.
+        """
+        profile = AnalysisProfile() if self.profile else None
+        started = time.perf_counter()
+        if deadline_ms is not None:
+            deadline = started + deadline_ms / 1000
+            text = None
+            if started + _NORMALIZE_COST * len(query) / 1024 / 1e6 <= deadline:
+                text = first_statement(query, deadline)
+            fits = text is not None and time.perf_counter() + _NORMALIZE_COST * len(text) / 1024 / 1e6 <= deadline
+            parsed = FlatStatement(normalize_query(text) if fits else query if text is None else text)
+            if profile is not None:
+                profile.stage('parse', started)
+            result = self._analyze_statement(query, parsed, deadline, profile)
+            result.complete = result.complete and fits
+            return result
+        
+        normalized = normalize_query(first_statement(query))
+        if profile is not None:
+            profile.stage('fingerprint', started)
+        return self._analyze_normalized(query, normalized, profile)
+    
+    def analyze_normalized(self, query: str, normalized: str, flat: bool = False) -> QueryAnalysisResult:
+        """Analyze a statement whose normalized text the caller already has
+        
+        For callers that lex statements themselves, such as the incremental
+        analyzer: ``normalized`` must be query_fingerprint.normalize_tokens
+        over the statement's tokens, and the result (cached or fresh) is the
+        one analyze_query(query) returns. With ``flat`` the statement is
+        checked as text, skipping sqlparse's grouping, in either mode.
+        """
+        profile = AnalysisProfile() if self.profile else None
+        return self._analyze_normalized(query, normalized, profile, flat)
+    
+    def _analyze_normalized(self, query: str, normalized: str, profile: Optional[AnalysisProfile] = None,
+                            flat: bool = False) -> QueryAnalysisResult:
+        """Analyze a statement given its normalized text, through the result cache when enabled"""
+        if self.cache is None:
+            return self._analyze_statement(query, self._parse(normalized, profile, flat), profile=profile)
+        
+        key = self._cache_key(fingerprint_normalized(normalized))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return self._reuse_cached(cached, query, profile)
+        
+        # Parse the SQL query
+        parsed = self._parse(normalized, profile, flat)
+        result = self._analyze_statement(query, parsed, profile=profile)
+        self._cache_result(key, result)
+        return result
+    
+    def _parse(self, text: str, profile: Optional[AnalysisProfile] = None, flat: bool = False):
+        """A normalized statement: grouped by sqlparse, or just its text in fast mode (or when flat)"""
+        started = time.perf_counter()
+        if flat or self.mode == AnalysisMode.FAST or not text:
+            parsed = FlatStatement(text)
+        else:
+            parsed = sqlparse.parse(text)[0]
+        if profile is not None:
+            profile.stage('parse', started)
+        return parsed
+    
+    def _cache_key(self, query_fingerprint: str) -> Tuple:
+        """Result-cache key: the query shape plus everything else the result depends on"""
+        stats_hash = self.statistics.stats_hash if self.statistics is not None else None
+        return (query_fingerprint, self.schema.ddl_hash, stats_hash, self.mode)
+    
+    def _cache_result(self, key: Tuple, result: QueryAnalysisResult):
+        # Store a deep copy so callers may mutate the result, and its suggestions, they were handed
+        self.cache.put(key, replace(result, suggestions=copy.deepcopy(result.suggestions),
+                                    complexity_analysis=copy.deepcopy(result.complexity_analysis), profile=None))
+    
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss/eviction counters of the result cache (empty when disabled)"""
+        return self.cache.stats() if self.cache is not None else {}
+    
+    def _reuse_cached(self, cached: QueryAnalysisResult, query: str,
+                      profile: Optional[AnalysisProfile] = None) -> QueryAnalysisResult:
+        """Adapt a cached result for a query with the same fingerprint
+        
+        Every caller gets its own deep copy of the suggestions, so mutating
+        one never changes the cache or another caller's result. The
+        optimized_query of a REWRITE_RULES suggestion is the cached query's
+        rewrite, and whether a rewrite verifies can depend on literal values;
+        those rewrites are redone for the new text.
+        """
+        suggestions = copy.deepcopy(cached.suggestions)
+        if query != cached.original_query and any(s.rule_id in REWRITE_RULES for s in suggestions):
+            self._attach_rewrites(suggestions, query, profile)
+        
+        return QueryAnalysisResult(
+            original_query=query,
+            suggestions=suggestions,
+            performance_score=cached.performance_score,
+            complexity_analysis=copy.deepcopy(cached.complexity_analysis),
+            profile=profile
+        )
+    
+    def analyze_script(self, script: Union[str, Iterable[str]]) -> Iterator[QueryAnalysisResult]:
+        """Analyze every statement of a SQL script, yielding one result per statement
+        
+        Each statement is normalized from the script's lexer tokens and then
+        analyzed (and cached) exactly as analyze_query would analyze its text.
+        """
+        from sql_script import iter_statements
+        for statement in iter_statements(script, group=False):
+            profile = AnalysisProfile() if self.profile else None
+            started = time.perf_counter()
+            normalized = normalize_tokens((token.ttype, token.value) for token in statement.flatten())
+            if profile is not None:
+                profile.stage('fingerprint', started)
+            yield self._analyze_normalized(str(statement).strip(), normalized, profile)
+    
+    def analyze_file(self, path: str, encoding: str = 'utf-8') -> Iterator[QueryAnalysisResult]:
+        """Stream the statements of a .sql file through analyze_script"""
+        with open(path, encoding=encoding) as script:
+            yield from self.analyze_script(script)
+    
+    def advise_indexes(self, queries: Iterable[Union[str, Tuple[str, float]]],
+                       budget: Optional[int] = None):
+        """Recommend composite indexes for a workload against the current schema and statistics"""
+        from index_advisor import DEFAULT_INDEX_BUDGET, advise_indexes
+        return advise_indexes(queries, self.schema, self.statistics,
+                              budget if budget is not None else DEFAULT_INDEX_BUDGET)
+    
+    def validate_query(self, query: str):
+        """Check the query's index recommendations with SQLite's EXPLAIN QUERY PLAN"""
+        from plan_validation import validate_index_advice
+        recommendations = [s.index_recommendation for s in self.analyze_query(query).suggestions
+                           if s.index_recommendation]
+        return validate_index_advice(self.schema, query, recommendations, self.statistics)
+    
+    def analyze_many(self, queries: Iterable[str], workers: Optional[int] = None,
+                     chunksize: int = 64) -> List[QueryAnalysisResult]:
+        """Analyze many queries across a pool of worker processes, preserving input order"""
+        return list(self.iter_analyze(queries, workers, chunksize))
+    
+    def iter_analyze(self, queries: Iterable[str], workers: Optional[int] = None,
+                     chunksize: int = 64) -> Iterator[QueryAnalysisResult]:
+        """Yield analysis results in input order as the worker pool produces them
+        
+        Each worker receives the engine configuration (mode and schema catalog)
+        once at start-up; queries travel to the workers in chunks of
+        ``chunksize``. With a single worker the queries are analyzed in-process.
+        """
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for query in queries:
+                yield self.analyze_query(query)
+            return
+        
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(self._worker_config(),)) as pool:
+            for result in pool.imap(_analyze_in_worker, queries, chunksize):
+                if result.profile is not None:
+                    # Workers record into their own histograms; fold their timings into ours
+                    HISTOGRAMS.observe_profile(result.profile)
+                yield result
+    
+    def _worker_config(self) -> Dict:
+        """Snapshot of the state a worker process needs to rebuild this engine"""
+        return {
+            'mode': self.mode,
+            'schema': self.schema,
+            'statistics': self.statistics,
+            'cache_size': self.cache.maxsize if self.cache is not None else 0,
+            'profile': self.profile,
+        }
+    
+    @classmethod
+    def _from_worker_config(cls, config: Dict) -> 'SQLOptimizerEngine':
+        engine = cls(mode=config['mode'], cache_size=config['cache_size'], profile=config['profile'])
+        engine.schema = config['schema']
+        engine.statistics = config['statistics']
+        return engine
+    
+    def _analyze_statement(self, query: str, parsed, deadline: Optional[float] = None,
+                           profile: Optional[AnalysisProfile] = None) -> QueryAnalysisResult:
+        """Run every check against an already parsed statement (or a FlatStatement)
+        
+        ``parsed`` holds the normalized statement the checks read; ``query``
+        is the original text, reported as original_query and rewritten.
+        ``deadline`` is a time.perf_counter() value after which no further
+        check is started. Stage and rule timings go into ``profile``.
+        """
+        suggestions = []
+        complexity_analysis = {}
+        
+        # Stringify the tree once; every check reads the statement through str()
+        statement = FlatStatement(str(parsed))
+        
+        # Run the optimization checks whose trigger keywords occur in the query,
+        # the most valuable per unit of cost first when there is a deadline
+        rule_ids = triggered_rules(statement.text.lower())
+        schedule = rule_ids if deadline is None else sorted(rule_ids, key=_RULE_PRIORITY.get, reverse=True)
+        size_kb = len(statement.text) / 1024
+        indexed = False
+        found = {}
+        for rule_id in schedule:
+            if deadline is not None:
+                # Skip a check expected to run past the deadline; a cheaper one may still fit
+                cost = RULE_COSTS[rule_id]
+                if rule_id in CLAUSE_INDEX_RULES and not indexed:
+                    cost += _CLAUSE_INDEX_COST
+                if time.perf_counter() + cost * size_kb / 1e6 > deadline:
+                    continue
+                indexed = indexed or rule_id in CLAUSE_INDEX_RULES
+            found[rule_id] = self._run_check(rule_id, parsed if rule_id in GROUPED_RULES else statement, profile)
+        for rule_id in rule_ids:
+            suggestions.extend(found.get(rule_id, ()))
+        skipped_rules = [rule_id for rule_id in rule_ids if rule_id not in found]
+        
+        # Analyze complexity, weight suggestions by the rows they affect (only
+        # with statistics) and attach verified rewrites, unless that would run
+        # past the deadline
+        stage_cost = _COMPLEXITY_COST + (_ESTIMATE_COST if self.statistics is not None else 0)
+        if self._wants_rewrites(suggestions):
+            stage_cost += _REWRITE_COST
+        in_time = deadline is None or time.perf_counter() + stage_cost * size_kb / 1e6 <= deadline
+        if in_time:
+            complexity_analysis = self._timed_complexity(statement, profile)
+            self._apply_estimates(suggestions, statement.text, complexity_analysis, profile)
+            self._attach_rewrites(suggestions, query, profile)
+        
+        # Calculate performance score
+        performance_score = self._timed_score(suggestions, profile)
+        
+        return QueryAnalysisResult(
+            original_query=query,
+            suggestions=suggestions,
+            performance_score=performance_score,
+            complexity_analysis=complexity_analysis,
+            complete=in_time and not skipped_rules,
+            skipped_rules=skipped_rules,
+            profile=profile
+        )
+    
+    def _run_check(self, rule_id: str, parsed,
+                   profile: Optional[AnalysisProfile] = None) -> List[OptimizationSuggestion]:
+        """Run one _check_* method and tag its suggestions with the rule id"""
+        started = time.perf_counter()
+        if rule_id in GROUPED_RULES and (isinstance(parsed, FlatStatement) or self.mode == AnalysisMode.FAST):
+            parsed = sqlparse.parse(str(parsed))[0]
+        suggestions = getattr(self, f'_check_{rule_id}')(parsed)
+        for suggestion in suggestions:
+            suggestion.rule_id = rule_id
+        if profile is not None:
+            profile.rule(rule_id, started)
+        return suggestions
+    
+    def _timed_complexity(self, statement, profile: Optional[AnalysisProfile]) -> Dict:
+        started = time.perf_counter()
+        complexity_analysis = self._analyze_complexity(statement)
+        if profile is not None:
+            profile.stage('complexity', started)
+        return complexity_analysis
+    
+    def _timed_score(self, suggestions: List[OptimizationSuggestion], profile: Optional[AnalysisProfile]) -> int:
+        started = time.perf_counter()
+        performance_score = self._calculate_performance_score(suggestions)
+        if profile is not None:
+            profile.stage('score', started)
+        return performance_score
+    
+    def generate_optimized_query(self, query: str) -> str:
+        """Generate an optimized version of the query"""
+        return self.rewrite_query(query).query
+        
+    def rewrite_query(self, query: str) -> RewriteResult:
+        """Apply every provably safe rewrite, returning the query and the transformations applied"""
+        return rewrite_query(query, self.schema)
+    
+    def _check_select_star(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for SELECT * usage"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        if 'select *' in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Column Selection",
+                issue="Using SELECT * retrieves all columns",
+                suggestion="Specify only the columns you need to reduce data transfer and improve performance"
+            ))
+        
+        return suggestions
+    
+    def _check_missing_where_clause(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for queries without WHERE clauses"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check if it's a SELECT without WHERE
+        if 'select' in query_str and 'where' not in query_str and 'limit' not in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.HIGH,
+                category="Data Filtering",
+                issue="Query lacks WHERE clause and may return all rows",
+                suggestion="Add appropriate WHERE conditions to limit the result set and improve performance"
+            ))
+        
+        return suggestions
+    
+    def _check_non_sargable_predicates(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for non-SARGable predicates that prevent index usage"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for leading wildcards in LIKE
+        if re.search(r"like\s+['\"]%", query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.HIGH,
+                category="Index Usage",
+                issue="LIKE with leading wildcard (%) prevents index usage",
+                suggestion="Consider using full-text search or restructuring the query to avoid leading wildcards"
+            ))
+        
+        return suggestions
+    
+    def _check_function_in_where(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for functions applied to columns in WHERE clauses"""
+        suggestions = []
+        where_clauses = build_clause_index(str(parsed).lower()).texts('where')
+        
+        # Common functions that prevent index usage
+        for func, call in _FUNCTION_CALLS.items():
+            if any(call.search(clause) for clause in where_clauses):
+                suggestions.append(OptimizationSuggestion(
+                    level=OptimizationLevel.MEDIUM,
+                    category="Index Usage",
+                    issue=f"Function {func.upper()}() in WHERE clause prevents index usage",
+                    suggestion=f"Consider using computed columns or restructuring to avoid {func.upper()}() in WHERE clause"
+                ))
+        
+        return suggestions
+    
+    def _check_implicit_conversions(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for potential implicit data type conversions"""
+        suggestions = []
+        query_str = str(parsed)
+        
+        # Look for quoted numbers (potential string to number conversion)
+        if re.search(r"=\s*['\"][0-9]+['\"]", query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Data Types",
+                issue="Potential implicit conversion between string and numeric types",
+                suggestion="Ensure data types match to avoid implicit conversions that can prevent index usage"
+            ))
+        
+        return suggestions
+    
+    def _check_unnecessary_joins(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for potentially unnecessary joins"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Count joins
+        join_count = len(re.findall(r'\bjoin\b', query_str))
+        
+        if join_count > 3:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Query Structure",
+                issue=f"Query has {join_count} joins which may impact performance",
+                suggestion="Review if all joins are necessary. Consider breaking complex queries into simpler ones or using CTEs"
+            ))
+        
+        return suggestions
+    
+    def _check_missing_indexes(self, parsed) -> List[OptimizationSuggestion]:
+        """Suggest indexes based on WHERE and JOIN conditions"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Extract table and column names from WHERE conditions (the first of each clause)
+        where_matches = [
+            match.groups() for match in map(_QUALIFIED_EQ.search, build_clause_index(query_str).texts('where'))
+            if match
+        ]
+        join_matches = re.findall(r'on\s+(\w+)\.(\w+)\s*=\s*(\w+)\.(\w+)', query_str)
+        
+        recommended_indexes = {}  # a dict keeps first-seen order, which a set would vary per process
+        
+        # Suggest indexes for WHERE conditions
+        for table, column in where_matches:
+            index_name = f"idx_{table}_{column}"
+            recommended_indexes[f"CREATE INDEX {index_name} ON {table}({column});"] = None
+        
+        # Suggest indexes for JOIN conditions
+        for t1, c1, t2, c2 in join_matches:
+            index1 = f"idx_{t1}_{c1}"
+            index2 = f"idx_{t2}_{c2}"
+            recommended_indexes[f"CREATE INDEX {index1} ON {t1}({c1});"] = None
+            recommended_indexes[f"CREATE INDEX {index2} ON {t2}({c2});"] = None
+        
+        if recommended_indexes:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.HIGH,
+                category="Indexing",
+                issue="Query may benefit from additional indexes",
+                suggestion="Consider creating the following indexes to improve query performance",
+                index_recommendation="\n".join(recommended_indexes)
+            ))
+        
+        return suggestions
+    
+    def _check_subquery_optimization(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for subqueries that could be optimized"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for EXISTS subqueries that could be JOINs
+        if 'exists' in query_str and 'select' in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Query Structure",
+                issue="EXISTS subquery detected",
+                suggestion="Consider converting EXISTS subquery to JOIN for better performance in some cases"
+            ))
+        
+        # Check for IN with subqueries
+        if re.search(r'in\s*\(\s*select', query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Query Structure",
+                issue="IN with subquery detected",
+                suggestion="Consider using JOIN or EXISTS instead of IN with subquery for better performance"
+            ))
+        
+        return suggestions
+    
+    def _check_order_by_without_limit(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for ORDER BY without LIMIT"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        if 'order by' in query_str and 'limit' not in query_str and 'top' not in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Data Retrieval",
+                issue="ORDER BY without LIMIT may sort unnecessary rows",
+                suggestion="If you don't need all sorted results, consider adding LIMIT to reduce sorting overhead"
+            ))
+        
+        return suggestions
+    
+    def _check_like_wildcards(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for inefficient LIKE patterns"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for patterns that start and end with wildcards
+        if _LIKE_BOTH_WILDCARDS.search(query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Search Optimization",
+                issue="LIKE with wildcards on both ends requires full table scan",
+                suggestion="Consider using full-text search capabilities for better performance on text searches"
+            ))
+        
+        return suggestions
+    
+    def _check_distinct_usage(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for unnecessary or inefficient DISTINCT usage"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        if 'select distinct' in query_str:
+            # Check if DISTINCT is used with aggregation functions
+            if any(func in query_str for func in ['count(', 'sum(', 'avg(', 'min(', 'max(']):
+                suggestions.append(OptimizationSuggestion(
+                    level=OptimizationLevel.MEDIUM,
+                    category="Query Structure",
+                    issue="DISTINCT used with aggregation functions may be redundant",
+                    suggestion="Review if DISTINCT is necessary when using aggregation functions"
+                ))
+            
+            # Suggest using GROUP BY instead of DISTINCT when possible
+            if 'order by' in query_str:
+                suggestions.append(OptimizationSuggestion(
+                    level=OptimizationLevel.LOW,
+                    category="Query Structure",
+                    issue="DISTINCT with ORDER BY can be expensive",
+                    suggestion="Consider using GROUP BY instead of DISTINCT when ordering results"
+                ))
+        
+        return suggestions
+    
+    def _check_union_vs_union_all(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for UNION usage where UNION ALL would be more efficient"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        if 'union' in query_str and 'union all' not in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Query Structure",
+                issue="UNION removes duplicates which requires extra processing",
+                suggestion="Use UNION ALL if duplicates are acceptable or if you're certain there are no duplicates"
+            ))
+        
+        return suggestions
+    
+    def _check_cartesian_products(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for potential cartesian products (missing JOIN conditions)"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Count tables and JOIN clauses
+        from_tables = len(re.findall(r'\bfrom\s+\w+', query_str))
+        join_clauses = len(re.findall(r'\bjoin\b', query_str))
+        where_joins = sum(1 for clause in build_clause_index(query_str).texts('where') if _QUALIFIED_JOIN.search(clause))
+        
+        # If we have multiple tables but no proper joins
+        if from_tables > 1 and join_clauses == 0 and where_joins == 0:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.CRITICAL,
+                category="Query Structure",
+                issue="Potential cartesian product detected - multiple tables without JOIN conditions",
+                suggestion="Add proper JOIN conditions or WHERE clauses to avoid cartesian products"
+            ))
+        
+        return suggestions
+    
+    def _check_unnecessary_sorting(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for multiple or unnecessary sorting operations"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for ORDER BY in subqueries
+        if 'order by' in query_str:
+            # Count ORDER BY clauses; window definitions are not clauses
+            order_by_clauses = build_clause_index(query_str).texts('order by')
+            order_by_count = len(order_by_clauses)
+            
+            if order_by_count > 1:
+                suggestions.append(OptimizationSuggestion(
+                    level=OptimizationLevel.MEDIUM,
+                    category="Performance",
+                    issue="Multiple ORDER BY clauses detected",
+                    suggestion="Remove ORDER BY from subqueries unless absolutely necessary"
+                ))
+            
+            # Check for ORDER BY with functions
+            if any(_CALL.search(clause) for clause in order_by_clauses):
+                suggestions.append(OptimizationSuggestion(
+                    level=OptimizationLevel.MEDIUM,
+                    category="Index Usage",
+                    issue="ORDER BY uses functions which prevents index usage",
+                    suggestion="Consider creating computed columns or functional indexes"
+                ))
+        
+        return suggestions
+    
+    def _check_nullable_columns(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for operations on potentially nullable columns"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for comparisons that might not handle NULLs properly
+        where_clauses = build_clause_index(query_str).texts('where')
+        has_comparison = any(_COMPARISON.search(clause) for clause in where_clauses)
+        if has_comparison and 'is null' not in query_str and 'is not null' not in query_str:
+            # This is a heuristic - in practice, you'd need schema information
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Data Integrity",
+                issue="Consider NULL handling in WHERE conditions",
+                suggestion="Explicitly handle NULL values with IS NULL or IS NOT NULL clauses where appropriate"
+            ))
+        
+        return suggestions
+    
+    def _check_data_type_mismatches(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for potential data type mismatches that could cause performance issues"""
+        suggestions = []
+        query_str = str(parsed)
+        
+        # Check for comparing strings to numbers (more sophisticated than before)
+        if _QUOTED_NUMBER.search(query_str) and _QUOTED_NUMBER_COMPARISON.search(query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.MEDIUM,
+                category="Data Types",
+                issue="Potential data type mismatch between string and numeric values",
+                suggestion="Ensure consistent data types in comparisons to avoid implicit conversions"
+            ))
+        
+        # Check for date string comparisons
+        if _QUOTED_DATE.search(query_str) and _QUOTED_DATE_COMPARISON.search(query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Data Types",
+                issue="String comparison with date format detected",
+                suggestion="Use proper date functions like DATE() for date comparisons"
+            ))
+        
+        return suggestions
+    
+    def _check_inefficient_aggregations(self, parsed) -> List[OptimizationSuggestion]:
+        """Check for inefficient aggregation patterns"""
+        suggestions = []
+        query_str = str(parsed).lower()
+        
+        # Check for COUNT(*) vs COUNT(column)
+        if 'count(*)' in query_str and 'where' not in query_str:
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Performance",
+                issue="COUNT(*) without WHERE clause may be slow on large tables",
+                suggestion="Consider using table statistics or adding WHERE conditions to limit the count"
+            ))
+        
+        # Check for nested aggregations
+        if _NESTED_AGGREGATE.search(query_str):
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.HIGH,
+                category="Query Structure",
+                issue="Nested aggregation functions detected",
+                suggestion="Break down complex aggregations into multiple queries or use window functions"
+            ))
+        
+        # Check for aggregation without GROUP BY but with non-aggregate columns
+        has_aggregate = any(func in query_str for func in ['count(', 'sum(', 'avg(', 'min(', 'max('])
+        has_group_by = 'group by' in query_str
+        
+        if has_aggregate and not has_group_by:
+            # This is a simplified check - in practice, you'd need to parse the SELECT list
+            suggestions.append(OptimizationSuggestion(
+                level=OptimizationLevel.LOW,
+                category="Query Structure",
+                issue="Mixing aggregate and non-aggregate columns may require GROUP BY",
+                suggestion="Ensure all non-aggregate columns in SELECT are included in GROUP BY clause"
+            ))
+        
+        return suggestions
+    
+    def _apply_estimates(self, suggestions: List[OptimizationSuggestion], query: str,
+                         complexity_analysis: Optional[Dict] = None, profile: Optional[AnalysisProfile] = None):
+        """Fill in estimated_rows from the cost model when statistics are set"""
+        if self.statistics is None:
+            return
+        started = time.perf_counter()
+        estimate = estimate_query(query, self.statistics)
+        for suggestion in suggestions:
+            rows = affected_rows(estimate, suggestion.index_recommendation)
+            suggestion.estimated_rows = round(rows) if rows is not None else None
+        if complexity_analysis is not None and estimate.tables:
+            complexity_analysis['estimated_rows'] = {
+                name: round(table.rows) for name, table in estimate.tables.items()
+            }
+        if profile is not None:
+            profile.stage('estimates', started)
+    
+    def _wants_rewrites(self, suggestions: List[OptimizationSuggestion]) -> bool:
+        # Every rewrite in REWRITE_RULES needs the schema catalog
+        return bool(self.schema.tables) and any(s.rule_id in REWRITE_RULES for s in suggestions)
+    
+    def _attach_rewrites(self, suggestions: List[OptimizationSuggestion], query: str,
+                         profile: Optional[AnalysisProfile] = None):
+        """Set optimized_query on REWRITE_RULES suggestions from rewrite_query's verified steps
+        
+        A suggestion gets the query as it stood after its rule's step, or None
+        when the step did not fire or was rejected.
+        """
+        if not self._wants_rewrites(suggestions):
+            return
+        started = time.perf_counter()
+        steps = {step.name: step.after for step in self.rewrite_query(query).transformations}
+        for suggestion in suggestions:
+            if suggestion.rule_id in REWRITE_RULES:
+                suggestion.optimized_query = steps.get(REWRITE_RULES[suggestion.rule_id])
+        if profile is not None:
+            profile.stage('rewrite', started)
+    
+    def _calculate_performance_score(self, suggestions: List[OptimizationSuggestion]) -> int:
+        """Calculate a performance score based on issues found
+        
+        Each suggestion deducts its severity's points, scaled by its impact
+        weight when the cost model estimated the rows it affects.
+        """
+        base_score = 100
+        
+        for suggestion in suggestions:
+            base_score -= SEVERITY_POINTS.get(suggestion.level, 0) * impact_weight(suggestion.estimated_rows)
+        
+        return max(0, round(base_score))
+    
+    def _analyze_complexity(self, parsed) -> Dict:
+        """Analyze query complexity"""
+        query_str = str(parsed).lower()
+        # Whole words cannot overlap, so one scan counts them all
+        words = Counter(_COMPLEXITY_WORDS.findall(query_str))
+        
+        return {
+            'join_count': words['join'],
+            'subquery_count': words['select'] - 1,
+            'where_conditions': words['and'] + words['or'] + 1,
+            'has_order_by': 'order by' in query_str,
+            'has_group_by': 'group by' in query_str,
+            'has_having': 'having' in query_str
+        }
+    
+    def _load_optimization_rules(self) -> Dict:
+        """Load predefined optimization rules"""
+        return {
+            'avoid_select_star': True,
+            'require_where_clause': True,
+            'check_index_usage': True,
+            'optimize_joins': True,
+            'detect_n_plus_one': True
+        }
+
+_worker_engine: Optional[SQLOptimizerEngine] = None
+
+def _init_worker(config: Dict):
+    """Pool initializer: build the per-process engine once"""
+    global _worker_engine
+    _worker_engine = SQLOptimizerEngine._from_worker_config(config)
+
+def _analyze_in_worker(query: str) -> QueryAnalysisResult:
+    return _worker_engine.analyze_query(query)
+
+def format_analysis_result(analysis: QueryAnalysisResult) -> str:
+    """Format the analysis result as markdown for display
+    
+    Joins the chunks of report_formats.iter_markdown; stream those instead
+    to write many reports without building one string. A profiled result
+    gets the time spent here recorded as its 'format' stage.
+    """
+    from report_formats import iter_markdown
+    started = time.perf_counter()
+    result = ''.join(iter_markdown(analysis))
+    
+    if analysis.profile is not None:
+        analysis.profile.stage('format', started)
+    return result
+
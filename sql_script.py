@@ -0,0 +1,139 @@
+"""
+SQL Script Streaming
+
+Splits large .sql scripts into parsed statements without reading the whole
+file into memory. sqlparse.parsestream lexes its entire input up front, so
+the script is fed to the same lexer -> StatementSplitter -> grouping pipeline
+in chunks that end on a line boundary outside any string, dollar-quoted body
+or block comment.
+"""
+
+import re
+import time
+from itertools import chain
+from typing import Iterable, Iterator, Optional
+
+from sqlparse import lexer, sql, tokens as T
+from sqlparse.engine import grouping
+from sqlparse.engine.statement_splitter import StatementSplitter
+
+DEFAULT_CHUNK_SIZE = 1 << 20  # characters of script text lexed at a time
+
+# Like sqlparse's lexer, a PostgreSQL dollar quote ($$ or $tag$) only opens
+# after whitespace, and '#' only starts a comment when a space follows it
+# ('#tmp' is a name)
+_OPENERS = re.compile(r"['\"`]|--|/\*|# |(?<!\S)\$(?:[A-Za-z_]\w*)?\$")
+_CLOSERS = {
+    "'": re.compile(r"\\.|'"),
+    '"': re.compile(r'\\.|"'),
+    '`': re.compile(r'`'),
+}
+
+def _scan_line(line: str, state: Optional[str]) -> Optional[str]:
+    """Return the quote/comment state at the end of a line
+    
+    The state is None outside literals, the opening quote character inside a
+    quoted literal, the opening tag (e.g. '$$' or '$body$') inside a
+    dollar-quoted string, or '/*' inside a block comment.
+    """
+    pos = 0
+    end = len(line)
+    while pos < end:
+        if state is None:
+            match = _OPENERS.search(line, pos)
+            if not match:
+                return None
+            opener = match.group()
+            if opener in ('--', '# '):
+                return None
+            state = opener
+            pos = match.end()
+        elif state == '/*' or state[0] == '$':
+            closer = '*/' if state == '/*' else state
+            close = line.find(closer, pos)
+            if close < 0:
+                return state
+            state = None
+            pos = close + len(closer)
+        else:
+            closer = _CLOSERS[state]
+            while True:
+                match = closer.search(line, pos)
+                if not match:
+                    return state
+                pos = match.end()
+                if match.group() == state:
+                    break
+            state = None
+    return state
+
+def iter_chunks(lines: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """Group script lines into chunks that can be lexed independently
+    
+    A chunk is closed once it holds at least ``chunk_size`` characters and
+    the current line ends a statement outside any literal or comment, so no
+    token ever straddles two chunks.
+    """
+    buffer = []
+    size = 0
+    state = None
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        state = _scan_line(line, state)
+        if size >= chunk_size and state is None and line.rstrip().endswith(';'):
+            yield ''.join(buffer)
+            buffer = []
+            size = 0
+    if buffer:
+        yield ''.join(buffer)
+
+def _is_blank(statement: sql.Statement) -> bool:
+    return all(token.is_whitespace or token.ttype in T.Comment for token in statement.tokens)
+
+def iter_statements(source, chunk_size: int = DEFAULT_CHUNK_SIZE, group: bool = True) -> Iterator[sql.Statement]:
+    """Yield grouped statements from a SQL string or an iterable of lines
+    
+    File objects are iterated line by line, so only one chunk of the script
+    and the statement being grouped are held in memory at a time. Empty and
+    comment-only statements are skipped. With ``group=False`` the statements
+    hold the flat lexer tokens and sqlparse's grouping stage is skipped.
+    """
+    lines = source.splitlines(keepends=True) if isinstance(source, str) else source
+    stream = chain.from_iterable(lexer.tokenize(chunk) for chunk in iter_chunks(lines, chunk_size))
+    for statement in StatementSplitter().process(stream):
+        if not _is_blank(statement):
+            yield grouping.group(statement) if group else statement
+
+class _OutOfTime(Exception):
+    pass
+
+def _before(deadline: float, tokens: Iterator) -> Iterator:
+    """Pass tokens through until the clock passes ``deadline`` (checked every 256 tokens)"""
+    for count, token in enumerate(tokens):
+        if not count & 255 and time.perf_counter() > deadline:
+            raise _OutOfTime
+        yield token
+
+def first_statement(query: str, deadline: Optional[float] = None) -> Optional[str]:
+    """Text of the statement sqlparse.parse(query)[0] would return, without grouping it
+    
+    Only a query with more than blanks after its first ';' is lexed, and
+    then only up to the start of the second statement. With ``deadline`` (a
+    time.perf_counter() value), None is returned if lexing runs past it.
+    """
+    semicolon = query.find(';')
+    if semicolon < 0:
+        return query
+    rest = query[semicolon + 1:]
+    if (not rest or rest.isspace()) and '\n' not in rest and '\r' not in rest:
+        # Split there or not, a statement only ends early at a line break
+        return query
+    tokens = lexer.tokenize(query)
+    if deadline is not None:
+        tokens = _before(deadline, tokens)
+    try:
+        statement = next(StatementSplitter().process(tokens), None)
+    except _OutOfTime:
+        return None
+    return str(statement) if statement is not None else query
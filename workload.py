@@ -0,0 +1,181 @@
+"""
+Workload Log Analysis
+
+Streams a slow-query log or a pg_stat_statements CSV export, aggregates the
+entries per query fingerprint, analyzes each distinct shape once and ranks
+the shapes by how much time they cost weighted by how much the engine thinks
+they can be improved.
+
+Every stage is a generator or a bounded dictionary, so multi-gigabyte logs
+are processed without holding the log in memory.
+"""
+
+import csv
+import re
+import sys
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from index_advisor import DEFAULT_INDEX_BUDGET, IndexAdvice
+from query_fingerprint import fingerprint_normalized, normalize_query
+from sql_optimizer_engine import QueryAnalysisResult, SQLOptimizerEngine
+
+DEFAULT_MAX_SHAPES = 50000
+
+@dataclass
+class LogEntry:
+    """One query execution (or pre-aggregated group of executions) from a log"""
+    query: str
+    duration_ms: float
+    calls: int = 1
+
+@dataclass
+class ShapeStats:
+    """Aggregated timings for one query fingerprint"""
+    fingerprint: str
+    normalized: str
+    example: str
+    calls: int = 0
+    total_time_ms: float = 0.0
+
+@dataclass
+class RankedShape:
+    """A query shape with its analysis and workload impact"""
+    stats: ShapeStats
+    analysis: QueryAnalysisResult
+    impact: float  # total_time_ms weighted by the performance score penalty
+
+_MYSQL_QUERY_TIME = re.compile(r'^# Query_time:\s*([\d.]+)')
+_PG_DURATION = re.compile(r'duration:\s*([\d.]+)\s*ms\s+(?:statement|execute [^:]*):\s*(.*)')
+_PG_LOG_LINE = re.compile(r'^\S.*?\b(?:LOG|ERROR|WARNING|STATEMENT|DETAIL|HINT):')
+
+def read_slow_log(lines: Iterable[str]) -> Iterator[LogEntry]:
+    """Parse a MySQL slow query log or a PostgreSQL log with duration lines
+    
+    MySQL entries start with a ``# Query_time:`` header; PostgreSQL entries
+    are ``duration: N ms  statement: ...`` lines (as written with
+    log_min_duration_statement), continued on lines that start with
+    whitespace.
+    """
+    duration = None
+    buffer: List[str] = []
+    
+    def flush() -> Optional[LogEntry]:
+        query = ''.join(buffer).strip()
+        buffer.clear()
+        if duration is not None and query:
+            return LogEntry(query, duration)
+        return None
+    
+    for line in lines:
+        if line.startswith('#'):
+            match = _MYSQL_QUERY_TIME.match(line)
+            if match:
+                entry = flush()
+                if entry:
+                    yield entry
+                duration = float(match.group(1)) * 1000
+            continue
+        
+        match = _PG_DURATION.search(line)
+        if match:
+            entry = flush()
+            if entry:
+                yield entry
+            duration = float(match.group(1))
+            buffer.append(match.group(2) + '\n')
+            continue
+        
+        if _PG_LOG_LINE.match(line):
+            # Some other PostgreSQL log message ends the current statement
+            entry = flush()
+            if entry:
+                yield entry
+            duration = None
+            continue
+        
+        lowered = line.lstrip().lower()
+        if duration is None or lowered.startswith(('set timestamp=', 'use ')):
+            continue
+        buffer.append(line)
+    
+    entry = flush()
+    if entry:
+        yield entry
+
+def read_pg_stat_statements(lines: Iterable[str]) -> Iterator[LogEntry]:
+    """Parse a CSV export of pg_stat_statements
+    
+    Works with both ``total_exec_time`` (PostgreSQL 13+) and the older
+    ``total_time`` column.
+    """
+    csv.field_size_limit(max(csv.field_size_limit(), min(sys.maxsize, 1 << 30)))
+    for row in csv.DictReader(lines):
+        query = (row.get('query') or '').strip()
+        if not query:
+            continue
+        total = row.get('total_exec_time') or row.get('total_time') or 0
+        calls = row.get('calls') or 1
+        yield LogEntry(query, float(total), int(float(calls)))
+
+def read_workload_file(path: str, encoding: str = 'utf-8') -> Iterator[LogEntry]:
+    """Stream entries from a log file, choosing the reader by file extension"""
+    reader = read_pg_stat_statements if path.lower().endswith('.csv') else read_slow_log
+    with open(path, encoding=encoding, errors='replace', newline='') as log:
+        yield from reader(log)
+
+def aggregate_by_fingerprint(entries: Iterable[LogEntry],
+                             max_shapes: int = DEFAULT_MAX_SHAPES) -> Dict[str, ShapeStats]:
+    """Group log entries by query fingerprint
+    
+    At most ``max_shapes`` shapes are returned: whenever the table reaches
+    twice that size, it is pruned back to the shapes with the largest total
+    time, so memory stays bounded even for logs with unbounded distinct
+    queries, and it is pruned once more at the end.
+    """
+    shapes: Dict[str, ShapeStats] = {}
+    for entry in entries:
+        normalized = normalize_query(entry.query)
+        key = fingerprint_normalized(normalized)
+        stats = shapes.get(key)
+        if stats is None:
+            if len(shapes) >= 2 * max_shapes:
+                shapes = _prune(shapes, max_shapes)
+            stats = shapes[key] = ShapeStats(key, normalized, entry.query)
+        stats.calls += entry.calls
+        stats.total_time_ms += entry.duration_ms
+    if len(shapes) > max_shapes:
+        shapes = _prune(shapes, max_shapes)
+    return shapes
+
+def _prune(shapes: Dict[str, ShapeStats], keep: int) -> Dict[str, ShapeStats]:
+    heaviest = sorted(shapes.values(), key=lambda stats: stats.total_time_ms, reverse=True)[:keep]
+    return {stats.fingerprint: stats for stats in heaviest}
+
+def rank_shapes(shapes: Dict[str, ShapeStats], engine: SQLOptimizerEngine,
+                workers: Optional[int] = 1, top: Optional[int] = None) -> List[RankedShape]:
+    """Analyze each shape once and rank by total time x performance penalty"""
+    stats_list = list(shapes.values())
+    analyses = engine.iter_analyze((stats.example for stats in stats_list), workers=workers)
+    ranked = [
+        RankedShape(stats, analysis, stats.total_time_ms * (100 - analysis.performance_score) / 100)
+        for stats, analysis in zip(stats_list, analyses)
+    ]
+    ranked.sort(key=lambda shape: shape.impact, reverse=True)
+    return ranked[:top] if top else ranked
+
+def analyze_workload(path: str, engine: Optional[SQLOptimizerEngine] = None,
+                     workers: Optional[int] = 1, top: Optional[int] = None,
+                     max_shapes: int = DEFAULT_MAX_SHAPES) -> List[RankedShape]:
+    """Stream a workload log from disk and return its ranked query shapes"""
+    engine = engine or SQLOptimizerEngine()
+    shapes = aggregate_by_fingerprint(read_workload_file(path), max_shapes)
+    return rank_shapes(shapes, engine, workers=workers, top=top)
+
+def advise_workload_indexes(path: str, engine: Optional[SQLOptimizerEngine] = None,
+                            budget: int = DEFAULT_INDEX_BUDGET,
+                            max_shapes: int = DEFAULT_MAX_SHAPES) -> IndexAdvice:
+    """Stream a workload log and recommend indexes weighted by the time each shape costs"""
+    engine = engine or SQLOptimizerEngine()
+    shapes = aggregate_by_fingerprint(read_workload_file(path), max_shapes)
+    return engine.advise_indexes(((stats.example, stats.total_time_ms) for stats in shapes.values()), budget)